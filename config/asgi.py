@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+# ASGI 서버로 실행할 때는 질문 목록, 질문 상세 화면에 비동기 뷰를 사용 (config/settings.py의 PYBO_ASYNC_VIEWS 참고)
+os.environ.setdefault('PYBO_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
@@ -16,6 +16,7 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 # 환경 설정에서 데이터베이스, 디버그 모드, 허용 가능한 호스트, 애플리케이션 다국어 및 지역 시간 등을 설정할 수 있다.
 # settings.py 파일의 설정이 올바르지 않거나, 필요한 구성이 누락되었다면 정상적으로 실행되지 않는다.
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -48,7 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'pybo.middleware.PerformanceMiddleware',  # 요청별 성능 측정 (전체 처리 시간을 재기 위해 가장 앞에 둠)
     'django.middleware.security.SecurityMiddleware',
+    'pybo.middleware.StaticFilesMiddleware',  # collectstatic으로 모은 스태틱 파일 제공 (세션, 인증 등을 거치지 않도록 앞쪽에 둠)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -61,7 +64,8 @@ ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # 장고 템플릿 엔진에 렌더링 시간 측정 기능을 추가한 백엔드 (pybo/metrics.py 참고)
+        'BACKEND': 'pybo.metrics.TimedDjangoTemplates',
         # 프로젝트 템플릿 디렉터리 지정. 템플릿 파일을 저장할 템플릿 디렉터리
         'DIRS': [
             BASE_DIR / 'templates',
@@ -91,6 +95,33 @@ DATABASES = {
     }
 }
 
+# 연결이 만들어질 때 적용할 SQLite PRAGMA 설정 (pybo/database.py 참고)
+PYBO_SQLITE_PRAGMAS = {}
+# pybo 모델을 읽을 때 사용할 읽기 전용 연결 이름. None이면 default 연결 사용
+PYBO_READ_DATABASE = None
+
+# 운영용 데이터베이스 프로필
+# 환경 변수 PYBO_DB_PROFILE=production으로 실행하면 사용한다.
+# - WAL 모드와 PRAGMA 설정 : 쓰기 중에도 읽기가 막히지 않고, 잠금 대기 시간(busy_timeout) 동안 기다린 후 실패
+# - CONN_MAX_AGE : 요청마다 연결을 새로 만들지 않고 최대 10분 동안 다시 사용
+# - replica 연결과 데이터베이스 라우터 : pybo 모델의 읽기는 읽기 전용 연결(replica), 쓰기는 default 연결로 보냄
+#   replica는 같은 파일을 사용하는 읽기 전용(query_only) 연결이다. 테스트에서는 default 연결을 그대로 사용 (MIRROR)
+PYBO_DB_PROFILE = os.environ.get('PYBO_DB_PROFILE', 'default')
+
+if PYBO_DB_PROFILE == 'production':
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+    DATABASES['replica'] = dict(DATABASES['default'], TEST={'MIRROR': 'default'})
+    DATABASE_ROUTERS = ['pybo.database.ReadWriteRouter']
+    PYBO_READ_DATABASE = 'replica'
+    PYBO_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # WAL 모드에서는 NORMAL로도 데이터베이스가 손상되지 않음 (전원 장애 시 마지막 커밋 일부만 유실 가능)
+        'mmap_size': 256 * 1024 * 1024,  # 데이터베이스 파일을 메모리에 매핑하여 읽기
+        'cache_size': -64 * 1024,  # 페이지 캐시 64MB (음수는 KB 단위)
+        'busy_timeout': 5000,  # 잠금 대기 시간 (밀리초)
+        'temp_store': 'MEMORY',
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -131,6 +162,12 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+# collectstatic 명령으로 스태틱 파일을 모을 디렉터리. 파일 이름에 내용의 해시를 붙인 사본과 미리 압축한 .gz(.br) 파일을 함께 만든다.
+# (pybo/staticfiles.py 참고) 모은 파일은 pybo.middleware.StaticFilesMiddleware가 제공한다.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+STATICFILES_STORAGE = 'pybo.staticfiles.CompressedManifestStaticFilesStorage'
+# 해시 이름 스태틱 파일의 브라우저 캐시 기간 (초)
+PYBO_STATIC_MAX_AGE = 365 * 24 * 60 * 60
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
@@ -145,3 +182,104 @@ LOGIN_REDIRECT_URL = '/'
 
 # 로그아웃 시 이동할 URL 설정
 LOGOUT_REDIRECT_URL = '/'
+
+# 마크다운 렌더링 캐시(pybo/rendering.py)의 최대 메모리 사용량 (바이트)
+MARKDOWN_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# 질문 목록에 대략적인 전체 질문 개수를 표시할지 여부
+# 개수는 매 요청마다 세지 않고, PYBO_APPROXIMATE_COUNT_TIMEOUT 초 동안 캐시된 값을 사용한다. (pybo/pagination.py 참고)
+PYBO_SHOW_APPROXIMATE_TOTAL = True
+PYBO_APPROXIMATE_COUNT_TIMEOUT = 60
+
+# 캐시 설정
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# default : 대략적인 전체 개수 등 일반 캐시
+# sessions : 로그인 세션과 로그인 사용자 객체 (pybo/sessions.py, pybo/auth.py 참고)
+# pages : 로그아웃 사용자용 페이지 캐시와 그 버전 키 (pybo/page_cache.py 참고)
+# 여러 개의 워커 프로세스로 실행하는 경우에는 버전 키를 프로세스끼리 공유해야 하므로, pages를 파일 기반 캐시로 바꾼다.
+# 예) 'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': BASE_DIR / 'cache' / 'pages',
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pybo-default',
+    },
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pybo-sessions',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+    'pages': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'pybo-pages',
+        'OPTIONS': {
+            'MAX_ENTRIES': 1000,
+        },
+    },
+}
+
+# 세션, 로그인 사용자 설정
+# 로그인한 사용자의 요청마다 세션과 사용자를 데이터베이스에서 조회하지 않도록, 'sessions' 캐시에 저장해 두고 사용한다.
+# 세션은 데이터베이스에도 함께 저장하며, 내용이 바뀌지 않은 세션은 저장하지 않는다. (pybo/sessions.py 참고)
+# 사용자 객체는 PYBO_USER_CACHE_TIMEOUT초 동안 캐시하고, 사용자 정보가 바뀌면 바로 지운다. (pybo/auth.py 참고)
+# 여러 개의 워커 프로세스로 실행하는 경우에는 로그아웃, 비밀번호 변경이 바로 반영되도록 sessions를 프로세스끼리 공유하는 캐시로 바꾼다.
+SESSION_ENGINE = 'pybo.sessions'
+SESSION_CACHE_ALIAS = 'sessions'
+AUTHENTICATION_BACKENDS = ['pybo.auth.CachedModelBackend']
+PYBO_USER_CACHE_TIMEOUT = 300
+
+# 로그아웃 사용자용 페이지 캐시 사용 여부, 캐시 이름, 최대 보관 시간(초)
+# 내용이 바뀌면 버전 키로 바로 무효화되므로, 보관 시간은 오래 사용하지 않는 항목을 정리하기 위한 용도이다.
+PYBO_PAGE_CACHE_ENABLED = True
+PYBO_PAGE_CACHE_ALIAS = 'pages'
+PYBO_PAGE_CACHE_TIMEOUT = 600
+
+# 성능 측정 히스토그램(pybo/metrics.py) 설정
+# 최근 PYBO_METRICS_WINDOW초 동안의 값을 PYBO_METRICS_SLOTS개의 시간 칸으로 나누어 모은다.
+PYBO_METRICS_WINDOW = 60
+PYBO_METRICS_SLOTS = 6
+
+# 질문 목록, 질문 상세 화면에 비동기 뷰(pybo/views/async_views.py)를 사용할지 여부
+# ASGI 서버로 실행할 때만 의미가 있으므로, config/asgi.py에서 환경 변수 PYBO_ASYNC_VIEWS=1을 기본값으로 설정한다.
+# (WSGI 서버에서 비동기 뷰를 사용하면 요청마다 이벤트 루프를 새로 만들어 실행하므로 오히려 느려진다.)
+PYBO_ASYNC_VIEWS = os.environ.get('PYBO_ASYNC_VIEWS') == '1'
+
+# 비동기 뷰에서 마크다운 변환에 사용할 최대 스레드 개수
+PYBO_MARKDOWN_WORKERS = 4
+
+# 추천 기록 버퍼(pybo/votes.py) 설정
+# 추천은 메모리에 모아 두었다가 PYBO_VOTE_FLUSH_INTERVAL초마다, 또는 PYBO_VOTE_BUFFER_SIZE개가 모이면 한꺼번에 저장한다.
+# PYBO_VOTE_FLUSH_INTERVAL이 None이면 백그라운드 저장 스레드를 사용하지 않고, 버퍼가 가득 찰 때 요청을 처리하는 스레드에서 저장한다.
+PYBO_VOTE_FLUSH_INTERVAL = 1.0
+PYBO_VOTE_BUFFER_SIZE = 200
+
+# 질문 목록 인기순 정렬(pybo/ranking.py)의 인기 점수 반감기 (시간)
+# update_ranking 명령을 주기적으로 실행하면, 인기 점수가 이 시간마다 절반으로 줄어든다.
+PYBO_HOT_HALF_LIFE = 24
+
+# 질문 상세 화면에 한 번에 보여줄 답변 개수 (나머지는 페이지 이동 또는 "답변 더 보기"로 불러옴)
+PYBO_ANSWERS_PER_PAGE = 20
+
+# 검색어 자동 완성(pybo/autocomplete.py) 설정
+# PYBO_AUTOCOMPLETE_MAX_QUESTIONS : 메모리에 둘 질문 제목의 최대 개수 (최근 질문부터)
+# PYBO_AUTOCOMPLETE_MAX_USERS : 메모리에 둘 사용자 이름의 최대 개수 (최근 로그인한 사용자부터)
+# PYBO_AUTOCOMPLETE_REFRESH : 다른 프로세스의 변경을 반영하기 위해 목록을 다시 만드는 간격 (초)
+PYBO_AUTOCOMPLETE_MAX_QUESTIONS = 20000
+PYBO_AUTOCOMPLETE_MAX_USERS = 5000
+PYBO_AUTOCOMPLETE_REFRESH = 600
+
+# 백그라운드 작업(pybo/tasks.py) 설정
+# PYBO_TASK_WORKERS : 프로세스 내 작업 실행 스레드 개수. 0이면 작업을 테이블에만 저장하고 run_pybo_tasks 명령(별도 워커)으로 실행
+# PYBO_TASK_QUEUE_SIZE : 스레드 풀에 대기시킬 최대 작업 개수. 넘치는 작업은 테이블에 남겨 두었다가 나중에 실행
+# PYBO_TASK_POLL_INTERVAL : 테이블에 남은 작업(재시도 등)을 조회하는 간격 (초)
+# PYBO_TASK_LEASE : 작업 실행 제한 시간 (초). 실행 중 프로세스가 종료된 작업은 이 시간이 지나면 다시 실행
+# PYBO_TASK_RETRY_DELAY, PYBO_TASK_MAX_ATTEMPTS : 실패한 작업의 첫 재시도 대기 시간 (초, 실패할 때마다 2배), 최대 실행 횟수
+# PYBO_TASKS_EAGER : True이면 큐를 사용하지 않고 등록하는 즉시 요청을 처리하는 스레드에서 실행 (테스트용)
+PYBO_TASK_WORKERS = 2
+PYBO_TASK_QUEUE_SIZE = 1000
+PYBO_TASK_POLL_INTERVAL = 5.0
+PYBO_TASK_LEASE = 300
+PYBO_TASK_RETRY_DELAY = 10
+PYBO_TASK_MAX_ATTEMPTS = 5
+PYBO_TASKS_EAGER = False
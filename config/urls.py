@@ -23,7 +23,7 @@ Including another URLconf
 
 from django.contrib import admin
 from django.urls import path, include
-from pybo.views import base_views
+from pybo.urls import index_view
 
 
 urlpatterns = [
@@ -38,5 +38,6 @@ urlpatterns = [
     # '/'에 해당되는 path
     # / 페이지 요청에 대해 아래의 해당 path('', views.index, name='index')가 작동하여 pybo/views.py 파일의 index 함수 뷰가 실행됨
     # 메인 페이지인 듯
-    path('', base_views.index, name='index'),
+    # ASGI 서버로 실행하는 경우에는 비동기 뷰 사용 (pybo/urls.py 참고)
+    path('', index_view, name='index'),
 ]
@@ -1,12 +1,176 @@
-from django.contrib import admin
-from .models import Question
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from . import deletion, page_cache, pagination, ranking, rendering, search, tasks
+from .models import Question, Answer
+
+
+# 관리자 화면 목록의 페이징
+# 장고 관리자 화면은 목록을 보여줄 때마다 전체 개수(COUNT)를 세므로, 행이 수백만 개이면 목록을 열 때마다 테이블 전체를 읽는다.
+# 같은 조건의 개수는 캐시된 값(pagination.approximate_count)을 사용한다. 마지막 페이지 번호는 대략적인 값이 된다.
+class ApproximateCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return pagination.approximate_count(self.object_list)
+
+
+# 삭제 확인 화면
+# 장고 기본 삭제 확인 화면은 함께 지워질 연결 객체를 모두 읽어 와 목록으로 보여주므로, 답변이 많은 질문이나 글을 많이 쓴 사용자는
+# 확인 화면을 여는 것만으로 수십만 개의 객체를 읽게 된다. 대신 삭제할 객체와 종류별 개수(COUNT)만 보여준다.
+class BulkDeleteMixin:
+    def get_deleted_objects(self, objs, request):
+        objs = list(objs)
+        perms_needed = set() if self.has_delete_permission(request) else {self.opts.verbose_name}
+        summary = self.summarize(self.model.objects.filter(pk__in=[obj.pk for obj in objs]))
+        return [str(obj) for obj in objs], summary, perms_needed, []
+
+    def summarize(self, queryset):
+        return {self.opts.verbose_name_plural: queryset.count()}
+
+
+# 질문/답변 관리자 화면 공통 설정
+# show_full_result_count = False : 검색 시 "전체 N건" 표시를 위한 두 번째 COUNT 쿼리를 실행하지 않음
+# raw_id_fields : 글쓴이 입력란에 사용자 전체 목록(select 박스) 대신 id 입력란 사용
+# 추천인은 추천 수 컬럼과 함께 바뀌어야 하므로 관리자 화면에서 수정하지 않는다.
+# 목록의 답변 개수, 추천 수는 카운터 컬럼을 그대로 보여주므로 행마다 COUNT 쿼리가 실행되지 않는다.
+class PostAdmin(BulkDeleteMixin, admin.ModelAdmin):
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    raw_id_fields = ['author']
+    exclude = ['voter']
+    readonly_fields = ['vote_count']
+    actions = ['delete_selected_posts', 'delete_author_posts']
+
+    # 장고 기본 "선택된 항목 삭제" 기능은 삭제할 객체와 연결된 객체를 모두 읽어 와 확인 화면을 보여준 후 하나씩 지우므로,
+    # 대신 pybo/deletion.py의 대량 삭제를 사용하는 기능으로 바꾼다.
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop('delete_selected', None)
+        return actions
+
+    # 검색은 LIKE '%검색어%' 대신 검색 색인(pybo/search.py)을 사용
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        return self.search(queryset, search_term), False
+
+    # 상세 화면의 삭제 버튼
+    def delete_model(self, request, obj):
+        self.delete_posts(self.model.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        self.delete_posts(queryset)
+
+    @admin.action(description='선택한 글 삭제', permissions=['delete'])
+    def delete_selected_posts(self, request, queryset):
+        deleted = self.delete_posts(queryset)
+        self.message_user(request, '{}건을 삭제했습니다.'.format(deleted), messages.SUCCESS)
+
+    @admin.action(description='선택한 글의 작성자가 쓴 글 모두 삭제', permissions=['delete'])
+    def delete_author_posts(self, request, queryset):
+        authors = list(queryset.order_by().values_list('author_id', flat=True).distinct())
+        deleted = self.delete_posts(self.model.objects.filter(author_id__in=authors))
+        self.message_user(request, '{}건을 삭제했습니다.'.format(deleted), messages.SUCCESS)
+
+    # 관리자 화면에서 수정한 내용도 HTML 렌더링, 검색 색인, 페이지 캐시에 반영
+    # 수정할 때는 폼에서 바뀐 컬럼만 저장한다. 답변 개수, 추천 수, 인기 점수 등은 화면에 읽기 전용으로 보여도
+    # 전체 저장(save())을 하면 화면을 열 때 읽어 둔 값으로 덮어쓰게 되므로, 그 사이에 바뀐 값을 잃는다.
+    def save_model(self, request, obj, form, change):
+        rendering.clear_content(obj)
+        if change:
+            obj.save(update_fields=[*form.changed_data, 'content_html', 'content_html_version'])
+        else:
+            obj.save()
+        tasks.enqueue(self.update_task, obj.pk)
 
 
 # Question 모델에 세부 기능을 추가할, QuestionAdmin 클래스 생성
-class QuestionAdmin(admin.ModelAdmin):
-    # 제목 검색 기능 추가
+class QuestionAdmin(PostAdmin):
+    list_display = ['id', 'subject', 'author', 'create_date', 'answer_count', 'vote_count']
+    # 목록의 글쓴이를 조인으로 함께 가져옴 (행마다 사용자 조회 쿼리가 실행되지 않도록)
+    list_select_related = ['author']
+    # (create_date, id) 인덱스 순서대로 읽음
+    ordering = ['-create_date', '-id']
+    # 제목, 내용, 글쓴이 검색 기능 추가 (검색 색인 사용)
     search_fields = ['subject']
+    readonly_fields = ['answer_count', 'vote_count']
+    update_task = staticmethod(tasks.update_question)
+
+    def search(self, queryset, search_term):
+        return search.search_questions(queryset, search_term)
+
+    def delete_posts(self, queryset):
+        return deletion.delete_questions(queryset)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        page_cache.invalidate(obj.pk)
+
+
+# Answer 모델 관리자 화면
+class AnswerAdmin(PostAdmin):
+    list_display = ['id', 'summary', 'question', 'author', 'create_date', 'vote_count']
+    list_select_related = ['author', 'question']
+    # (question, create_date, id) 인덱스와 같은 순서는 질문별 목록에서만 쓸 수 있으므로 id 순서(기본키)로 정렬
+    ordering = ['-id']
+    raw_id_fields = ['author', 'question']
+    search_fields = ['content']
+    update_task = staticmethod(tasks.update_answer)
+
+    @admin.display(description='내용')
+    def summary(self, obj):
+        return obj.content[:50]
+
+    def search(self, queryset, search_term):
+        return search.search_answers(queryset, search_term)
+
+    def delete_posts(self, queryset):
+        return deletion.delete_answers(queryset)
+
+    # 답변을 추가한 경우 질문의 답변 개수, 정렬용 컬럼도 함께 갱신 (answer_views.answer_create와 같음)
+    # 답변을 다른 질문으로 옮긴 경우 원래 질문과 새 질문의 답변 개수, 인기 점수, 최근 활동 일시를 함께 갱신
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            previous = None
+            if change:
+                previous = Answer.objects.filter(pk=obj.pk).values_list('question_id', flat=True).first()
+            super().save_model(request, obj, form, change)
+            if not change:
+                Question.objects.filter(pk=obj.question_id).update(answer_count=F('answer_count') + 1,
+                                                                   **ranking.answer_created(obj.create_date))
+            elif previous != obj.question_id:
+                Question.objects.filter(pk=previous).update(answer_count=F('answer_count') - 1,
+                                                            **ranking.answer_removed())
+                Question.objects.filter(pk=obj.question_id).update(answer_count=F('answer_count') + 1,
+                                                                   **ranking.answer_created(timezone.now()))
+        page_cache.invalidate(obj.question_id)
+        if previous is not None and previous != obj.question_id:
+            page_cache.invalidate(previous)
+
+
+# User 모델 관리자 화면
+# 사용자 삭제 시 사용자의 질문, 답변, 추천을 대량 삭제(pybo/deletion.py)로 먼저 지운다.
+class PyboUserAdmin(BulkDeleteMixin, UserAdmin):
+    def summarize(self, queryset):
+        return deletion.summarize_users(queryset)
+
+    def delete_model(self, request, obj):
+        deletion.delete_users(User.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        deletion.delete_users(queryset)
+
 
-# Question 모델을 장고 관리자(Admin 페이지)에 등록
-# QuestionAdmin 클래스의 내용 반영
+# Question, Answer 모델을 장고 관리자(Admin 페이지)에 등록
+# QuestionAdmin, AnswerAdmin 클래스의 내용 반영
 admin.site.register(Question, QuestionAdmin)
+admin.site.register(Answer, AnswerAdmin)
+admin.site.unregister(User)
+admin.site.register(User, PyboUserAdmin)
@@ -4,3 +4,25 @@ from django.apps import AppConfig
 class PyboConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pybo'
+
+    def ready(self):
+        from django.contrib.auth.models import User
+        from django.contrib.auth.signals import user_logged_out
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from . import auth, autocomplete, database, metrics, tasks
+
+        # 데이터베이스 연결마다 SQL 실행 시간 측정 함수 등록 (pybo/metrics.py 참고)
+        connection_created.connect(metrics.install_sql_wrapper)
+        # 데이터베이스 연결마다 SQLite PRAGMA 설정 (pybo/database.py 참고)
+        connection_created.connect(database.configure_sqlite)
+        # 사용자 가입/삭제 시 검색어 자동 완성 목록 갱신 (pybo/autocomplete.py 참고)
+        post_save.connect(autocomplete.user_saved, sender=User)
+        post_delete.connect(autocomplete.user_deleted, sender=User)
+        # 사용자 정보 변경(비밀번호 변경 등), 삭제, 로그아웃 시 사용자 조회 캐시 삭제 (pybo/auth.py 참고)
+        post_save.connect(auth.forget_user, sender=User)
+        post_delete.connect(auth.forget_user, sender=User)
+        user_logged_out.connect(auth.forget_user)
+        # 요청을 처리하는 프로세스에서 백그라운드 작업 실행기 시작 (pybo/tasks.py 참고)
+        request_started.connect(tasks.start_executor)
@@ -0,0 +1,256 @@
+# 질문 보관(archive) 관련 모듈
+# 질문/답변 테이블은 계속 커지기만 하므로, 아무도 읽지 않는 오래된 질문도 모든 인덱스, 목록/검색 쿼리, 백업의 크기를 키운다.
+# 그래서 최근 활동 일시(last_activity)가 오래된 질문을 답변, 추천과 함께 보관 테이블(ArchivedQuestion)의 한 행으로 옮긴다. (hot/cold 분리)
+#
+# - 질문 내용과 답변 목록은 JSON으로 만들어 zlib으로 압축하고, 추천인은 8바이트 정수 배열로 붙여 저장한다.
+# - 검색 색인은 (질문, 토큰)마다 한 행으로 줄여 보관용 색인 테이블(ArchivedSearchToken)로 옮긴다.
+# - 원래 질문 id를 그대로 사용하므로, 질문 상세 화면(base_views.detail)은 질문이 없으면 보관 테이블에서 찾아 읽기 전용으로 보여준다.
+# - 질문 목록의 검색 결과에는 보관된 질문 중 일치하는 질문도 함께 보여준다.
+# - restore_questions로 다시 질문/답변 테이블로 되돌릴 수 있다. (id, 작성 일시, 추천인 등 그대로)
+#
+# 보관은 archive_pybo 명령으로 실행하며, batch_size개의 질문씩 하나의 트랜잭션으로 옮긴다.
+# 보관된 질문은 바뀌지 않으므로, 글쓴이나 추천인이 탈퇴해도 보관된 답변과 추천 수는 그대로 둔다. (글쓴이 이름만 표시되지 않음)
+
+
+import json
+import sys
+import zlib
+from array import array
+from collections import defaultdict
+from itertools import chain
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.db import OperationalError, connection, transaction
+from django.db.models import Count, Sum
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import autocomplete, deletion, page_cache, rendering, search
+from .counters import count_subquery
+from .models import Question, Answer, SearchToken, ArchivedQuestion, ArchivedSearchToken
+
+
+# 한 번에 옮길 질문 개수
+BATCH_SIZE = 100
+
+
+# 정수 id 목록 ↔ 8바이트 정수(little endian) 배열
+def pack_ids(ids):
+    packed = array('q', ids)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def unpack_ids(data):
+    packed = array('q')
+    packed.frombytes(bytes(data))
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tolist()
+
+
+def _dumps(value):
+    return zlib.compress(json.dumps(value, separators=(',', ':'), ensure_ascii=False).encode(), 9)
+
+
+def _loads(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def _date(value):
+    return value.isoformat() if value else None
+
+
+# 질문 보관. queryset : 보관할 질문의 QuerySet. 옮긴 질문 개수와 압축 전/후 바이트 수를 리턴
+def archive_questions(queryset, batch_size=BATCH_SIZE):
+    stats = {'questions': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+    ids = queryset.order_by().values_list('id', flat=True)
+    while True:
+        batch = list(ids[:batch_size])
+        if not batch:
+            break
+        for key, value in _archive_batch(batch).items():
+            stats[key] += value
+    return stats
+
+
+def _archive_batch(ids):
+    stats = {'questions': len(ids), 'raw_bytes': 0, 'stored_bytes': 0}
+    now = timezone.now()
+    with transaction.atomic():
+        answers = defaultdict(list)
+        for answer in Answer.objects.filter(question_id__in=ids).order_by('create_date', 'id').values(
+                'id', 'question_id', 'author_id', 'content', 'create_date', 'modify_date', 'vote_count'):
+            answers[answer.pop('question_id')].append(dict(
+                answer, create_date=_date(answer['create_date']), modify_date=_date(answer['modify_date'])))
+        voters = defaultdict(list)
+        for question_id, user_id in Question.voter.through.objects.filter(question_id__in=ids).values_list(
+                'question_id', 'user_id'):
+            voters[question_id].append(user_id)
+        answer_voters = defaultdict(list)
+        for question_id, answer_id, user_id in Answer.voter.through.objects.filter(
+                answer__question_id__in=ids).values_list('answer__question_id', 'answer_id', 'user_id'):
+            answer_voters[question_id] += [answer_id, user_id]
+        archived = []
+        for question in Question.objects.filter(id__in=ids).order_by('id'):
+            body = {'content': question.content, 'answers': answers[question.id]}
+            row = ArchivedQuestion(
+                id=question.id, author_id=question.author_id, subject=question.subject,
+                create_date=question.create_date, modify_date=question.modify_date,
+                last_activity=question.last_activity, answer_count=question.answer_count,
+                vote_count=question.vote_count, body=_dumps(body), voters=pack_ids(voters[question.id]),
+                answer_voters=pack_ids(answer_voters[question.id]), archive_date=now,
+            )
+            stats['raw_bytes'] += len(question.content.encode()) + sum(
+                len(answer['content'].encode()) for answer in body['answers'])
+            stats['stored_bytes'] += len(row.body)
+            archived.append(row)
+        ArchivedQuestion.objects.bulk_create(archived)
+        ArchivedSearchToken.objects.bulk_create([
+            ArchivedSearchToken(question_id=row['question_id'], token=row['token'], weight=row['weight'])
+            for row in SearchToken.objects.filter(question_id__in=ids).order_by().values(
+                'question_id', 'token').annotate(weight=Sum('weight'))
+        ], batch_size=deletion.BATCH_SIZE)
+        # 질문, 답변, 추천인, 검색 색인 행 삭제 (자동 완성 목록, 페이지 캐시도 함께 정리)
+        deletion.delete_questions(Question.objects.filter(id__in=ids), batch_size=len(ids))
+    return stats
+
+
+# 보관된 질문 복원. queryset : 복원할 ArchivedQuestion의 QuerySet. 복원한 질문 개수를 리턴
+def restore_questions(queryset, batch_size=BATCH_SIZE):
+    restored = 0
+    ids = queryset.order_by().values_list('id', flat=True)
+    while True:
+        batch = list(ids[:batch_size])
+        if not batch:
+            break
+        restored += _restore_batch(batch)
+    if restored:
+        page_cache.bump('board')
+    return restored
+
+
+def _restore_batch(ids):
+    with transaction.atomic():
+        questions, answers, question_voters, answer_voters = [], [], [], []
+        for row in ArchivedQuestion.objects.filter(id__in=ids):
+            body = _loads(row.body)
+            question = Question(
+                id=row.id, author_id=row.author_id, subject=row.subject, content=body['content'],
+                create_date=row.create_date, modify_date=row.modify_date, last_activity=row.last_activity,
+                answer_count=row.answer_count, vote_count=row.vote_count,
+            )
+            rendering.render_content(question)
+            questions.append(question)
+            for data in body['answers']:
+                answer = Answer(question_id=row.id, **dict(
+                    data, create_date=parse_datetime(data['create_date']),
+                    modify_date=data['modify_date'] and parse_datetime(data['modify_date'])))
+                rendering.render_content(answer)
+                answers.append(answer)
+            question_voters += [Question.voter.through(question_id=row.id, user_id=user_id)
+                                for user_id in unpack_ids(row.voters)]
+            pairs = unpack_ids(row.answer_voters)
+            answer_voters += [Answer.voter.through(answer_id=answer_id, user_id=user_id)
+                              for answer_id, user_id in zip(pairs[::2], pairs[1::2])]
+        # 보관 중에 탈퇴한 사용자의 답변, 추천은 복원하지 않음
+        users = set(User.objects.filter(
+            id__in={obj.author_id for obj in chain(questions, answers)} | {v.user_id for v in question_voters}
+            | {v.user_id for v in answer_voters}).values_list('id', flat=True))
+        questions = [question for question in questions if question.author_id in users]
+        answers = [answer for answer in answers if answer.author_id in users]
+        answer_ids = {answer.id for answer in answers}
+        Question.objects.bulk_create(questions)
+        Answer.objects.bulk_create(answers, batch_size=deletion.BATCH_SIZE)
+        Question.voter.through.objects.bulk_create([v for v in question_voters if v.user_id in users],
+                                                   batch_size=deletion.BATCH_SIZE)
+        Answer.voter.through.objects.bulk_create(
+            [v for v in answer_voters if v.user_id in users and v.answer_id in answer_ids],
+            batch_size=deletion.BATCH_SIZE)
+        # 검색 색인은 질문/답변 단위로 다시 생성
+        authors = User.objects.in_bulk(users)
+        for obj in chain(questions, answers):
+            obj.author = authors[obj.author_id]
+        SearchToken.objects.bulk_create(chain(
+            chain.from_iterable(search.question_tokens(question) for question in questions),
+            chain.from_iterable(search.answer_tokens(answer) for answer in answers),
+        ), batch_size=deletion.BATCH_SIZE)
+        # 탈퇴한 사용자의 답변, 추천을 빼고 복원했으므로 카운터 컬럼을 다시 계산
+        restored = Question.objects.filter(id__in=ids)
+        restored.update(answer_count=count_subquery(Answer, 'question'),
+                        vote_count=count_subquery(Question.voter.through, 'question'))
+        Answer.objects.filter(question__in=restored).update(vote_count=count_subquery(Answer.voter.through, 'answer'))
+        deletion.delete_archived(ArchivedQuestion.objects.filter(id__in=ids))
+    for question in questions:
+        autocomplete.index.add_question(question.id, question.subject)
+    page_cache.bump(*['question:{}'.format(question_id) for question_id in ids])
+    return len(questions)
+
+
+# 보관된 질문의 상세 화면 데이터 (질문, 답변 목록). 보관된 질문이 없으면 Http404
+# 질문/답변은 템플릿에서 모델 객체처럼 사용할 수 있는 SimpleNamespace로 만든다.
+# 저장된 HTML이 없으므로 mark_content 필터가 LRU 캐시로 렌더링한다. (pybo/rendering.py 참고)
+def get_thread(question_id):
+    row = ArchivedQuestion.objects.filter(pk=question_id).first()
+    if row is None:
+        raise Http404('질문이 없습니다.')
+    body = _loads(row.body)
+    authors = User.objects.in_bulk({row.author_id} | {answer['author_id'] for answer in body['answers']})
+
+    def post(**values):
+        return SimpleNamespace(content_html='', content_html_version='', **values)
+
+    question = post(
+        id=row.id, subject=row.subject, content=body['content'], author=authors.get(row.author_id),
+        create_date=row.create_date, modify_date=row.modify_date, vote_count=row.vote_count,
+        answer_count=row.answer_count, archive_date=row.archive_date,
+    )
+    answers = [post(
+        id=answer['id'], content=answer['content'], author=authors.get(answer['author_id']),
+        create_date=parse_datetime(answer['create_date']),
+        modify_date=answer['modify_date'] and parse_datetime(answer['modify_date']), vote_count=answer['vote_count'],
+    ) for answer in body['answers']]
+    return question, answers
+
+
+# 보관된 질문 검색 (질문 목록 화면의 검색 결과에 함께 표시)
+# 질문 검색(search.search_questions)과 같은 방식으로, 압축된 내용(body) 등은 읽지 않는다.
+def search_archived(kw, limit=10):
+    tokens = search.tokenize(kw)
+    if not tokens:
+        return []
+    return list(ArchivedQuestion.objects.filter(
+        archivedsearchtoken__token__in=tokens
+    ).annotate(
+        search_hits=Count('archivedsearchtoken__token', distinct=True),
+        search_score=Sum('archivedsearchtoken__weight'),
+    ).filter(
+        search_hits=len(tokens)
+    ).select_related('author').defer('body', 'voters', 'answer_voters').order_by(
+        '-search_score', '-create_date', '-id'
+    )[:limit])
+
+
+# 자주 읽는(hot) 테이블의 행 개수와 크기(바이트), 보관 테이블의 크기 (archive_pybo 명령에서 보관 전후 비교에 사용)
+# 크기는 SQLite의 dbstat 가상 테이블로 테이블과 인덱스의 페이지 크기를 합산한다. (dbstat을 사용할 수 없으면 행 개수만)
+HOT_MODELS = [Question, Answer, Question.voter.through, Answer.voter.through, SearchToken]
+COLD_MODELS = [ArchivedQuestion, ArchivedSearchToken]
+
+
+def working_set():
+    sizes = {}
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT COALESCE(m.tbl_name, d.name), SUM(d.pgsize) FROM dbstat d "
+                "LEFT JOIN sqlite_master m ON m.name = d.name GROUP BY 1")
+            sizes = dict(cursor.fetchall())
+    except OperationalError:
+        pass
+    return {
+        model._meta.db_table: {'rows': model.objects.count(), 'bytes': sizes.get(model._meta.db_table)}
+        for model in HOT_MODELS + COLD_MODELS
+    }
@@ -0,0 +1,39 @@
+# 사용자 조회 캐시 인증 백엔드 (AUTHENTICATION_BACKENDS = ['pybo.auth.CachedModelBackend'])
+# AuthenticationMiddleware는 로그인한 사용자의 요청마다 세션의 사용자 id로 사용자 테이블을 조회한다.
+# 이 백엔드는 조회한 사용자 객체를 캐시에 PYBO_USER_CACHE_TIMEOUT초 동안 저장해 두고 다시 사용한다.
+#
+# 비밀번호 변경 등으로 사용자 정보가 저장, 삭제되거나 로그아웃하면 캐시를 바로 지운다. (pybo/apps.py에서 신호에 연결)
+# 장고는 세션에 저장된 비밀번호 해시 값과 사용자 객체의 값을 비교하므로, 캐시가 지워지면 비밀번호 변경 전의 세션은 로그아웃된다.
+# 캐시는 프로세스끼리 공유되어야 다른 프로세스에서 처리한 변경도 바로 반영된다. (프로세스별 캐시이면 최대 PYBO_USER_CACHE_TIMEOUT초 늦어짐)
+
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+
+def get_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return 'pybo:user:{}'.format(user_id)
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        cache = get_cache()
+        key = _user_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.PYBO_USER_CACHE_TIMEOUT)
+        return user
+
+
+# 사용자 정보가 바뀌면 캐시 삭제 (post_save, post_delete, user_logged_out 신호)
+def forget_user(sender, instance=None, user=None, **kwargs):
+    user = instance or user
+    if user is not None and user.pk is not None:
+        get_cache().delete(_user_key(user.pk))
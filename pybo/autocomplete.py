@@ -0,0 +1,157 @@
+# 검색어 자동 완성 관련 모듈
+# 검색 창에 글자를 입력할 때마다 검색 쿼리를 실행하지 않도록, 질문 제목과 사용자 이름을 프로세스 메모리의 정렬된 배열에 두고
+# bisect로 접두어(prefix)가 일치하는 범위를 찾는다. 데이터베이스를 조회하지 않으므로 입력마다 요청해도 비용이 작다.
+#
+# - 처음 자동 완성을 요청할 때 최근 질문 PYBO_AUTOCOMPLETE_MAX_QUESTIONS개의 제목과
+#   최근 로그인한 사용자 PYBO_AUTOCOMPLETE_MAX_USERS명의 이름으로 만든다. (lazy)
+# - 질문 등록/수정/삭제, 사용자 가입/삭제 시 배열에 바로 반영한다. (같은 프로세스에서 처리한 변경)
+# - 다른 프로세스에서 처리한 변경은 PYBO_AUTOCOMPLETE_REFRESH초마다 백그라운드 스레드에서 다시 만들어 반영한다.
+#   다시 만드는 동안에는 이전 배열로 응답한다.
+# - 질문 제목, 사용자 이름이 최대 개수를 넘으면 가장 먼저 넣은(오래된) 항목부터 빼므로, 메모리 사용량이 제한된다.
+
+
+import bisect
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections
+from django.db.models import F
+
+from .models import Question
+
+
+logger = logging.getLogger(__name__)
+
+# 저장할 제목의 최대 글자 수
+MAX_TEXT_LENGTH = 100
+
+
+# 접두어 비교용 문자열 (대소문자 무시)
+def normalize(text):
+    return text.strip().casefold()
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = None  # [(비교용 문자열, 종류, id, 제목/이름), ...] 정렬된 배열. 만들기 전에는 None
+        self._questions = {}  # 질문 id : 배열 항목 (넣은 순서 유지, 오래된 질문부터 빼기 위해 사용)
+        self._users = {}  # 사용자 이름 : 배열 항목 (넣은 순서 유지)
+        self._built_at = 0
+        self._rebuilding = False
+
+    def __len__(self):
+        return len(self._entries or ())
+
+    # 접두어가 일치하는 항목 최대 limit개 : [(종류, id, 제목/이름), ...]
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        self._ensure_built()
+        with self._lock:
+            entries = self._entries
+            start = bisect.bisect_left(entries, (prefix,))
+            results = []
+            for key, kind, pk, text in entries[start:start + limit]:
+                if not key.startswith(prefix):
+                    break
+                results.append((kind, pk, text))
+        return results
+
+    # 질문 등록, 수정 시 호출 (수정이면 이전 제목을 빼고 새 제목을 넣음)
+    def add_question(self, question_id, subject):
+        with self._lock:
+            if self._entries is None:
+                return
+            self._remove(self._questions.pop(question_id, None))
+            entry = self._entry('question', question_id, subject[:MAX_TEXT_LENGTH])
+            self._questions[question_id] = entry
+            bisect.insort(self._entries, entry)
+            while len(self._questions) > settings.PYBO_AUTOCOMPLETE_MAX_QUESTIONS:
+                self._remove(self._questions.pop(next(iter(self._questions))))
+
+    # 질문 삭제 시 호출
+    def remove_question(self, question_id):
+        with self._lock:
+            if self._entries is not None:
+                self._remove(self._questions.pop(question_id, None))
+
+    # 사용자 가입 시 호출
+    def add_user(self, username):
+        with self._lock:
+            if self._entries is not None and username not in self._users:
+                self._users[username] = entry = self._entry('user', 0, username)
+                bisect.insort(self._entries, entry)
+                while len(self._users) > settings.PYBO_AUTOCOMPLETE_MAX_USERS:
+                    self._remove(self._users.pop(next(iter(self._users))))
+
+    # 사용자 삭제 시 호출
+    def remove_user(self, username):
+        with self._lock:
+            if self._entries is not None:
+                self._remove(self._users.pop(username, None))
+
+    # 배열 비우기. 다음 요청 때 다시 만든다. (테스트용)
+    def reset(self):
+        with self._lock:
+            self._entries = None
+            self._questions, self._users = {}, {}
+
+    def _entry(self, kind, pk, text):
+        return normalize(text), kind, pk, text
+
+    def _remove(self, entry):
+        if entry is None:
+            return
+        i = bisect.bisect_left(self._entries, entry)
+        if i < len(self._entries) and self._entries[i] == entry:
+            del self._entries[i]
+
+    # 배열이 없으면 지금 만들고, 오래되었으면 백그라운드에서 다시 만든다.
+    def _ensure_built(self):
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._build()
+        elif time.monotonic() - self._built_at > settings.PYBO_AUTOCOMPLETE_REFRESH and not self._rebuilding:
+            self._rebuilding = True
+            threading.Thread(target=self._rebuild, name='pybo-autocomplete', daemon=True).start()
+
+    def _rebuild(self):
+        try:
+            self._build()
+        except Exception:
+            logger.exception('자동 완성 목록 생성 실패')
+        finally:
+            self._rebuilding = False
+            close_old_connections()
+
+    # 최근 질문 제목과 최근 로그인한 사용자 이름으로 배열 만들기 (오래된 항목부터 넣음)
+    def _build(self):
+        limit = settings.PYBO_AUTOCOMPLETE_MAX_QUESTIONS
+        rows = list(Question.objects.order_by('-id').values_list('id', 'subject')[:limit])
+        questions = {pk: self._entry('question', pk, subject[:MAX_TEXT_LENGTH]) for pk, subject in reversed(rows)}
+        names = list(User.objects.order_by(F('last_login').desc(nulls_last=True), '-id').values_list(
+            'username', flat=True)[:settings.PYBO_AUTOCOMPLETE_MAX_USERS])
+        users = {name: self._entry('user', 0, name) for name in reversed(names)}
+        entries = sorted([*questions.values(), *users.values()])
+        with self._lock:
+            self._entries, self._questions, self._users = entries, questions, users
+            self._built_at = time.monotonic()
+
+
+index = PrefixIndex()
+
+
+# 사용자 가입/삭제 시 자동 완성 목록 갱신 (pybo/apps.py에서 post_save, post_delete 신호에 연결)
+def user_saved(sender, instance, created, **kwargs):
+    if created:
+        index.add_user(instance.username)
+
+
+def user_deleted(sender, instance, **kwargs):
+    index.remove_user(instance.username)
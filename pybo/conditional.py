@@ -0,0 +1,132 @@
+# 조건부 요청(Conditional GET) 관련 모듈
+# 질문 목록, 질문 상세 화면의 응답에 ETag 헤더를 붙이고, 브라우저나 프록시가 같은 ETag로 다시 요청하면(If-None-Match)
+# 템플릿 렌더링과 마크다운 변환 없이 본문이 없는 304 Not Modified 응답을 돌려준다.
+#
+# ETag는 화면 내용이 바뀌면 함께 바뀌는 값들로 만든다.
+# - 질문 목록 : 'board' 버전(pybo/page_cache.py). 질문/답변이 등록, 수정, 삭제되면 바뀜. 데이터베이스 조회 없음
+# - 질문 상세 : 질문의 작성/수정 일시, 추천 수, 답변 개수와 답변들의 최근 작성/수정 일시, 추천 수 합계, 답변 페이지/정렬 방식
+#   조건부 요청이면 이 값들을 쿼리 한 번으로 조회하여 비교하고, 그 외에는 화면을 만들 때 질문과 함께 조회한 값으로 계산하여 응답에 붙인다.
+# 로그인한 사용자마다 수정/삭제 버튼 등 화면이 다르므로 사용자 id도 포함하고, Vary: Cookie 헤더를 붙인다.
+# CSRF 토큰은 응답마다 다르게 마스킹되므로 내용이 완전히 같지는 않다. 그래서 약한(weak) ETag를 사용한다.
+#
+# 추천 수는 작성/수정 일시 같은 시각 정보가 없어서 Last-Modified 값에 반영할 수 없다.
+# 그래서 Last-Modified는 사용하지 않는다. 추천 후에도 If-Modified-Since 요청에 304가 응답되는 일을 막기 위함이다.
+
+
+import asyncio
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from django.utils.translation import get_language
+
+from . import page_cache, rendering
+from .models import Question
+
+
+def _etag(*values):
+    raw = '|'.join(str(value) for value in values)
+    return 'W/' + quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def _user_key(request):
+    return request.user.pk if request.user.is_authenticated else 0
+
+
+# 질문 목록 화면의 ETag
+def board_etag(request):
+    return _etag('board', page_cache.get_versions(['board'])[0], _user_key(request), get_language())
+
+
+# 질문 상세 화면의 ETag에 사용하는 답변 전체의 집계 값 (질문 쿼리에 annotate하여 사용)
+# 답변은 한 페이지씩만 조회하므로, 다른 페이지의 답변이 바뀐 것도 알 수 있도록 전체 답변으로 집계한다.
+def answer_aggregates():
+    return {
+        'answer_created': Max('answer__create_date'),
+        'answer_modified': Max('answer__modify_date'),
+        'answer_votes': Sum('answer__vote_count'),
+    }
+
+
+ETAG_FIELDS = ('create_date', 'modify_date', 'vote_count', 'answer_count',
+               'answer_created', 'answer_modified', 'answer_votes')
+
+
+# 질문 상세 화면의 ETag. 질문이 없으면 None (뷰에서 404 응답)
+# If-None-Match 헤더가 있는 요청에서만 사용하므로, 조건부 요청이 아니면 쿼리가 추가되지 않는다.
+def question_etag(request, question_id):
+    values = Question.objects.filter(pk=question_id).annotate(
+        **answer_aggregates()
+    ).values_list(*ETAG_FIELDS).first()
+    if values is None:
+        return None
+    return _question_etag(request, question_id, values)
+
+
+# answer_aggregates()를 annotate하여 조회한 질문으로 만드는 질문 상세 화면의 ETag (question_etag와 같은 값)
+# 질문 상세 뷰에서 응답에 붙일 때 사용하므로 쿼리를 실행하지 않는다.
+def question_etag_for(request, question):
+    return _question_etag(request, question.id, [getattr(question, field) for field in ETAG_FIELDS])
+
+
+# 답변 페이지, 정렬 방식(쿼리 문자열)마다 화면이 다르므로 함께 포함
+def _question_etag(request, question_id, values):
+    return _etag('question', question_id, *values, request.META.get('QUERY_STRING', ''),
+                 rendering.RENDER_VERSION, _user_key(request), get_language())
+
+
+# ETag 계산, 비교. 304 응답을 보낼 수 있으면 (ETag, 304 응답), 아니면 (ETag, None)
+# 화면에 보여줄 메시지(messages 쿠키)가 있으면 화면을 다시 그려야 하므로 사용하지 않는다.
+# cheap=False인 ETag 함수(쿼리 실행)는 If-None-Match 헤더가 있는 요청에서만 호출하고, 그 외에는 뷰에서 응답에 붙인 ETag를 사용한다.
+def _check(etag_func, cheap, request, kwargs):
+    if request.method not in ('GET', 'HEAD') or 'messages' in request.COOKIES:
+        return None, None
+    if not cheap and 'HTTP_IF_NONE_MATCH' not in request.META:
+        return None, None
+    etag = etag_func(request, **kwargs)
+    if etag is None:
+        return None, None
+    return etag, get_conditional_response(request, etag=etag)
+
+
+def _finish(request, response, etag):
+    if response.status_code not in (200, 304) or 'messages' in request.COOKIES:
+        return response
+    if etag and not response.has_header('ETag'):
+        response['ETag'] = etag
+    if response.has_header('ETag'):
+        # 브라우저, 프록시가 저장해 두되 사용할 때마다 ETag로 확인하도록 함. 로그인한 사용자의 화면은 프록시에 저장하지 않음
+        patch_cache_control(response, no_cache=True)
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True)
+        patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+# ETag를 사용하는 뷰 데코레이터 (django.views.decorators.http.condition과 같은 역할)
+# etag_func(request, **kwargs) : ETag를 만드는 함수
+# cheap : etag_func가 데이터베이스를 조회하지 않는 경우 True. False이면 뷰에서 응답에 ETag를 직접 붙여야 한다.
+# 동기 뷰와 비동기 뷰(async def) 모두에 사용할 수 있다.
+def conditional_page(etag_func, cheap=True):
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                etag, response = await sync_to_async(_check)(etag_func, cheap, request, kwargs)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                # request.user 확인 시 세션/사용자 조회 쿼리가 실행될 수 있으므로 sync_to_async로 실행
+                return await sync_to_async(_finish)(request, response, etag)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            etag, response = _check(etag_func, cheap, request, kwargs)
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+            return _finish(request, response, etag)
+        return wrapper
+    return decorator
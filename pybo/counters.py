@@ -0,0 +1,16 @@
+# 카운터 컬럼 관련 모듈
+# Question.answer_count, Question.vote_count, Answer.vote_count 같은 카운터 컬럼을 실제 행 개수로 다시 계산할 때 사용한다.
+# (추천 저장 pybo/votes.py, 대량 삭제 pybo/deletion.py, 질문 보관 pybo/archive.py, recount 명령)
+
+
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+# model의 pk와 연결된 related_model 행의 개수를 구하는 서브쿼리
+# 연결된 행이 없으면 NULL이 되므로 Coalesce로 0을 대신 사용
+def count_subquery(related_model, field):
+    subquery = related_model.objects.filter(
+        **{field: OuterRef('pk')}
+    ).order_by().values(field).annotate(cnt=Count('*')).values('cnt')
+    return Coalesce(Subquery(subquery), Value(0))
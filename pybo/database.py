@@ -0,0 +1,48 @@
+# 데이터베이스 연결 설정 관련 모듈
+# config/settings.py의 운영용 데이터베이스 프로필(PYBO_DB_PROFILE=production)에서 사용한다.
+# 1) configure_sqlite : 연결이 만들어질 때 SQLite PRAGMA 설정 (WAL 모드 등)
+# 2) ReadWriteRouter : pybo 모델의 읽기는 읽기 전용 연결(PYBO_READ_DATABASE)로, 쓰기는 주 연결(default)로 보내는 데이터베이스 라우터
+#
+# WAL(Write-Ahead Logging) 모드에서는 쓰기 중에도 읽기가 막히지 않으므로, 여러 요청이 동시에 읽고 쓸 때
+# "database is locked" 오류와 대기가 크게 줄어든다. 읽기 전용 연결을 따로 두면 읽기 요청이 쓰기 트랜잭션과 섞이지 않는다.
+
+
+from django.conf import settings
+from django.db import connections
+
+
+# 연결이 만들어질 때 PYBO_SQLITE_PRAGMAS의 PRAGMA 설정 적용 (PyboConfig.ready에서 connection_created 시그널에 연결)
+# 읽기 전용 연결에는 query_only를 설정하여, 실수로 쓰기 쿼리가 실행되면 오류가 나도록 한다.
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite' or not settings.PYBO_SQLITE_PRAGMAS:
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.PYBO_SQLITE_PRAGMAS.items():
+            cursor.execute('PRAGMA {} = {}'.format(name, value))
+        if connection.alias == settings.PYBO_READ_DATABASE:
+            cursor.execute('PRAGMA query_only = ON')
+
+
+# 읽기/쓰기 분리 데이터베이스 라우터 (config/settings.py의 DATABASE_ROUTERS에 등록)
+# 두 연결은 같은 데이터베이스 파일을 사용하므로 복제 지연은 없다.
+class ReadWriteRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label != 'pybo' or not settings.PYBO_READ_DATABASE:
+            return None
+        # 쓰기 트랜잭션 안에서는 아직 커밋하지 않은 변경 내용을 읽을 수 있도록 주 연결 사용
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return settings.PYBO_READ_DATABASE
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != 'pybo':
+            return None
+        return 'default'
+
+    # 두 연결이 같은 데이터를 가리키므로 어느 연결에서 읽은 객체끼리든 관계를 맺을 수 있음
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    # 테이블 생성, 변경은 주 연결에서만
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
@@ -0,0 +1,167 @@
+# 대량 삭제 관련 모듈
+# 모델 객체의 delete()나 QuerySet.delete()는 장고의 Collector가 연결된 답변, 추천인 행 등을 모두 파이썬 객체로 읽어 온 후 삭제하므로,
+# 답변이 많은 질문이나 여러 질문을 한꺼번에 지우면 메모리 사용량과 쿼리 수가 삭제할 행 개수만큼 늘어난다.
+# 그래서 연결된 행은 읽어 오지 않고 id 조건의 DELETE 문(set-based)으로 지운다.
+#
+# - 삭제할 글의 id를 batch_size개씩 나누어, 묶음마다 하나의 트랜잭션으로 지운다.
+#   메모리에는 id 한 묶음만 올라오고, 데이터베이스 쓰기 잠금도 한 묶음을 지우는 동안만 잡는다.
+# - 연결된 행부터 지운다. (검색 색인 → 추천인 → 답변 → 질문)
+# - 답변, 추천을 지우면 질문/답변의 답변 개수, 추천 수 컬럼을 실제 개수로 다시 계산하고, 줄어든 만큼 질문의 인기 점수에서 뺀다.
+# - 삭제 후 페이지 캐시, 검색어 자동 완성 목록에서도 지운다.
+# - 사용자를 삭제할 때는 사용자의 질문, 답변, 추천을 먼저 같은 방식으로 지운 후 사용자 행을 지운다.
+#
+# 질문/답변 삭제 뷰, 관리자 화면(pybo/admin.py), bulk_delete 명령에서 사용한다.
+#
+# 삭제 신호(pre_delete, post_delete)는 발생하지 않으므로, 질문/답변에 삭제 신호를 연결하면 여기에도 같은 처리를 추가해야 한다.
+
+
+from django.db import connections, router, transaction
+
+from . import autocomplete, page_cache, ranking
+from .counters import count_subquery
+from .models import Question, Answer, SearchToken, ArchivedQuestion, ArchivedSearchToken
+
+
+# SQLite의 쿼리 변수 개수 제한(999)보다 작게
+BATCH_SIZE = 500
+
+
+# 다른 모델이 참조하지 않는 모델(검색 색인, 추천인)의 행을 삭제하고, 삭제한 행 개수를 리턴
+# 참조하는 모델과 삭제 신호가 없으므로 장고가 삭제할 행을 읽어 오지 않고 DELETE 문 하나로 지운다. (fast delete)
+def delete_rows(queryset):
+    deleted, _ = queryset.delete()
+    return deleted
+
+
+# 다른 모델이 참조하는 모델(질문, 답변, 보관된 질문)의 행 중 field 값이 values에 있는 행을 삭제하고, 삭제한 행 개수를 리턴
+# QuerySet.delete()는 연결된 행을 찾기 위해 삭제할 행을 먼저 읽어 오므로, 참조하는 행을 모두 지운 후 DELETE 문을 직접 실행한다.
+def delete_where(model, field, values):
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    sql = 'DELETE FROM {} WHERE {} IN ({})'.format(
+        quote(model._meta.db_table), quote(model._meta.get_field(field).column), ', '.join(['%s'] * len(values)))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(values))
+        return cursor.rowcount
+
+
+# queryset의 id를 batch_size개씩 가져와 delete_batch(ids)로 지우기를 반복하고, 삭제한 개수를 리턴
+# 지운 행은 다음 조회에 나오지 않으므로 항상 처음부터 가져온다.
+def _in_batches(queryset, delete_batch, batch_size):
+    total = 0
+    ids = queryset.order_by().values_list('id', flat=True)
+    while True:
+        batch = list(ids[:batch_size])
+        if not batch:
+            return total
+        total += delete_batch(batch)
+
+
+# 질문 삭제 (답변, 추천, 검색 색인 포함). queryset : 삭제할 질문의 QuerySet
+def delete_questions(queryset, batch_size=BATCH_SIZE):
+    deleted = _in_batches(queryset, _delete_question_batch, batch_size)
+    if deleted:
+        page_cache.bump('board')
+    return deleted
+
+
+def _delete_question_batch(ids):
+    with transaction.atomic():
+        delete_rows(SearchToken.objects.filter(question_id__in=ids))
+        delete_rows(Answer.voter.through.objects.filter(answer__question_id__in=ids))
+        delete_rows(Question.voter.through.objects.filter(question_id__in=ids))
+        delete_where(Answer, 'question', ids)
+        deleted = delete_where(Question, 'id', ids)
+    for question_id in ids:
+        autocomplete.index.remove_question(question_id)
+    page_cache.bump(*['question:{}'.format(question_id) for question_id in ids])
+    return deleted
+
+
+# 답변 삭제 (추천, 검색 색인 포함). queryset : 삭제할 답변의 QuerySet
+def delete_answers(queryset, batch_size=BATCH_SIZE):
+    deleted = _in_batches(queryset, _delete_answer_batch, batch_size)
+    if deleted:
+        page_cache.bump('board')
+    return deleted
+
+
+def _delete_answer_batch(ids):
+    with transaction.atomic():
+        question_ids = list(Answer.objects.filter(id__in=ids).values_list('question_id', flat=True).distinct())
+        delete_rows(SearchToken.objects.filter(answer_id__in=ids))
+        delete_rows(Answer.voter.through.objects.filter(answer_id__in=ids))
+        deleted = delete_where(Answer, 'id', ids)
+        # 답변 개수 컬럼을 실제 개수로 다시 계산하고, 줄어든 답변만큼 인기 점수도 뺌 (삭제한 답변이 있는 질문만)
+        count = count_subquery(Answer, 'question')
+        Question.objects.filter(id__in=question_ids).update(
+            answer_count=count, hot_score=ranking.recount_score(count, 'answer_count', ranking.ANSWER_WEIGHT))
+    page_cache.bump(*['question:{}'.format(question_id) for question_id in question_ids])
+    return deleted
+
+
+# 사용자 삭제 (사용자의 질문, 답변, 추천 포함). queryset : 삭제할 사용자의 QuerySet
+# 사용자 행은 delete()로 지우므로 삭제 신호(검색어 자동 완성, 사용자 조회 캐시 정리)와 장고의 다른 연결 행(관리자 기록 등) 삭제는 그대로 처리된다.
+def delete_users(queryset, batch_size=BATCH_SIZE):
+    deleted = 0
+    for user in queryset.order_by('id').iterator():
+        delete_questions(Question.objects.filter(author=user), batch_size)
+        delete_answers(Answer.objects.filter(author=user), batch_size)
+        delete_votes(user, batch_size)
+        delete_archived(ArchivedQuestion.objects.filter(author=user), batch_size)
+        with transaction.atomic():
+            user.delete()
+        deleted += 1
+    return deleted
+
+
+# 보관된 질문 삭제 (pybo/archive.py). 압축된 내용을 읽어 오지 않고 지운다.
+def delete_archived(queryset, batch_size=BATCH_SIZE):
+    return _in_batches(queryset, _delete_archived_batch, batch_size)
+
+
+def _delete_archived_batch(ids):
+    with transaction.atomic():
+        delete_rows(ArchivedSearchToken.objects.filter(question_id__in=ids))
+        return delete_where(ArchivedQuestion, 'id', ids)
+
+
+# 사용자가 한 추천 삭제. 추천인 행을 batch_size개씩 지우고 추천 수 컬럼(질문은 인기 점수도)을 다시 계산한다.
+def delete_votes(user, batch_size=BATCH_SIZE):
+    deleted = 0
+    for model, field in ((Question, 'question'), (Answer, 'answer')):
+        through = model.voter.through
+        rows = through.objects.filter(user=user).order_by().values_list('id', field + '_id')
+        while True:
+            batch = list(rows[:batch_size])
+            if not batch:
+                break
+            ids, targets = zip(*batch)
+            with transaction.atomic():
+                deleted += delete_rows(through.objects.filter(id__in=ids))
+                count = count_subquery(through, field)
+                values = {'vote_count': count}
+                if model is Question:
+                    values['hot_score'] = ranking.recount_score(count, 'vote_count', ranking.VOTE_WEIGHT)
+                model.objects.filter(id__in=targets).update(**values)
+            if model is Question:
+                question_ids = targets
+            else:
+                question_ids = Answer.objects.filter(id__in=targets).values_list('question_id', flat=True).distinct()
+            page_cache.bump(*['question:{}'.format(question_id) for question_id in question_ids])
+    if deleted:
+        page_cache.bump('board')
+    return deleted
+
+
+# 삭제하면 함께 지워질 행 개수 (관리자 화면 삭제 확인, bulk_delete 명령의 --dry-run에서 사용)
+# 행을 읽어 오지 않고 종류별로 COUNT만 실행한다.
+def summarize_users(queryset):
+    users = queryset.order_by().values('id')
+    return {
+        '사용자': queryset.count(),
+        '질문': Question.objects.filter(author__in=users).count(),
+        '답변': Answer.objects.filter(author__in=users).count(),
+        '보관된 질문': ArchivedQuestion.objects.filter(author__in=users).count(),
+        '추천': sum(model.voter.through.objects.filter(user__in=users).count() for model in (Question, Answer)),
+    }
@@ -0,0 +1,73 @@
+# 질문 보관 명령
+# 사용법 : python manage.py archive_pybo [--days 365] [--batch-size 100] [--dry-run]
+# 최근 활동 일시(last_activity)가 --days일보다 오래된 질문을 답변, 추천과 함께 보관 테이블로 옮긴다. (pybo/archive.py 참고)
+# --before 2020-01-01 : 기준 일시를 직접 지정
+# 실행 전후의 자주 읽는(hot) 테이블 행 개수, 크기와 보관 테이블 크기, 내용 압축률을 출력한다.
+# 삭제한 행이 차지하던 데이터베이스 파일 공간은 SQLite가 다시 사용하며, 파일 크기를 줄이려면 VACUUM을 실행한다.
+#
+# python manage.py archive_pybo --restore 12 34
+# 보관된 질문을 다시 질문/답변 테이블로 복원
+
+
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from pybo import archive
+from pybo.models import Question, ArchivedQuestion
+
+
+class Command(BaseCommand):
+    help = '오래된 질문을 압축된 보관 테이블로 옮기거나, 보관된 질문을 복원합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=365, help='이 기간(일) 동안 활동이 없는 질문을 보관')
+        parser.add_argument('--before', help='이 일시(YYYY-MM-DD) 이전에 마지막으로 활동한 질문을 보관')
+        parser.add_argument('--restore', type=int, nargs='+', default=[], help='복원할 질문 id')
+        parser.add_argument('--batch-size', type=int, default=archive.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help='옮기지 않고 보관할 질문 개수만 출력')
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            restored = archive.restore_questions(ArchivedQuestion.objects.filter(id__in=options['restore']),
+                                                 options['batch_size'])
+            self.stdout.write(self.style.SUCCESS('질문 {}건 복원'.format(restored)))
+            return
+        cutoff = self.cutoff(options)
+        # (last_activity, id) 인덱스 범위 조회
+        questions = Question.objects.filter(last_activity__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write('{} 이전 활동 질문 : {}건'.format(cutoff, questions.count()))
+            return
+        before = archive.working_set()
+        stats = archive.archive_questions(questions, options['batch_size'])
+        after = archive.working_set()
+        self.report(before, after)
+        ratio = stats['stored_bytes'] / stats['raw_bytes'] if stats['raw_bytes'] else 0
+        self.stdout.write('내용 {}바이트 → 압축 {}바이트 ({:.0%})'.format(stats['raw_bytes'], stats['stored_bytes'], ratio))
+        self.stdout.write(self.style.SUCCESS('질문 {}건 보관'.format(stats['questions'])))
+
+    def cutoff(self, options):
+        if not options['before']:
+            return timezone.now() - timedelta(days=options['days'])
+        try:
+            return timezone.make_aware(datetime.strptime(options['before'], '%Y-%m-%d'))
+        except ValueError:
+            raise CommandError('--before는 YYYY-MM-DD 형식으로 입력하세요.')
+
+    # 테이블별 행 개수, 크기(테이블 + 인덱스) 변화
+    def report(self, before, after):
+        hot_before = hot_after = 0
+        for table, old in before.items():
+            new = after[table]
+            line = '{:<28} {:>10} → {:<10} 행'.format(table, old['rows'], new['rows'])
+            if old['bytes'] is not None:
+                line += '  {:>12} → {:<12} 바이트'.format(old['bytes'], new['bytes'] or 0)
+                if table not in (model._meta.db_table for model in archive.COLD_MODELS):
+                    hot_before += old['bytes']
+                    hot_after += new['bytes'] or 0
+            self.stdout.write(line)
+        if hot_before:
+            self.stdout.write('자주 읽는 테이블 크기 {}바이트 → {}바이트 ({:.0%} 감소)'.format(
+                hot_before, hot_after, 1 - hot_after / hot_before))
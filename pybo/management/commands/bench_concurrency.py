@@ -0,0 +1,159 @@
+# 동시 접속 성능 측정 명령 (WSGI / ASGI 비교)
+# 사용법 : python manage.py bench_concurrency --requests 400 --concurrency 100 --latency 0.05
+# 느린 클라이언트(요청 본문을 천천히 보내는 클라이언트) 여러 개가 동시에 질문 목록, 질문 상세 화면을 요청하는 상황을 흉내 내어
+# 1) WSGI : 동기 뷰 + 스레드 풀(--threads개의 스레드, 스레드 하나가 요청 하나를 처리하는 일반적인 WSGI 서버 방식)
+# 2) ASGI : 비동기 뷰 + 이벤트 루프 하나 (하나의 워커 프로세스)
+# 의 처리량(초당 요청 수)과 응답 시간(p50/p95)을 JSON으로 출력한다.
+# 각 방식은 설정(PYBO_ASYNC_VIEWS)이 다르므로 별도의 프로세스에서 실행한다. (--mode 옵션)
+# 실제 네트워크 서버 없이 장고의 WSGIHandler, ASGIHandler를 직접 호출하므로 서버 구현에 따른 차이는 측정하지 않는다.
+
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from pybo.management.commands.bench_pybo import percentile
+from pybo.models import Question
+
+
+class Command(BaseCommand):
+    help = 'WSGI(동기 뷰)와 ASGI(비동기 뷰)의 동시 접속 처리량을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='측정 요청 수')
+        parser.add_argument('--concurrency', type=int, default=50, help='동시 접속 클라이언트 수')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI 방식의 스레드 개수')
+        parser.add_argument('--latency', type=float, default=0.05, help='클라이언트가 요청을 보내는 데 걸리는 시간(초)')
+        parser.add_argument('--mode', choices=['wsgi', 'asgi'], help='한 가지 방식만 현재 프로세스에서 측정')
+        parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            self.stdout.write(json.dumps(self.measure(options)))
+            return
+
+        results = {mode: self.spawn(mode, options) for mode in ('wsgi', 'asgi')}
+        report = {
+            'meta': {
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'threads': options['threads'],
+                'latency_seconds': options['latency'],
+            },
+            'modes': results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    # 측정 방식별로 새 프로세스를 만들어 실행 (PYBO_ASYNC_VIEWS 환경 변수로 사용할 뷰를 선택)
+    def spawn(self, mode, options):
+        env = dict(os.environ, PYBO_ASYNC_VIEWS='1' if mode == 'asgi' else '0')
+        command = [sys.executable, sys.argv[0], 'bench_concurrency', '--mode', mode]
+        for name in ('requests', 'concurrency', 'threads', 'latency'):
+            command += ['--' + name, str(options[name])]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError('{} 측정 실패\n{}'.format(mode, completed.stderr))
+        self.stderr.write('{} 측정 완료'.format(mode))
+        return json.loads(completed.stdout)
+
+    # 요청할 경로 목록 : 질문 목록과 질문 상세 화면을 번갈아 요청
+    def paths(self, count):
+        question_ids = list(Question.objects.order_by('-create_date').values_list('id', flat=True)[:20])
+        if not question_ids:
+            raise CommandError('질문 데이터가 없습니다. 먼저 python manage.py seed_pybo 명령을 실행하세요.')
+        paths = []
+        for i in range(count):
+            if i % 2:
+                paths.append(reverse('pybo:detail', args=[question_ids[i % len(question_ids)]]))
+            else:
+                paths.append(reverse('pybo:index'))
+        return paths
+
+    def measure(self, options):
+        paths = self.paths(options['requests'])
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        started = time.perf_counter()
+        if options['mode'] == 'wsgi':
+            timings = self.run_wsgi(paths, host, options)
+        else:
+            timings = asyncio.run(self.run_asgi(paths, host, options))
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        return {
+            'async_views': settings.PYBO_ASYNC_VIEWS,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'throughput_rps': round(len(timings) / elapsed, 1),
+        }
+
+    # WSGI : 서버 스레드가 클라이언트의 요청을 다 받을 때까지(latency) 기다린 후 처리하므로, 그동안 스레드를 차지한다.
+    # 동시 접속 클라이언트 --concurrency개가 서버 스레드 --threads개를 나누어 사용 (응답 시간에는 스레드를 기다린 시간도 포함)
+    def run_wsgi(self, paths, host, options):
+        handler = WSGIHandler()
+        server_threads = threading.BoundedSemaphore(options['threads'])
+
+        def request(path):
+            begin = time.perf_counter()
+            with server_threads:
+                time.sleep(options['latency'])
+                environ = {'PATH_INFO': path, 'HTTP_HOST': host, 'wsgi.input': BytesIO()}
+                setup_testing_defaults(environ)
+                response = handler(environ, lambda status, headers: None)
+                status = response.status_code
+                b''.join(response)
+                response.close()
+            if status >= 400:
+                raise CommandError('요청 실패 : {} {}'.format(status, path))
+            return (time.perf_counter() - begin) * 1000
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            return list(executor.map(request, paths))
+
+    # ASGI : 클라이언트의 요청을 기다리는 동안(latency) 이벤트 루프가 다른 요청을 처리한다.
+    # 동시 접속 수는 --concurrency개로 제한
+    async def run_asgi(self, paths, host, options):
+        handler = ASGIHandler()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def request(path):
+            async with semaphore:
+                begin = time.perf_counter()
+                scope = {
+                    'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+                    'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+                    'root_path': '', 'headers': [(b'host', host.encode())],
+                    'client': ('127.0.0.1', 0), 'server': (host, 80),
+                }
+                messages = []
+
+                async def receive():
+                    await asyncio.sleep(options['latency'])
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+                async def send(message):
+                    messages.append(message)
+
+                await handler(scope, receive, send)
+                status = messages[0]['status']
+                if status >= 400:
+                    raise CommandError('요청 실패 : {} {}'.format(status, path))
+                return (time.perf_counter() - begin) * 1000
+
+        return await asyncio.gather(*[request(path) for path in paths])
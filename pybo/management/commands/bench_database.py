@@ -0,0 +1,156 @@
+# 데이터베이스 프로필 성능 비교 명령
+# 사용법 : python manage.py bench_database --threads 8 --operations 2000 --write-ratio 0.1
+# 기본 프로필(롤백 저널, 요청마다 새 연결)과 운영용 프로필(WAL, PRAGMA 설정, 연결 재사용, 읽기/쓰기 분리, config/settings.py 참고)에서
+# 여러 스레드가 동시에 질문 목록/상세 조회(읽기)와 짧은 쓰기 트랜잭션을 실행하여
+# 처리량(초당 작업 수), 읽기/쓰기 응답 시간(p50/p95), "database is locked" 오류 개수를 JSON으로 출력한다.
+# 프로필은 설정이 다르므로 별도의 프로세스에서 실행한다. (--profile 옵션)
+# 작업 하나를 요청 하나로 보고, 작업 전후에 요청 시작/종료 시와 같이 오래된 연결을 정리한다. (close_old_connections)
+# 쓰기 작업은 값을 바꾸지 않는 UPDATE(vote_count = vote_count)이므로 데이터는 변경되지 않는다.
+# journal_mode는 데이터베이스 파일에 저장되는 설정이므로, 측정이 끝나면 원래 값으로 되돌린다.
+
+
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection, connections, transaction, OperationalError
+from django.db.models import F, Prefetch
+
+from pybo.management.commands.bench_pybo import percentile
+from pybo.models import Question, Answer
+
+
+class Command(BaseCommand):
+    help = '기본 데이터베이스 프로필과 운영용 프로필(WAL, 연결 재사용, 읽기/쓰기 분리)의 동시 처리 성능을 비교합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help='동시에 실행할 스레드 개수')
+        parser.add_argument('--operations', type=int, default=1000, help='스레드별 작업 수')
+        parser.add_argument('--write-ratio', type=float, default=0.1, help='전체 작업 중 쓰기 작업의 비율')
+        parser.add_argument('--profile', choices=['default', 'production'], help='한 가지 프로필만 현재 프로세스에서 측정')
+        parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('SQLite 데이터베이스에서만 사용할 수 있습니다.')
+        if options['profile']:
+            self.stdout.write(json.dumps(self.measure(options)))
+            return
+
+        journal_mode = self.journal_mode()
+        # 저널 모드를 바꾸려면 다른 연결이 없어야 하므로, 측정 프로세스를 실행하는 동안에는 연결을 닫아 둠
+        connection.close()
+        try:
+            results = {profile: self.spawn(profile, options) for profile in ('default', 'production')}
+        finally:
+            self.journal_mode(journal_mode)
+        report = {
+            'meta': {
+                'threads': options['threads'],
+                'operations': options['operations'],
+                'write_ratio': options['write_ratio'],
+            },
+            'profiles': results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    # journal_mode 조회 및 변경
+    def journal_mode(self, mode=None):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode' + (' = {}'.format(mode) if mode else ''))
+            return cursor.fetchone()[0]
+
+    # 프로필별로 새 프로세스를 만들어 실행 (PYBO_DB_PROFILE 환경 변수로 설정 선택)
+    def spawn(self, profile, options):
+        env = dict(os.environ, PYBO_DB_PROFILE=profile)
+        command = [sys.executable, sys.argv[0], 'bench_database', '--profile', profile]
+        for name in ('threads', 'operations', 'write_ratio', 'seed'):
+            command += ['--' + name.replace('_', '-'), str(options[name])]
+        completed = subprocess.run(command, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise CommandError('{} 측정 실패\n{}'.format(profile, completed.stderr))
+        self.stderr.write('{} 측정 완료'.format(profile))
+        return json.loads(completed.stdout)
+
+    def measure(self, options):
+        if not settings.PYBO_SQLITE_PRAGMAS:
+            # 이전 측정에서 WAL 모드로 바뀐 데이터베이스 파일을 기본 저널 모드로 되돌림
+            self.journal_mode('DELETE')
+        connection.close()
+        question_ids = list(Question.objects.values_list('id', flat=True)[:1000])
+        if not question_ids:
+            raise CommandError('질문 데이터가 없습니다. 먼저 python manage.py seed_pybo 명령을 실행하세요.')
+
+        reads, writes, errors = [], [], []
+        lock = threading.Lock()
+
+        def worker(seed):
+            rnd = random.Random(seed)
+            local_reads, local_writes, local_errors = [], [], 0
+            try:
+                for _ in range(options['operations']):
+                    question_id = rnd.choice(question_ids)
+                    write = rnd.random() < options['write_ratio']
+                    close_old_connections()  # 요청 시작
+                    begin = time.perf_counter()
+                    try:
+                        if write:
+                            self.write(question_id)
+                        else:
+                            self.read(question_id)
+                    except OperationalError:
+                        local_errors += 1
+                        continue
+                    finally:
+                        close_old_connections()  # 요청 종료
+                    (local_writes if write else local_reads).append((time.perf_counter() - begin) * 1000)
+            finally:
+                connections.close_all()
+            with lock:
+                reads.extend(local_reads)
+                writes.extend(local_writes)
+                errors.append(local_errors)
+
+        started = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(options['seed'] + i,)) for i in range(options['threads'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        result = {
+            'profile': settings.PYBO_DB_PROFILE,
+            'journal_mode': self.journal_mode(),
+            'throughput_ops': round((len(reads) + len(writes)) / elapsed, 1),
+            'locked_errors': sum(errors),
+        }
+        for name, timings in (('read', reads), ('write', writes)):
+            timings.sort()
+            result[name + '_p50_ms'] = round(percentile(timings, 50), 3) if timings else None
+            result[name + '_p95_ms'] = round(percentile(timings, 95), 3) if timings else None
+        return result
+
+    # 읽기 : 질문 목록 첫 페이지와 질문 상세 화면의 조회 쿼리
+    def read(self, question_id):
+        list(Question.objects.select_related('author').order_by('-create_date', '-id')[:10])
+        question = Question.objects.select_related('author').prefetch_related(
+            Prefetch('answer_set', queryset=Answer.objects.select_related('author').order_by('create_date', 'id'))
+        ).get(pk=question_id)
+        list(question.answer_set.all())
+
+    # 쓰기 : 값을 바꾸지 않는 짧은 쓰기 트랜잭션
+    def write(self, question_id):
+        with transaction.atomic():
+            Question.objects.filter(pk=question_id).update(vote_count=F('vote_count'))
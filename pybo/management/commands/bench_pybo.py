@@ -0,0 +1,158 @@
+# 성능 측정 명령
+# 사용법 : python manage.py bench_pybo --requests 200 --output before.json
+# seed_pybo 명령으로 데이터를 생성한 후, 장고 테스트 클라이언트로 pybo의 주요 화면(읽기/쓰기)을 반복 요청하여
+# 시나리오별 응답 시간(p50/p95/p99), 요청당 쿼리 개수, 처리량(초당 요청 수)을 JSON으로 출력한다.
+# 변경 전후의 결과 파일을 비교하여 성능 변화를 확인할 수 있다.
+# 쓰기 시나리오(질문 등록, 답변 등록, 추천)로 변경된 데이터는 측정이 끝나면 모두 되돌린다.
+
+
+import json
+import platform
+import random
+import statistics
+import time
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from pybo import pagination, votes
+from pybo.models import Question
+
+
+# 측정이 끝난 후 쓰기 시나리오의 트랜잭션을 되돌리기 위해 발생시키는 예외
+class Rollback(Exception):
+    pass
+
+
+# 정렬된 목록에서 백분위 값 (nearest-rank 방식)
+def percentile(values, percent):
+    index = max(int(round(percent / 100 * len(values))) - 1, 0)
+    return values[index]
+
+
+class Command(BaseCommand):
+    help = 'pybo 주요 화면의 응답 시간, 쿼리 개수, 처리량을 측정하여 JSON으로 출력합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=100, help='시나리오별 측정 요청 수')
+        parser.add_argument('--warmup', type=int, default=5, help='시나리오별 측정 전 예열 요청 수')
+        parser.add_argument('--scenario', action='append', help='측정할 시나리오 이름 (여러 번 지정 가능)')
+        parser.add_argument('--kw', default='장고', help='검색 시나리오에 사용할 검색어')
+        parser.add_argument('--output', help='결과를 저장할 JSON 파일 경로')
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        if not Question.objects.exists():
+            raise CommandError('질문 데이터가 없습니다. 먼저 python manage.py seed_pybo 명령을 실행하세요.')
+        self.random = random.Random(options['seed'])
+        host = next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
+        self.anonymous = Client(HTTP_HOST=host)
+        self.client = Client(HTTP_HOST=host)
+        self.users = list(User.objects.order_by('id').values_list('id', flat=True)[:1000])
+        self.client.force_login(User.objects.get(pk=self.users[0]))
+        # 추천 시나리오용 : 사용자 여러 명으로 미리 로그인해 둔 클라이언트와 추천할 질문 id 목록
+        self.voters = []
+        for user in User.objects.filter(pk__in=self.users[1:21]):
+            voter = Client(HTTP_HOST=host)
+            voter.force_login(user)
+            self.voters.append(voter)
+        self.question_ids = list(Question.objects.values_list('id', flat=True)[:10000])
+        self.kw = options['kw']
+
+        scenarios = self.scenarios()
+        if options['scenario']:
+            unknown = set(options['scenario']) - set(scenarios)
+            if unknown:
+                raise CommandError('알 수 없는 시나리오 : {}'.format(', '.join(sorted(unknown))))
+            scenarios = {name: scenarios[name] for name in options['scenario']}
+
+        results = {}
+        try:
+            # 쓰기 시나리오에서 변경한 데이터를 측정 후 되돌리기 위해 전체를 하나의 트랜잭션으로 묶음
+            # 추천 버퍼(pybo/votes.py)도 백그라운드 스레드(다른 연결)에서 저장하지 않도록 하고, 되돌리기 전에 이 트랜잭션에서 저장한다.
+            with transaction.atomic(), override_settings(PYBO_VOTE_FLUSH_INTERVAL=None):
+                for name, request in scenarios.items():
+                    results[name] = self.measure(request, options['requests'], options['warmup'])
+                    self.stderr.write('{} : p50 {:.2f}ms'.format(name, results[name]['p50_ms']))
+                votes.buffer.flush()
+                raise Rollback
+        except Rollback:
+            pass
+
+        report = {
+            'meta': {
+                'date': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'questions': Question.objects.count(),
+                'requests': options['requests'],
+            },
+            'scenarios': results,
+        }
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                f.write(output)
+        self.stdout.write(output)
+
+    # 시나리오 이름 : 요청 함수
+    def scenarios(self):
+        last_page = (Question.objects.count() - 1) // 10 + 1
+        oldest = Question.objects.order_by('create_date', 'id')[10:11].first() or Question.objects.earliest('id')
+        short = Question.objects.order_by('answer_count', 'id').first()
+        huge = Question.objects.order_by('-answer_count', 'id').first()
+        index_url = reverse('pybo:index')
+        return {
+            'index': lambda: self.client.get(index_url),
+            'index_anonymous': lambda: self.anonymous.get(index_url),
+            'index_deep_page': lambda: self.client.get(index_url, {'page': last_page}),
+            'index_deep_cursor': lambda: self.client.get(index_url, {'after': pagination.encode_cursor(oldest)}),
+            'index_search': lambda: self.client.get(index_url, {'kw': self.kw}),
+            'detail_short': lambda: self.client.get(reverse('pybo:detail', args=[short.id])),
+            'detail_huge': lambda: self.client.get(reverse('pybo:detail', args=[huge.id])),
+            'detail_huge_anonymous': lambda: self.anonymous.get(reverse('pybo:detail', args=[huge.id])),
+            'question_create': lambda: self.client.post(
+                reverse('pybo:question_create'), {'subject': '성능 측정', 'content': '**측정용** 질문입니다.'}),
+            'answer_create': lambda: self.client.post(
+                reverse('pybo:answer_create', args=[huge.id]), {'content': '측정용 답변입니다.'}),
+            'question_vote': self.vote,
+        }
+
+    # 추천 : 매번 임의의 사용자가 임의의 질문을 추천 (같은 사용자의 중복 추천만 측정하지 않도록)
+    def vote(self):
+        voter = self.random.choice(self.voters or [self.client])
+        return voter.get(reverse('pybo:question_vote', args=[self.random.choice(self.question_ids)]))
+
+    def measure(self, request, count, warmup):
+        for _ in range(warmup):
+            request()
+        timings = []
+        queries = []
+        started = time.perf_counter()
+        for _ in range(count):
+            with CaptureQueriesContext(connection) as ctx:
+                begin = time.perf_counter()
+                response = request()
+                timings.append((time.perf_counter() - begin) * 1000)
+            if response.status_code >= 400:
+                raise CommandError('요청 실패 : {} {}'.format(response.status_code, response.request['PATH_INFO']))
+            queries.append(len(ctx.captured_queries))
+        elapsed = time.perf_counter() - started
+        timings.sort()
+        return {
+            'requests': count,
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'p99_ms': round(percentile(timings, 99), 3),
+            'mean_ms': round(statistics.mean(timings), 3),
+            'queries_per_request': round(statistics.mean(queries), 2),
+            'throughput_rps': round(count / elapsed, 1),
+        }
@@ -0,0 +1,45 @@
+# 대량 삭제 명령
+# 사용법 : python manage.py bulk_delete --user spammer [--user ...] [--question 1 2 3] [--answer 4 5] [--batch-size 500] [--dry-run]
+# 사용자(와 사용자의 질문, 답변, 추천), 질문(과 답변, 추천), 답변을 연결된 행을 읽어 오지 않고 batch_size개씩 나누어 지운다. (pybo/deletion.py 참고)
+# 글을 많이 쓴 사용자도 메모리 사용량과 트랜잭션(쓰기 잠금) 시간이 batch_size에 비례하므로, 서비스 중에도 실행할 수 있다.
+# --dry-run : 지우지 않고 함께 지워질 행 개수만 출력
+
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from pybo import deletion
+from pybo.models import Question, Answer
+
+
+class Command(BaseCommand):
+    help = '사용자, 질문, 답변을 연결된 데이터와 함께 묶음 단위로 삭제합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', default=[], help='삭제할 사용자 이름 (여러 번 지정 가능)')
+        parser.add_argument('--question', type=int, nargs='+', default=[], help='삭제할 질문 id')
+        parser.add_argument('--answer', type=int, nargs='+', default=[], help='삭제할 답변 id')
+        parser.add_argument('--batch-size', type=int, default=deletion.BATCH_SIZE)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(username__in=options['user'])
+        missing = set(options['user']) - set(users.values_list('username', flat=True))
+        if missing:
+            raise CommandError('없는 사용자 : {}'.format(', '.join(sorted(missing))))
+        questions = Question.objects.filter(id__in=options['question'])
+        answers = Answer.objects.filter(id__in=options['answer'])
+        if options['dry_run']:
+            summary = deletion.summarize_users(users) if options['user'] else {}
+            summary['질문 (--question)'] = questions.count()
+            summary['답변 (--answer)'] = answers.count()
+            for name, count in summary.items():
+                self.stdout.write('{} : {}건'.format(name, count))
+            return
+        batch_size = options['batch_size']
+        # 답변 → 질문 → 사용자 순서로 삭제 (이미 지워진 행은 건너뜀)
+        answer_count = deletion.delete_answers(answers, batch_size)
+        question_count = deletion.delete_questions(questions, batch_size)
+        user_count = deletion.delete_users(users, batch_size)
+        self.stdout.write(self.style.SUCCESS('사용자 {}명, 질문 {}건, 답변 {}건 삭제'.format(
+            user_count, question_count, answer_count)))
@@ -0,0 +1,126 @@
+# 쿼리 실행 계획 검사 명령
+# 사용법 : python manage.py check_query_plans [--verbose]
+# pybo의 주요 화면(질문 목록의 여러 페이징 방식, 정렬 방식과 검색, 질문 상세)을 실제로 요청하고 추천 저장을 실행하여, 그동안 실행된 쿼리를 모아
+# 쿼리마다 SQLite의 EXPLAIN QUERY PLAN 결과를 확인한다. 인덱스 없이 테이블 전체를 훑는(SCAN) 쿼리가 있으면 실패한다.
+# 뷰 코드에서 만든 쿼리를 그대로 검사하므로, 모델의 인덱스나 뷰의 쿼리가 바뀌어 전체 조회로 돌아가는 것을 배포 전에 알 수 있다.
+# 정렬용 임시 B-tree(USE TEMP B-TREE)는 검색 결과의 관련도 정렬처럼 필요한 경우도 있으므로 실패로 보지 않고 경고만 출력한다.
+# 검사 중 변경된 데이터(로그인 세션, 추천)는 검사가 끝나면 모두 되돌린다.
+
+
+import re
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from pybo import pagination, ranking, votes
+from pybo.management.commands.bench_pybo import Rollback
+from pybo.models import Question, Answer
+
+
+# 인덱스를 사용하지 않는 테이블 전체 조회. 예) SCAN pybo_question, SCAN TABLE pybo_question AS U0 (SQLite 3.36 이전 형식)
+FULL_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+TEMP_SORT_RE = re.compile(r'^USE TEMP B-TREE')
+EXPLAINABLE = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+
+
+# 쿼리의 실행 계획 조회 : [실행 계획 단계 설명, ...]
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+# 실행 계획에서 문제가 되는 단계 (전체 조회 목록, 임시 정렬 목록)
+# 서브쿼리 결과(SCAN subquery 등)를 훑는 단계는 테이블 조회가 아니므로 제외
+def plan_problems(plan, tables):
+    scans = [step for step, match in ((step, FULL_SCAN_RE.match(step)) for step in plan)
+             if match and match.group(1) in tables]
+    sorts = [step for step in plan if TEMP_SORT_RE.match(step)]
+    return scans, sorts
+
+
+class Command(BaseCommand):
+    help = 'pybo 주요 화면의 쿼리 실행 계획을 검사하여, 테이블 전체 조회(SCAN)가 있으면 실패합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kw', default='장고', help='검색 화면에 사용할 검색어')
+        parser.add_argument('--verbose', action='store_true', help='모든 쿼리의 실행 계획 출력')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('SQLite 데이터베이스에서만 사용할 수 있습니다.')
+        queries = self.collect(options['kw'])
+        tables = set(connection.introspection.table_names())
+        failures = 0
+        for name, sql in queries:
+            plan = query_plan(sql)
+            scans, sorts = plan_problems(plan, tables)
+            if scans:
+                failures += 1
+                self.stdout.write(self.style.ERROR('[전체 조회] {} : {}'.format(name, sql)))
+            elif sorts:
+                self.stdout.write(self.style.WARNING('[임시 정렬] {} : {}'.format(name, sql)))
+            elif options['verbose']:
+                self.stdout.write('[정상] {} : {}'.format(name, sql))
+            if scans or sorts or options['verbose']:
+                for step in plan:
+                    self.stdout.write('    ' + step)
+        if failures:
+            raise CommandError('테이블 전체를 조회하는 쿼리가 {}개 있습니다.'.format(failures))
+        self.stdout.write(self.style.SUCCESS('쿼리 {}개 검사 완료'.format(len(queries))))
+
+    # 주요 화면을 요청하고 추천을 저장하는 동안 실행된 쿼리 수집 : [(화면 이름, SQL), ...]
+    def collect(self, kw):
+        question = Question.objects.order_by('-answer_count', 'id').first()
+        if question is None:
+            raise CommandError('질문 데이터가 없습니다. 먼저 python manage.py seed_pybo 명령을 실행하세요.')
+        answer = Answer.objects.filter(question=question).first()
+        user = User.objects.exclude(pk=question.author_id).first() or User.objects.first()
+        oldest = Question.objects.order_by('create_date', 'id')[10:11].first() or question
+        index_url = reverse('pybo:index')
+        requests = [
+            ('index', index_url, {}),
+            ('index_after', index_url, {'after': pagination.encode_cursor(oldest)}),
+            ('index_before', index_url, {'before': pagination.encode_cursor(oldest)}),
+            ('index_page', index_url, {'page': 2}),
+            ('index_search', index_url, {'kw': kw}),
+            *[('index_' + sort, index_url, {'sort': sort}) for sort in ranking.SORTS if sort != ranking.DEFAULT_SORT],
+            ('index_recommend_after', index_url,
+             {'sort': 'recommend', 'after': pagination.encode_cursor(oldest, 'vote_count')}),
+            ('detail', reverse('pybo:detail', args=[question.id]), {}),
+        ]
+
+        collected = {}
+        try:
+            # 페이지 캐시를 사용하면 쿼리가 실행되지 않으므로 끄고, 추천은 이 트랜잭션 안에서 저장
+            with transaction.atomic(), override_settings(PYBO_PAGE_CACHE_ENABLED=False, PYBO_VOTE_FLUSH_INTERVAL=None):
+                client = Client(HTTP_HOST=self.host())
+                client.force_login(user)
+                for name, url, params in requests:
+                    self.capture(collected, name, lambda: client.get(url, params))
+                votes.buffer.add('question', question.id, user.id)
+                if answer is not None:
+                    votes.buffer.add('answer', answer.id, user.id)
+                self.capture(collected, 'vote_flush', votes.buffer.flush)
+                raise Rollback
+        except Rollback:
+            pass
+        return [(name, sql) for sql, name in collected.items()]
+
+    def capture(self, collected, name, func):
+        with CaptureQueriesContext(connection) as ctx:
+            response = func()
+        if getattr(response, 'status_code', 200) >= 400:
+            raise CommandError('요청 실패 : {} {}'.format(name, response.status_code))
+        for query in ctx.captured_queries:
+            sql = query['sql']
+            if sql.split(None, 1)[0].upper() in EXPLAINABLE:
+                collected.setdefault(sql, name)
+
+    def host(self):
+        return next((h.lstrip('.') for h in settings.ALLOWED_HOSTS if h != '*'), 'localhost')
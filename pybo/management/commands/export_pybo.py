@@ -0,0 +1,90 @@
+# 게시판 데이터 내보내기 명령
+# 사용법 : python manage.py export_pybo pybo.jsonl.gz [--chunk-size 2000]
+# 질문, 답변과 그 추천(voter) 다대다 테이블을 JSON Lines 형식(한 줄에 한 행)으로 내보낸다. 파일 이름이 .gz로 끝나면 gzip으로 압축
+# dumpdata는 전체 데이터를 메모리에 올린 후 출력하지만, 이 명령은 iterator(chunk_size=...)로 조금씩 읽어 바로 출력하므로
+# 데이터가 많아도 메모리 사용량이 일정하다. 내보낸 파일은 import_pybo 명령으로 가져온다.
+#
+# 파일 형식
+# 첫 줄 : {"format": "pybo", "version": 1, "tables": {테이블 이름: [컬럼 이름, ...], ...}}
+# 이후 : {"table": "question", "id": 1, "author_id": 1, ...} 처럼 테이블 이름과 컬럼 값. 질문 > 답변 > 추천 순서
+# 보관된 질문(pybo/archive.py)과 그 검색 색인도 함께 내보낸다. 압축된 내용 등 바이너리 컬럼은 base64 문자열로 저장
+# 작성자, 추천인은 dumpdata와 마찬가지로 사용자 id로 저장하므로, 가져올 데이터베이스에 같은 id의 사용자가 있어야 한다.
+
+
+import base64
+import datetime
+import gzip
+import sys
+
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from pybo.models import Question, Answer, ArchivedQuestion, ArchivedSearchToken
+
+
+FORMAT_VERSION = 1
+
+# (테이블 이름, 모델, 컬럼 목록). 가져올 때 외래키가 가리키는 행이 먼저 저장되도록 순서를 지킨다.
+# content_html은 내보내지 않으면 가져온 후에 마크다운을 모두 다시 렌더링해야 하므로 함께 내보낸다.
+TABLES = (
+    ('question', Question, ('id', 'author_id', 'subject', 'content', 'create_date', 'modify_date',
+                            'answer_count', 'vote_count', 'content_html', 'content_html_version',
+                            'last_activity', 'hot_score')),
+    ('answer', Answer, ('id', 'author_id', 'question_id', 'content', 'create_date', 'modify_date',
+                        'vote_count', 'content_html', 'content_html_version')),
+    ('question_voter', Question.voter.through, ('id', 'question_id', 'user_id')),
+    ('answer_voter', Answer.voter.through, ('id', 'answer_id', 'user_id')),
+    ('archived_question', ArchivedQuestion, ('id', 'author_id', 'subject', 'create_date', 'modify_date',
+                                             'last_activity', 'answer_count', 'vote_count', 'body', 'voters',
+                                             'answer_voters', 'archive_date')),
+    ('archived_search_token', ArchivedSearchToken, ('id', 'question_id', 'token', 'weight')),
+)
+
+
+# 날짜/시간 값을 ISO 8601 문자열로, 바이너리 값을 base64 문자열로 저장하는 JSON 인코더
+# DjangoJSONEncoder는 마이크로초를 밀리초로 잘라서 저장하므로, 원래 값을 그대로 옮기기 위해 isoformat()을 사용
+class Encoder(DjangoJSONEncoder):
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        if isinstance(o, (bytes, memoryview)):
+            return base64.b64encode(o).decode()
+        return super().default(o)
+
+
+# 파일 열기 : '-'이면 표준 입출력, .gz로 끝나면(또는 compress=True) gzip 압축 파일
+def open_stream(path, mode, compress=False):
+    if path == '-':
+        return open((sys.stdout if mode == 'w' else sys.stdin).fileno(), mode, encoding='utf-8', closefd=False)
+    if compress or path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+class Command(BaseCommand):
+    help = '질문, 답변, 추천 데이터를 JSON Lines 파일로 내보냅니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="내보낼 파일 경로 ('-'이면 표준 출력)")
+        parser.add_argument('--gzip', action='store_true', help='파일 이름과 관계없이 gzip으로 압축')
+        # 한 번에 데이터베이스에서 읽어 올 행의 개수
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        encoder = Encoder(ensure_ascii=False)
+        with open_stream(options['output'], 'w', options['gzip']) as f:
+            f.write(encoder.encode({
+                'format': 'pybo', 'version': FORMAT_VERSION,
+                'tables': {name: fields for name, _, fields in TABLES},
+            }) + '\n')
+            for name, model, fields in TABLES:
+                # 모델 객체를 만들지 않도록 values_list로 값만 조회
+                rows = model.objects.order_by('id').values_list(*fields).iterator(chunk_size=options['chunk_size'])
+                count = 0
+                for row in rows:
+                    record = {'table': name}
+                    record.update(zip(fields, row))
+                    f.write(encoder.encode(record) + '\n')
+                    count += 1
+                self.stderr.write('{} {}건 내보냄'.format(name, count))
+        self.stderr.write(self.style.SUCCESS('내보내기 완료'))
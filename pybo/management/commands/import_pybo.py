@@ -0,0 +1,109 @@
+# 게시판 데이터 가져오기 명령
+# 사용법 : python manage.py import_pybo pybo.jsonl.gz [--batch-size 1000]
+# export_pybo 명령으로 내보낸 JSON Lines 파일(gzip 압축 파일도 가능)을 한 줄씩 읽어 batch_size개씩 bulk_create로 저장한다.
+# loaddata는 전체 파일을 메모리에 올리고 한 행씩 저장하지만, 이 명령은 묶음 단위로 저장하므로 메모리 사용량이 일정하고 빠르다.
+#
+# 묶음 하나를 저장(커밋)할 때마다 처리한 줄 번호를 체크포인트 파일(기본값 : 파일 경로 + '.checkpoint')에 기록하므로,
+# 중간에 실패하거나 중단되었을 때 같은 명령을 다시 실행하면 체크포인트 이후부터 이어서 가져온다.
+# 이미 있는 id의 행은 건너뛰므로(ignore_conflicts) 같은 묶음을 두 번 저장해도 중복되지 않는다. 모두 가져오면 체크포인트 파일은 삭제한다.
+# 가져오기가 끝나면 검색 색인을 다시 만든다. (rebuild_search_index)
+
+
+import base64
+import json
+import os
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction, IntegrityError
+
+from pybo import page_cache
+from pybo.management.commands.export_pybo import FORMAT_VERSION, TABLES, open_stream
+
+
+class Command(BaseCommand):
+    help = 'export_pybo 명령으로 내보낸 JSON Lines 파일에서 질문, 답변, 추천 데이터를 가져옵니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="가져올 파일 경로 ('-'이면 표준 입력)")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--checkpoint', help='체크포인트 파일 경로 (기본값 : 가져올 파일 경로 + .checkpoint)')
+        # 체크포인트 파일을 무시하고 처음부터 가져옴
+        parser.add_argument('--restart', action='store_true')
+        # 검색 색인을 다시 만들지 않음 (여러 파일을 연달아 가져온 후 한 번만 만들 때)
+        parser.add_argument('--no-index', action='store_true')
+
+    def handle(self, *args, **options):
+        path = options['input']
+        self.checkpoint = options['checkpoint'] or (None if path == '-' else path + '.checkpoint')
+        done = 0 if options['restart'] else self._read_checkpoint()
+        if done:
+            self.stderr.write('체크포인트 {}번째 줄 이후부터 가져옵니다.'.format(done))
+
+        tables = {name: (model, fields) for name, model, fields in TABLES}
+        # base64 문자열로 내보낸 바이너리 컬럼
+        binary = {name: {field for field in fields
+                         if model._meta.get_field(field).get_internal_type() == 'BinaryField'}
+                  for name, model, fields in TABLES}
+        counts = dict.fromkeys(tables, 0)
+        with open_stream(path, 'r') as f:
+            header = json.loads(next(f, '{}'))
+            if header.get('format') != 'pybo' or header.get('version') != FORMAT_VERSION:
+                raise CommandError('export_pybo 명령으로 내보낸 파일이 아닙니다.')
+            batch, batch_model, last = [], None, done
+            for number, line in enumerate(f, 1):
+                if number <= done:
+                    continue
+                record = json.loads(line)
+                name = record.pop('table')
+                if name == 'question':
+                    # 정렬용 컬럼이 없던 때에 내보낸 파일이면 최근 활동 일시를 작성 일시로 저장
+                    record.setdefault('last_activity', record['create_date'])
+                for field in binary[name] & record.keys():
+                    record[field] = base64.b64decode(record[field])
+                model, fields = tables[name]
+                # 테이블이 바뀌면 이전 테이블의 묶음을 먼저 저장 (외래키가 가리키는 행이 먼저 저장되도록)
+                if batch and model is not batch_model:
+                    self._flush(batch_model, batch, last)
+                    batch = []
+                batch_model, last = model, number
+                batch.append(model(**{field: record[field] for field in fields if field in record}))
+                counts[name] += 1
+                if len(batch) >= options['batch_size']:
+                    self._flush(batch_model, batch, last)
+                    batch = []
+            if batch:
+                self._flush(batch_model, batch, last)
+
+        # id를 지정하여 저장했으므로, 이후 새로 등록하는 행의 id가 겹치지 않도록 시퀀스를 다시 설정 (loaddata와 같은 방식)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [model for _, model, _ in TABLES]):
+                cursor.execute(sql)
+        if self.checkpoint and os.path.exists(self.checkpoint):
+            os.remove(self.checkpoint)
+        for name, count in counts.items():
+            self.stderr.write('{} {}건 가져옴'.format(name, count))
+        if not options['no_index']:
+            call_command('rebuild_search_index', stdout=self.stderr)
+        page_cache.bump('board')
+        self.stderr.write(self.style.SUCCESS('가져오기 완료'))
+
+    # 묶음 저장 후 체크포인트 기록
+    # 저장과 체크포인트 기록 사이에 중단되더라도, 다시 실행할 때 이미 저장된 행은 ignore_conflicts로 건너뛴다.
+    def _flush(self, model, batch, last):
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+        except IntegrityError as e:
+            raise CommandError('{}번째 줄까지 저장하지 못했습니다. (작성자/추천인 사용자가 있는지 확인하세요.) {}'.format(last, e))
+        if self.checkpoint:
+            with open(self.checkpoint + '.tmp', 'w') as f:
+                f.write(str(last))
+            os.replace(self.checkpoint + '.tmp', self.checkpoint)
+
+    def _read_checkpoint(self):
+        if not self.checkpoint or not os.path.exists(self.checkpoint):
+            return 0
+        with open(self.checkpoint) as f:
+            return int(f.read().strip() or 0)
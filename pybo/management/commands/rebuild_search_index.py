@@ -0,0 +1,48 @@
+# 검색 색인 재생성 명령
+# 사용법 : python manage.py rebuild_search_index
+# 기존 데이터에 검색 기능을 처음 적용할 때나, 토큰 규칙(pybo/search.py)이 바뀌었을 때 사용
+
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pybo import search
+from pybo.models import Question, Answer, SearchToken
+
+
+class Command(BaseCommand):
+    help = '질문/답변 전체의 검색 색인(SearchToken)을 다시 생성합니다.'
+
+    def add_arguments(self, parser):
+        # 한 번에 읽어 들이고 저장할 행의 개수. 전체 데이터를 메모리에 올리지 않기 위해 사용
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        questions = Question.objects.select_related('author')
+        count = self._build(questions, search.question_tokens,
+                            lambda ids: SearchToken.objects.filter(question_id__in=ids, answer__isnull=True), batch_size)
+        self.stdout.write('질문 {}건 색인 완료'.format(count))
+        answers = Answer.objects.select_related('author')
+        count = self._build(answers, search.answer_tokens,
+                            lambda ids: SearchToken.objects.filter(answer_id__in=ids), batch_size)
+        self.stdout.write('답변 {}건 색인 완료'.format(count))
+        self.stdout.write(self.style.SUCCESS('검색 색인 재생성 완료'))
+
+    # 쿼리셋을 id 순서로 batch_size개씩 나누어, 묶음마다 기존 색인 행(old_tokens(ids))을 지우고 새 색인 행을 저장
+    # 전체를 하나의 트랜잭션으로 처리하면 SQLite에서는 재생성하는 동안 쓰기 잠금을 계속 잡고 있어 추천, 글 작성이 모두 막히므로
+    # 묶음마다 짧은 트랜잭션으로 저장한다. 재생성 중에는 아직 처리하지 않은 글은 예전 색인으로 검색된다.
+    # 기존 색인 행을 먼저 지워 쓰기 잠금을 잡은 후 글을 읽으므로, 그 사이에 수정된 글의 색인을 예전 내용으로 덮어쓰지 않는다.
+    def _build(self, queryset, make_tokens, old_tokens, batch_size):
+        count = 0
+        last_id = 0
+        while True:
+            ids = list(queryset.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                return count
+            with transaction.atomic():
+                old_tokens(ids).delete()
+                objs = list(queryset.filter(id__in=ids))
+                SearchToken.objects.bulk_create([row for obj in objs for row in make_tokens(obj)], batch_size=batch_size)
+            count += len(objs)
+            last_id = ids[-1]
@@ -0,0 +1,32 @@
+# 카운터 컬럼 재계산 명령
+# 사용법 : python manage.py recount
+# Question.answer_count, Question.vote_count, Answer.vote_count 값이 실제 개수와 어긋난 경우(관리자 화면에서 직접 수정, 카운터 컬럼 추가 직후 등)
+# 실제 답변/추천 개수로 다시 계산한다. 행마다 따로 저장하지 않고, 서브쿼리를 이용한 UPDATE 문 하나로 테이블 전체를 한 번에 갱신한다.
+
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from pybo.counters import count_subquery
+from pybo.models import Question, Answer
+
+
+class Command(BaseCommand):
+    help = '질문/답변의 답변 개수, 추천 수 컬럼을 실제 값으로 다시 계산합니다.'
+
+    def handle(self, *args, **options):
+        # (모델, 카운터 컬럼, 개수를 셀 모델, 연결 필드)
+        targets = [
+            (Question, 'answer_count', Answer, 'question'),
+            (Question, 'vote_count', Question.voter.through, 'question'),
+            (Answer, 'vote_count', Answer.voter.through, 'answer'),
+        ]
+        with transaction.atomic():
+            for model, column, related_model, field in targets:
+                actual = count_subquery(related_model, field)
+                # 값이 어긋난 행의 개수 (보고용)
+                drift = model.objects.annotate(actual=actual).exclude(**{column: F('actual')}).count()
+                model.objects.update(**{column: actual})
+                self.stdout.write('{}.{} : {}건 수정'.format(model.__name__, column, drift))
+        self.stdout.write(self.style.SUCCESS('카운터 재계산 완료'))
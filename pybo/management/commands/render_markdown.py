@@ -0,0 +1,61 @@
+# 마크다운 재렌더링 명령
+# 사용법 : python manage.py render_markdown [--all] [--workers 4]
+# 저장된 HTML(content_html)이 현재 렌더링 버전(pybo/rendering.py의 RENDER_VERSION)과 다른 질문/답변을 다시 렌더링한다.
+# 마크다운 확장 기능 목록을 바꾼 후, 또는 content_html 컬럼을 처음 추가한 후에 실행한다.
+# 마크다운 변환은 CPU를 사용하는 작업이므로 여러 프로세스에서 나누어 처리한다.
+
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from pybo import rendering
+from pybo.models import Question, Answer
+
+
+class Command(BaseCommand):
+    help = '질문/답변 내용의 마크다운을 다시 렌더링하여 content_html 컬럼에 저장합니다.'
+
+    def add_arguments(self, parser):
+        # 버전과 관계없이 전체를 다시 렌더링
+        parser.add_argument('--all', action='store_true')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            for model in (Question, Answer):
+                count = self._render(model, executor, options['batch_size'], options['all'])
+                self.stdout.write('{} {}건 렌더링 완료'.format(model.__name__, count))
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        self.stdout.write(self.style.SUCCESS('마크다운 재렌더링 완료'))
+
+    def _render(self, model, executor, batch_size, render_all):
+        queryset = model.objects.order_by('id')
+        if not render_all:
+            queryset = queryset.exclude(content_html_version=rendering.RENDER_VERSION)
+        count = 0
+        last_id = 0
+        # id 기준으로 batch_size 개씩 나누어 처리 (OFFSET을 사용하지 않으므로 뒤쪽으로 가도 느려지지 않음)
+        while True:
+            rows = list(queryset.filter(id__gt=last_id).values_list('id', 'content')[:batch_size])
+            if not rows:
+                return count
+            contents = [content for _, content in rows]
+            if executor is not None:
+                htmls = list(executor.map(rendering.render_markdown, contents, chunksize=16))
+            else:
+                htmls = list(map(rendering.render_markdown, contents))
+            # 렌더링하는 동안 수정된 글은 새 내용의 HTML을 덮어쓰지 않도록, 내용이 그대로인 행만 저장 (tasks._update_post와 같음)
+            # 렌더링이 끝난 후 묶음 단위의 짧은 트랜잭션으로 저장
+            with transaction.atomic():
+                for (pk, content), html in zip(rows, htmls):
+                    count += model.objects.filter(pk=pk, content=content).update(
+                        content_html=html, content_html_version=rendering.RENDER_VERSION)
+            last_id = rows[-1][0]
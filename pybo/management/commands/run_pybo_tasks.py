@@ -0,0 +1,50 @@
+# 백그라운드 작업 워커 명령
+# 사용법 : python manage.py run_pybo_tasks [--interval 1] [--batch-size 100]
+# 작업 테이블(Task)에서 실행할 시각이 된 작업을 가져와 차례로 실행한다. (pybo/tasks.py 참고)
+# 웹 서버 프로세스의 스레드 풀을 사용하지 않는 경우(PYBO_TASK_WORKERS = 0), 또는 쓰기가 많아 작업을 별도 프로세스로 나누고 싶을 때 실행한다.
+# 작업은 가져갈 때 조건부 UPDATE로 잠그므로 여러 워커를 동시에 실행해도 된다.
+#
+# python manage.py run_pybo_tasks --once
+# 지금 실행할 수 있는 작업을 모두 실행한 후 종료 (cron 등에서 사용)
+#
+# python manage.py run_pybo_tasks --retry-failed
+# 최대 실행 횟수만큼 실패하여 중단된 작업을 다시 실행 대기 상태로 바꾼다.
+
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from pybo import tasks
+from pybo.models import Task
+
+
+class Command(BaseCommand):
+    help = '백그라운드 작업(작업 테이블)을 실행합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='실행할 작업을 모두 실행한 후 종료')
+        parser.add_argument('--interval', type=float, default=1.0, help='실행할 작업이 없을 때 기다리는 시간 (초)')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--retry-failed', action='store_true', help='실패하여 중단된 작업을 다시 실행 대기 상태로 변경')
+
+    def handle(self, *args, **options):
+        if options['retry_failed']:
+            updated = Task.objects.filter(failed=True).update(failed=False, attempts=0, run_after=timezone.now())
+            self.stdout.write(self.style.SUCCESS('실패한 작업 {}건을 다시 실행합니다.'.format(updated)))
+            return
+        total = 0
+        try:
+            while True:
+                count = tasks.run_due(options['batch_size'])
+                total += count
+                close_old_connections()
+                if count < options['batch_size']:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS('작업 {}건 실행'.format(total)))
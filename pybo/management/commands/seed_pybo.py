@@ -0,0 +1,150 @@
+# 테스트용 데이터 생성 명령
+# 사용법 : python manage.py seed_pybo --users 200 --questions 5000 --answers 30000 --votes 50000
+# 성능 측정(bench_pybo)을 위해 실제 게시판과 비슷한 분포의 사용자, 질문, 답변, 추천 데이터를 bulk_create로 빠르게 생성한다.
+# - 답변 수는 소수의 질문에 몰리도록 파레토 분포(heavy-tailed)의 가중치로 배정
+# - 질문/답변 내용은 문단, 목록, 코드 블록이 섞인 긴 마크다운 문서
+# - 작성 일시는 최근 1년 사이에 고르게 분포
+# 생성 후에는 카운터 컬럼(recount), 정렬용 컬럼(update_ranking --rebuild)과 검색 색인(rebuild_search_index)을 다시 계산한다.
+
+
+import random
+from itertools import islice
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from pybo import rendering
+from pybo.models import Question, Answer
+
+
+# 질문/답변 내용에 사용할 단어
+WORDS = (
+    '파이보 장고 질문 답변 모델 뷰 템플릿 폼 마크다운 검색 페이징 추천 데이터베이스 쿼리 인덱스 캐시 '
+    '파이썬 함수 클래스 모듈 오류 설정 배포 서버 로그인 회원가입 관리자 테스트 성능 '
+    'django python model view template query index cache server deploy test error'
+).split()
+
+CODE_SAMPLE = '''```
+def index(request):
+    question_list = Question.objects.order_by('-create_date')
+    return render(request, 'pybo/question_list.html', {'question_list': question_list})
+```'''
+
+
+class Command(BaseCommand):
+    help = '성능 측정용 사용자, 질문, 답변, 추천 데이터를 생성합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--questions', type=int, default=1000)
+        parser.add_argument('--answers', type=int, default=5000)
+        parser.add_argument('--votes', type=int, default=10000)
+        # 답변 수 분포의 파레토 지수. 작을수록 소수의 질문에 답변이 더 많이 몰린다.
+        parser.add_argument('--alpha', type=float, default=1.2)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        # 마크다운을 미리 렌더링하여 content_html 컬럼에 저장하지 않음
+        parser.add_argument('--no-render', action='store_true')
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        self.render = not options['no_render']
+        with transaction.atomic():
+            users = self._create_users(options['users'], batch_size)
+            questions = self._create_questions(users, options['questions'], batch_size)
+            answers = self._create_answers(users, questions, options['answers'], options['alpha'], batch_size)
+            self._create_votes(users, questions, answers, options['votes'], batch_size)
+        call_command('recount', stdout=self.stdout)
+        call_command('update_ranking', rebuild=True, stdout=self.stdout)
+        call_command('rebuild_search_index', stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS('데이터 생성 완료'))
+
+    # 긴 마크다운 문서 생성 (문단, 목록, 코드 블록)
+    def _markdown(self, paragraphs):
+        blocks = []
+        for _ in range(paragraphs):
+            kind = self.random.random()
+            if kind < 0.15:
+                blocks.append(CODE_SAMPLE)
+            elif kind < 0.3:
+                blocks.append('\n'.join('- ' + self._sentence(4) for _ in range(self.random.randint(2, 5))))
+            else:
+                blocks.append('\n'.join(self._sentence(12) for _ in range(self.random.randint(1, 4))))
+        return '\n\n'.join(blocks)
+
+    def _sentence(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(self.random.randint(words // 2, words)))
+
+    # 최근 1년 사이의 작성 일시
+    def _date(self, after=None):
+        now = timezone.now()
+        start = after or now - timedelta(days=365)
+        return start + (now - start) * self.random.random()
+
+    def _prepare(self, obj):
+        if self.render:
+            rendering.render_content(obj)
+        return obj
+
+    def _create_users(self, count, batch_size):
+        start = User.objects.count()
+        password = make_password('pybo1234')  # 해시 계산은 비용이 크므로 한 번만 계산하여 모든 사용자에게 사용
+        User.objects.bulk_create([
+            User(username='seed_user_{}'.format(start + i), email='seed{}@pybo.com'.format(start + i),
+                 password=password) for i in range(count)
+        ], batch_size=batch_size)
+        users = list(User.objects.filter(username__startswith='seed_user_').values_list('id', flat=True))
+        self.stdout.write('사용자 {}명 생성'.format(count))
+        return users
+
+    # 제너레이터로 만든 객체를 batch_size 개씩 나누어 저장 (전체 객체를 한꺼번에 메모리에 만들지 않음)
+    def _bulk_create(self, model, objs, batch_size):
+        objs = iter(objs)
+        while True:
+            batch = list(islice(objs, batch_size))
+            if not batch:
+                return
+            model.objects.bulk_create(batch)
+
+    def _create_questions(self, users, count, batch_size):
+        self._bulk_create(Question, (self._prepare(Question(
+            author_id=self.random.choice(users), subject=self._sentence(8),
+            content=self._markdown(self.random.randint(1, 8)), create_date=create_date, last_activity=create_date,
+        )) for create_date in (self._date() for _ in range(count))), batch_size)
+        self.stdout.write('질문 {}개 생성'.format(count))
+        return list(Question.objects.values_list('id', 'create_date'))
+
+    # 질문마다 파레토 분포의 가중치를 주고, 가중치에 비례하여 답변을 배정
+    def _create_answers(self, users, questions, count, alpha, batch_size):
+        weights = [self.random.paretovariate(alpha) for _ in questions]
+        targets = self.random.choices(questions, weights=weights, k=count) if questions else []
+        self._bulk_create(Answer, (self._prepare(Answer(
+            author_id=self.random.choice(users), question_id=question_id,
+            content=self._markdown(self.random.randint(1, 5)), create_date=self._date(after=create_date),
+        )) for question_id, create_date in targets), batch_size)
+        self.stdout.write('답변 {}개 생성'.format(count))
+        return list(Answer.objects.values_list('id', flat=True))
+
+    # 추천 : 질문과 답변에 반반씩, 역시 일부 글에 추천이 몰리도록 파레토 분포로 배정
+    # 같은 사용자가 같은 글을 두 번 추천하지 않도록 ignore_conflicts 사용
+    def _create_votes(self, users, questions, answers, count, batch_size):
+        question_through = Question.voter.through
+        answer_through = Answer.voter.through
+        question_ids = [question_id for question_id, _ in questions]
+        for targets, through, field in ((question_ids, question_through, 'question_id'),
+                                        (answers, answer_through, 'answer_id')):
+            if not targets:
+                continue
+            weights = [self.random.paretovariate(1.5) for _ in targets]
+            picked = self.random.choices(targets, weights=weights, k=count // 2)
+            rows = {(target, self.random.choice(users)) for target in picked}
+            through.objects.bulk_create([
+                through(**{field: target, 'user_id': user_id}) for target, user_id in rows
+            ], batch_size=batch_size, ignore_conflicts=True)
+        self.stdout.write('추천 약 {}개 생성'.format(count))
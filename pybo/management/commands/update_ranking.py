@@ -0,0 +1,65 @@
+# 질문 목록 정렬용 컬럼 갱신 명령
+# 사용법 : python manage.py update_ranking [--hours 1]
+# 인기 점수(hot_score)를 --hours 시간만큼 감소시킨다. (반감기 PYBO_HOT_HALF_LIFE 시간, pybo/ranking.py 참고)
+# cron 등으로 주기적으로 실행하며, --hours에는 실행 간격을 지정한다. 예) 매시간 실행 : --hours 1
+#
+# python manage.py update_ranking --rebuild
+# 최근 활동 일시(last_activity)와 인기 점수를 답변, 추천 데이터로 다시 계산한다. (컬럼 추가 직후, 데이터를 직접 수정한 경우 등)
+# 추천은 추천한 시각을 저장하지 않으므로, 인기 점수는 (추천 수 x VOTE_WEIGHT + 답변 개수 x ANSWER_WEIGHT)를
+# 최근 활동 일시부터 지난 시간만큼 감소시킨 값으로 계산한다.
+
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from pybo import page_cache, ranking
+from pybo.models import Question, Answer
+
+
+# 질문의 답변들의 column 최댓값 서브쿼리
+def answer_max(column):
+    subquery = Answer.objects.filter(
+        question=OuterRef('pk')
+    ).order_by().values('question').annotate(latest=Max(column)).values('latest')
+    return Coalesce(Subquery(subquery), 'create_date')
+
+
+class Command(BaseCommand):
+    help = '질문 목록 인기순 정렬의 인기 점수를 감소시키거나, 정렬용 컬럼을 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=1.0, help='마지막 실행 후 지난 시간 (실행 간격)')
+        parser.add_argument('--rebuild', action='store_true', help='최근 활동 일시와 인기 점수를 다시 계산')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.rebuild(options['batch_size'])
+            return
+        updated = ranking.decay(options['hours'])
+        self.stdout.write(self.style.SUCCESS('인기 점수 {}건 갱신'.format(updated)))
+
+    def rebuild(self, batch_size):
+        now = timezone.now()
+        with transaction.atomic():
+            # 질문/답변의 작성, 수정 일시 중 가장 최근 값 (UPDATE 문 하나)
+            Question.objects.update(last_activity=Greatest(
+                'create_date', Coalesce('modify_date', 'create_date'),
+                answer_max('create_date'), answer_max('modify_date'),
+            ))
+            # 인기 점수는 지난 시간에 따른 감소 비율을 파이썬에서 계산하여 batch_size개씩 저장
+            batch = []
+            rows = Question.objects.order_by('id').values_list('id', 'vote_count', 'answer_count', 'last_activity')
+            for pk, vote_count, answer_count, last_activity in rows.iterator(chunk_size=batch_size):
+                score = vote_count * ranking.VOTE_WEIGHT + answer_count * ranking.ANSWER_WEIGHT
+                score *= ranking.decay_factor(max((now - last_activity).total_seconds(), 0) / 3600)
+                batch.append(Question(id=pk, hot_score=score if score >= ranking.MIN_SCORE else 0))
+                if len(batch) >= batch_size:
+                    Question.objects.bulk_update(batch, ['hot_score'])
+                    batch = []
+            Question.objects.bulk_update(batch, ['hot_score'])
+        page_cache.bump('board')
+        self.stdout.write(self.style.SUCCESS('정렬용 컬럼 재계산 완료'))
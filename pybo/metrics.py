@@ -0,0 +1,207 @@
+# 성능 측정 데이터 수집 관련 모듈
+# 요청마다 SQL 쿼리 개수/시간, 템플릿 렌더링 시간, 마크다운 변환 시간, 전체 처리 시간을 기록하고(pybo/middleware.py),
+# 뷰 이름(pybo:index, pybo:detail 등)별로 프로세스 내 히스토그램에 모아 둔다.
+# 모아 둔 값은 관리자 전용 화면(pybo:metrics)에서 JSON 또는 Prometheus 텍스트 형식으로 확인할 수 있다.
+
+
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates, Template
+
+
+# 히스토그램 구간 상한 (밀리초)
+BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# 요청마다 기록하는 항목
+# db : SQL 실행 시간, tpl : 템플릿 렌더링 시간, md : 마크다운 변환 시간, total : 전체 처리 시간
+METRICS = ('db', 'tpl', 'md', 'total')
+
+# 현재 처리 중인 요청의 측정값 {'db': ms, 'queries': 개수, ...}
+# contextvars를 사용하므로 스레드, 비동기 태스크마다 따로 관리된다. 요청 처리 중이 아니면 None
+current = contextvars.ContextVar('pybo_metrics', default=None)
+
+
+# 현재 요청의 측정값에 시간(ms) 더하기
+def add(name, ms):
+    values = current.get()
+    if values is not None:
+        values[name] = values.get(name, 0) + ms
+
+
+# with 블록의 실행 시간을 현재 요청의 측정값에 더하는 컨텍스트 매니저
+# 예) with metrics.timer('md'): ...
+@contextmanager
+def timer(name):
+    if current.get() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, (time.perf_counter() - start) * 1000)
+
+
+# connection.execute_wrapper에 등록하는 SQL 측정 함수
+def sql_wrapper(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        values = current.get()
+        if values is not None:
+            values['db'] = values.get('db', 0) + (time.perf_counter() - start) * 1000
+            values['queries'] = values.get('queries', 0) + 1
+
+
+# 데이터베이스 연결이 만들어질 때 SQL 측정 함수를 등록 (PyboConfig.ready에서 connection_created 시그널에 연결)
+# 요청마다 connection.execute_wrapper로 등록하지 않고 연결마다 한 번만 등록하므로,
+# 비동기 뷰에서 sync_to_async로 다른 스레드의 연결을 사용하는 경우에도 측정된다. (요청 처리 중이 아니면 측정하지 않음)
+def install_sql_wrapper(sender, connection, **kwargs):
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+# 구간별 개수를 세는 히스토그램
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # 마지막 칸은 +Inf 구간
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other):
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    # 구간 정보로 추정한 백분위 값 (해당 구간의 상한)
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return BUCKETS[i] if i < len(BUCKETS) else float('inf')
+        return float('inf')
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean': round(self.sum / self.count, 3) if self.count else None,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+
+# 최근 window초 동안의 값만 모으는 히스토그램
+# window를 slots개의 시간 칸으로 나누어, 오래된 칸은 비우고 다시 사용한다.
+class RollingHistogram:
+    def __init__(self, window, slots):
+        self.interval = window / slots
+        self.slots = [(0, Histogram()) for _ in range(slots)]
+        self.total = Histogram()  # 처음부터의 누적값 (Prometheus 출력용)
+
+    def observe(self, value, now):
+        tick = int(now // self.interval)
+        index = tick % len(self.slots)
+        slot_tick, histogram = self.slots[index]
+        if slot_tick != tick:
+            histogram = Histogram()
+            self.slots[index] = (tick, histogram)
+        histogram.observe(value)
+        self.total.observe(value)
+
+    def window(self, now):
+        tick = int(now // self.interval)
+        merged = Histogram()
+        for slot_tick, histogram in self.slots:
+            if tick - slot_tick < len(self.slots):
+                merged.merge(histogram)
+        return merged
+
+
+# 뷰 이름별, 항목별 히스토그램 저장소
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+        self.window = getattr(settings, 'PYBO_METRICS_WINDOW', 60)
+        self.slots = getattr(settings, 'PYBO_METRICS_SLOTS', 6)
+
+    def record(self, view, values):
+        now = time.monotonic()
+        with self._lock:
+            histograms = self._data.get(view)
+            if histograms is None:
+                histograms = self._data[view] = {
+                    name: RollingHistogram(self.window, self.slots) for name in METRICS + ('queries',)}
+            for name, histogram in histograms.items():
+                histogram.observe(values.get(name, 0), now)
+
+    # JSON 출력용 : 최근 window초 동안의 요약값
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {
+                'window_seconds': self.window,
+                'views': {
+                    view: {name: histogram.window(now).summary() for name, histogram in histograms.items()}
+                    for view, histograms in sorted(self._data.items())
+                },
+            }
+
+    # Prometheus 텍스트 출력용 : 처음부터의 누적 히스토그램
+    def prometheus(self):
+        lines = []
+        with self._lock:
+            for name in METRICS + ('queries',):
+                metric = 'pybo_request_queries' if name == 'queries' else 'pybo_request_{}_milliseconds'.format(name)
+                lines.append('# TYPE {} histogram'.format(metric))
+                for view, histograms in sorted(self._data.items()):
+                    total = histograms[name].total
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + ('+Inf',), total.counts):
+                        cumulative += count
+                        lines.append('{}_bucket{{view="{}",le="{}"}} {}'.format(metric, view, bound, cumulative))
+                    lines.append('{}_sum{{view="{}"}} {}'.format(metric, view, round(total.sum, 3)))
+                    lines.append('{}_count{{view="{}"}} {}'.format(metric, view, total.count))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+registry = Registry()
+
+
+# 템플릿 렌더링 시간을 측정하는 템플릿 백엔드
+# config/settings.py의 TEMPLATES 'BACKEND'에 지정하여 사용. render 함수로 렌더링하는 최상위 템플릿 단위로 측정한다.
+# (include 태그로 포함된 템플릿은 최상위 템플릿의 렌더링 시간에 포함됨)
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timer('tpl'):
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
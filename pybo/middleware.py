@@ -0,0 +1,191 @@
+# 장고 미들웨어
+# 미들웨어는 모든 요청/응답이 뷰 앞뒤로 거쳐 가는 처리 단계이다. config/settings.py의 MIDDLEWARE에 등록하여 사용한다.
+
+
+import asyncio
+import mimetypes
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date, quote_etag
+
+from . import metrics, staticfiles
+
+
+# 성능 측정 미들웨어
+# 요청마다 SQL 쿼리 개수와 시간, 템플릿 렌더링 시간, 마크다운 변환 시간, 전체 처리 시간을 측정하여
+# 1) Server-Timing 응답 헤더로 전달 (브라우저 개발자 도구의 Network > Timing 탭에서 확인 가능)
+# 2) 뷰 이름별 히스토그램(pybo/metrics.py)에 기록
+# 측정은 시간 계산과 딕셔너리 갱신 정도이므로 운영 환경에서 켜 두어도 부담이 적다.
+# 전체 처리 시간에 다른 미들웨어의 처리 시간도 포함되도록 MIDDLEWARE 목록의 가장 앞에 둔다.
+# SQL 측정 함수는 데이터베이스 연결마다 등록된다. (pybo/metrics.py의 install_sql_wrapper)
+#
+# 동기(WSGI), 비동기(ASGI) 모두 지원한다. (sync_capable, async_capable)
+# ASGI로 실행할 때 이 미들웨어가 동기 전용이면 장고가 요청 전체를 스레드에서 실행하게 되므로, 비동기 뷰의 이점이 사라진다.
+class PerformanceMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # 장고에게 이 미들웨어가 비동기로 호출되어야 함을 알림 (django.utils.deprecation.MiddlewareMixin과 같은 방식)
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        values = {}
+        token = metrics.current.set(values)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, values, start)
+
+    async def __acall__(self, request):
+        values = {}
+        token = metrics.current.set(values)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current.reset(token)
+        return self.finish(request, response, values, start)
+
+    def finish(self, request, response, values, start):
+        values['total'] = (time.perf_counter() - start) * 1000
+        match = request.resolver_match
+        metrics.registry.record(match.view_name if match else '<unresolved>', values)
+        response['Server-Timing'] = server_timing(values)
+        return response
+
+
+# Server-Timing 헤더 값 생성
+# 예) db;dur=3.2;desc="2 queries", tpl;dur=5.1, md;dur=0.0, total;dur=9.8
+def server_timing(values):
+    parts = []
+    for name in metrics.METRICS:
+        part = '{};dur={:.1f}'.format(name, values.get(name, 0))
+        if name == 'db':
+            part += ';desc="{} queries"'.format(values.get('queries', 0))
+        parts.append(part)
+    return ', '.join(parts)
+
+
+# 스태틱 파일 제공 미들웨어
+# collectstatic 명령으로 STATIC_ROOT에 모은 파일(pybo/staticfiles.py)을 뷰, 세션, 인증 등을 거치지 않고 바로 응답한다.
+# - 브라우저가 보낸 Accept-Encoding에 따라 미리 압축해 둔 .br, .gz 파일을 보낸다. (Vary: Accept-Encoding)
+# - 해시 이름의 파일은 내용이 바뀌지 않으므로 Cache-Control: max-age=1년, immutable을 붙여 브라우저가 다시 확인하지 않게 한다.
+#   원래 이름으로 요청한 파일은 no-cache로 매번 ETag로 확인하게 한다.
+# - ETag/Last-Modified 조건부 요청(304)과 Range 요청(206, 범위 하나만)을 처리한다.
+# STATIC_ROOT에 없는 파일은 다음 단계로 넘긴다. (개발 환경에서는 runserver의 스태틱 파일 처리가 응답)
+# 응답 전체를 만드는 데 필요한 것은 stat()과 파일 읽기뿐이므로 미들웨어 목록에서 세션, 인증 미들웨어보다 앞에 둔다.
+class StaticFilesMiddleware(MiddlewareMixin):
+    def process_request(self, request):
+        if request.method not in ('GET', 'HEAD') or not settings.STATIC_ROOT:
+            return None
+        prefix = urlsplit(settings.STATIC_URL).path
+        if not prefix.startswith('/'):
+            prefix = '/' + prefix
+        if not request.path.startswith(prefix):
+            return None
+        name = request.path[len(prefix):]
+        try:
+            path = staticfiles_storage.path(name)
+        except (SuspiciousFileOperation, NotImplementedError):
+            return None
+        if not name or not os.path.isfile(path):
+            return None
+        return serve_static(request, name, path)
+
+
+# Accept-Encoding 헤더에서 브라우저가 받을 수 있는 압축 형식 (q=0은 제외)
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        encoding, _, params = part.strip().partition(';')
+        quality = params.strip().replace(' ', '')
+        if quality.startswith('q=') and quality[2:] in ('0', '0.0', '0.00', '0.000'):
+            continue
+        if encoding:
+            accepted.add(encoding.strip().lower())
+    return accepted
+
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+# 'bytes=시작-끝' 형식의 Range 헤더를 (시작, 끝) 으로 변환. 범위 하나만 처리하고, 처리할 수 없으면 None
+def parse_range(header, size):
+    match = RANGE_RE.match(header.strip())
+    if match is None or match.group(1) == match.group(2) == '':
+        return None
+    start, end = match.groups()
+    if not start:
+        # 'bytes=-500' : 마지막 500바이트
+        return max(size - int(end), 0), size - 1
+    return int(start), min(int(end), size - 1) if end else size - 1
+
+
+def serve_static(request, name, path):
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoding = None
+    for candidate, extension, _ in staticfiles.encodings():
+        if candidate in accepted and os.path.isfile(path + extension):
+            encoding, path = candidate, path + extension
+            break
+    stat = os.stat(path)
+    etag = quote_etag('{:x}-{:x}'.format(stat.st_size, int(stat.st_mtime)))
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = static_response(request, path, stat.st_size, etag)
+    content_type, _ = mimetypes.guess_type(name)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if staticfiles_storage.is_hashed(name):
+        response['Cache-Control'] = 'public, max-age={}, immutable'.format(settings.PYBO_STATIC_MAX_AGE)
+    else:
+        response['Cache-Control'] = 'public, no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def static_response(request, path, size, etag):
+    byte_range = None
+    if 'HTTP_RANGE' in request.META and request.META.get('HTTP_IF_RANGE', etag) == etag:
+        byte_range = parse_range(request.META['HTTP_RANGE'], size)
+        if byte_range is not None and (byte_range[0] > byte_range[1] or byte_range[0] >= size):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = 'bytes */{}'.format(size)
+            return response
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1
+    if request.method == 'HEAD':
+        response = HttpResponse()
+    elif byte_range is None:
+        response = FileResponse(open(path, 'rb'))
+        del response['Content-Disposition']
+    else:
+        # 요청한 범위만 읽어서 응답 (스태틱 파일은 크지 않으므로 메모리로 읽음)
+        with open(path, 'rb') as f:
+            f.seek(start)
+            response = HttpResponse(f.read(length))
+    if byte_range is not None:
+        response.status_code = 206
+        response['Content-Range'] = 'bytes {}-{}/{}'.format(start, end, size)
+    response['Content-Length'] = str(length)
+    return response
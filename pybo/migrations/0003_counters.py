@@ -0,0 +1,28 @@
+# Generated by Django 4.0.3 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pybo', '0002_searchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answer_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='vote_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
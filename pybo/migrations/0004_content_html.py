@@ -0,0 +1,33 @@
+# Generated by Django 4.0.3 on 2026-10-18 07:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pybo', '0003_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='answer',
+            name='content_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='answer',
+            name='content_html_version',
+            field=models.CharField(default='', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='content_html',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='content_html_version',
+            field=models.CharField(default='', editable=False, max_length=16),
+        ),
+    ]
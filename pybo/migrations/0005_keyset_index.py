@@ -0,0 +1,17 @@
+# Generated by Django 4.0.3 on 2026-10-18 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pybo', '0004_content_html'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['create_date', 'id'], name='pybo_question_created_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.0.3 on 2026-10-18 07:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+# 기존 질문의 최근 활동 일시는 작성 일시로 채움 (답변, 수정 일시까지 반영하려면 update_ranking --rebuild 실행)
+def fill_last_activity(apps, schema_editor):
+    Question = apps.get_model('pybo', 'Question')
+    Question.objects.filter(last_activity__isnull=True).update(last_activity=F('create_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pybo', '0006_answer_list_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='hot_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='last_activity',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_last_activity, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='question',
+            name='last_activity',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['vote_count', 'id'], name='pybo_question_votes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['hot_score', 'id'], name='pybo_question_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['last_activity', 'id'], name='pybo_question_activity_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.3 on 2026-10-18 07:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pybo', '0007_ranking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['question', 'vote_count', 'id'], name='pybo_answer_votes_idx'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.0.3 on 2026-10-18 07:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('pybo', '0009_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedQuestion',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('subject', models.CharField(max_length=200)),
+                ('create_date', models.DateTimeField()),
+                ('modify_date', models.DateTimeField(blank=True, null=True)),
+                ('last_activity', models.DateTimeField()),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+                ('vote_count', models.PositiveIntegerField(default=0)),
+                ('body', models.BinaryField()),
+                ('voters', models.BinaryField(default=b'')),
+                ('answer_voters', models.BinaryField(default=b'')),
+                ('archive_date', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_question', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=2)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='pybo.archivedquestion')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='archivedsearchtoken',
+            index=models.Index(fields=['token', 'question'], name='pybo_archived_token_idx'),
+        ),
+    ]
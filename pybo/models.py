@@ -35,6 +35,39 @@ class Question(models.Model):
     # User 모델을 ManyToManyField 관계로 연결. 다대다(N:N) 관계
     # related_name='voter_question' : 특정 사용자가 추천한 질문 데이터를 얻기 위해서는 [특정 사용자].voter_question.all() 처럼 사용해 가져올 수 있다.
     voter = models.ManyToManyField(User, related_name='voter_question')
+    # 답변 개수, 추천 수 컬럼 (비정규화 카운터)
+    # 목록/상세 화면에서 question.answer_set.count, question.voter.count 처럼 매번 COUNT 쿼리를 실행하지 않도록 개수를 미리 저장해 둔다.
+    # 답변 등록/삭제, 추천 시 F() 표현식으로 데이터베이스에서 직접 1씩 증감시키며, 값이 어긋난 경우 recount 명령으로 다시 계산한다.
+    answer_count = models.PositiveIntegerField(default=0)
+    vote_count = models.PositiveIntegerField(default=0)
+    # 마크다운으로 렌더링한 내용 (HTML) 컬럼
+    # 화면을 보여줄 때마다 마크다운을 변환하지 않도록, 등록/수정 시 렌더링한 결과를 저장해 둔다. (pybo/rendering.py 참고)
+    # content_html_version : 렌더링에 사용한 확장 기능 목록의 해시값. 확장 기능이 바뀌면 저장된 HTML을 다시 만들어야 함을 알 수 있다.
+    # editable=False : 폼이나 관리자 화면에서 직접 수정할 수 없도록 함
+    content_html = models.TextField(default='', editable=False)
+    content_html_version = models.CharField(max_length=16, default='', editable=False)
+    # 질문 목록 정렬용 컬럼 (pybo/ranking.py 참고)
+    # last_activity : 최근 활동 일시. 질문 작성/수정, 답변 작성/수정 시 갱신 (최근 활동순 정렬)
+    # hot_score : 인기 점수. 추천, 답변이 등록될 때마다 더하고 update_ranking 명령으로 주기적으로 감소시킴 (인기순 정렬)
+    # 요청마다 추천인/답변 테이블을 집계하여 정렬하지 않도록 값을 미리 저장해 둔다.
+    last_activity = models.DateTimeField(editable=False)
+    hot_score = models.FloatField(default=0, editable=False)
+
+    class Meta:
+        # 질문 목록의 최신순 정렬(-create_date, -id)과 커서 방식 페이징의 범위 조회가 인덱스를 사용하도록 복합 인덱스 생성
+        # 추천순, 인기순, 최근 활동순 정렬도 각각 (정렬 컬럼, id) 인덱스의 범위 조회로 가져온다.
+        indexes = [
+            models.Index(fields=['create_date', 'id'], name='pybo_question_created_idx'),
+            models.Index(fields=['vote_count', 'id'], name='pybo_question_votes_idx'),
+            models.Index(fields=['hot_score', 'id'], name='pybo_question_hot_idx'),
+            models.Index(fields=['last_activity', 'id'], name='pybo_question_activity_idx'),
+        ]
+
+    # 최근 활동 일시가 없으면 작성 일시로 저장
+    def save(self, *args, **kwargs):
+        if self.last_activity is None:
+            self.last_activity = self.create_date
+        super().save(*args, **kwargs)
 
     # __str__ 메서드(string 메서드)
     # : 장고 모델에서 클래스의 오브젝트를 출력할 때 나타날 내용들을 결정하는 메서드
@@ -57,4 +90,111 @@ class Answer(models.Model):
     # 수정 일시 컬럼
     modify_date = models.DateTimeField(null=True, blank=True)
     # 추천인 컬럼
-    voter = models.ManyToManyField(User, related_name='voter_answer')
\ No newline at end of file
+    voter = models.ManyToManyField(User, related_name='voter_answer')
+    # 추천 수 컬럼 (비정규화 카운터)
+    vote_count = models.PositiveIntegerField(default=0)
+    # 마크다운으로 렌더링한 내용 (HTML) 컬럼
+    content_html = models.TextField(default='', editable=False)
+    content_html_version = models.CharField(max_length=16, default='', editable=False)
+
+    class Meta:
+        # 질문 상세 화면의 답변 목록 조회(question_id = ? ORDER BY create_date, id)가 인덱스 순서대로 읽도록 복합 인덱스 생성
+        # 외래키 question_id 단독 인덱스로는 해당 질문의 답변을 모두 읽은 후 따로 정렬해야 한다.
+        # 추천순 정렬(-vote_count, -id)과 답변 위치(페이지 번호) 계산도 같은 방식으로 (question, vote_count, id) 인덱스를 사용
+        indexes = [
+            models.Index(fields=['question', 'create_date', 'id'], name='pybo_answer_question_idx'),
+            models.Index(fields=['question', 'vote_count', 'id'], name='pybo_answer_votes_idx'),
+        ]
+
+
+# 검색 색인 모델 (역색인)
+# 질문/답변의 제목, 내용, 글쓴이를 n-gram 토큰으로 나누어 저장. (토큰 생성은 pybo/search.py 참고)
+# 검색 시 token 인덱스로 해당 토큰이 포함된 질문을 바로 찾을 수 있으므로, 전체 테이블을 LIKE로 훑지 않아도 된다.
+class SearchToken(models.Model):
+    # 토큰 최대 길이 (bigram)
+    TOKEN_MAX_LENGTH = 2
+
+    # 검색 결과는 질문 단위이므로 답변의 토큰도 질문을 함께 저장
+    # 질문 또는 답변이 삭제되면 색인 행도 함께 삭제
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    # 답변의 토큰인 경우에만 값이 있음. 질문 본문의 토큰은 null
+    answer = models.ForeignKey(Answer, on_delete=models.CASCADE, null=True, blank=True)
+    # n-gram 토큰
+    token = models.CharField(max_length=TOKEN_MAX_LENGTH)
+    # 관련도 계산용 가중치 (제목 > 글쓴이 > 내용)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        # 토큰으로 질문을 찾는 검색 쿼리가 인덱스만으로 처리되도록 (token, question) 복합 인덱스 생성
+        indexes = [
+            models.Index(fields=['token', 'question'], name='pybo_search_token_idx'),
+        ]
+
+# 백그라운드 작업 큐 모델 (pybo/tasks.py 참고)
+# 질문/답변 저장 후 처리할 작업(마크다운 렌더링, 검색 색인 등)을 저장하는 테이블.
+# 작업 행은 질문/답변과 같은 트랜잭션에서 저장되므로, 프로세스가 재시작되어도 작업이 사라지지 않는다.
+# 작업이 성공하면 행을 삭제하므로, 테이블에는 아직 실행하지 않았거나 실패한 작업만 남는다.
+class Task(models.Model):
+    # 작업 함수 이름 (pybo/tasks.py의 register로 등록한 함수)
+    name = models.CharField(max_length=100)
+    # 작업 함수에 전달할 인자 목록
+    args = models.JSONField(default=list)
+    # 이 시각 이후에 실행. 작업을 가져간(claim) 워커는 이 값을 실행 제한 시간(PYBO_TASK_LEASE)만큼 뒤로 미뤄 다른 워커가 가져가지 못하게 한다.
+    # 워커가 작업 도중 종료되면 제한 시간이 지난 후 다른 워커가 다시 실행한다. (최소 한 번 실행, at-least-once)
+    run_after = models.DateTimeField()
+    # 실행 횟수
+    attempts = models.PositiveIntegerField(default=0)
+    # PYBO_TASK_MAX_ATTEMPTS번 모두 실패한 작업. 더 이상 실행하지 않는다. (run_pybo_tasks --retry-failed로 다시 실행)
+    failed = models.BooleanField(default=False)
+    # 마지막 실패 오류 내용
+    last_error = models.TextField(default='', blank=True)
+    # 등록 일시
+    create_date = models.DateTimeField()
+
+    class Meta:
+        # 실행할 작업 조회(failed = 0 AND run_after <= 현재 시각 ORDER BY run_after, id)가 인덱스 범위로 처리되도록 복합 인덱스 생성
+        indexes = [
+            models.Index(fields=['failed', 'run_after', 'id'], name='pybo_task_due_idx'),
+        ]
+
+    def __str__(self):
+        return '{}{}'.format(self.name, tuple(self.args))
+
+
+# 보관된 질문 모델 (pybo/archive.py 참고)
+# 오랫동안 활동이 없는 질문을 답변, 추천과 함께 한 행으로 묶어 저장한다. (질문, 답변, 추천인, 검색 색인 테이블에서는 삭제)
+# 자주 읽는 테이블과 인덱스의 크기가 줄어들어, 목록/검색/백업이 다루는 데이터가 작아진다.
+# 보관된 질문은 읽기 전용이다. (답변, 추천, 수정 불가. 복원 후 가능)
+class ArchivedQuestion(models.Model):
+    # 원래 질문 id를 그대로 사용하므로, 질문 상세 화면 URL이 바뀌지 않는다.
+    id = models.BigIntegerField(primary_key=True)
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_question')
+    subject = models.CharField(max_length=200)
+    create_date = models.DateTimeField()
+    modify_date = models.DateTimeField(null=True, blank=True)
+    last_activity = models.DateTimeField()
+    answer_count = models.PositiveIntegerField(default=0)
+    vote_count = models.PositiveIntegerField(default=0)
+    # 질문 내용과 답변 목록을 JSON으로 만들어 zlib으로 압축한 값
+    body = models.BinaryField()
+    # 질문 추천인 id 배열, (답변 id, 추천인 id) 쌍의 배열을 8바이트 정수로 붙여 저장한 값
+    voters = models.BinaryField(default=b'')
+    answer_voters = models.BinaryField(default=b'')
+    # 보관 일시
+    archive_date = models.DateTimeField()
+
+    def __str__(self):
+        return self.subject
+
+
+# 보관된 질문의 검색 색인 모델
+# 보관할 때 질문/답변의 색인 행을 (질문, 토큰)마다 가중치를 합쳐 한 행으로 줄여 저장한다. (검색 결과는 질문 단위이므로)
+class ArchivedSearchToken(models.Model):
+    question = models.ForeignKey(ArchivedQuestion, on_delete=models.CASCADE)
+    token = models.CharField(max_length=SearchToken.TOKEN_MAX_LENGTH)
+    weight = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['token', 'question'], name='pybo_archived_token_idx'),
+        ]
@@ -0,0 +1,132 @@
+# 페이지 캐시 관련 모듈
+# 로그아웃 상태의 사용자가 요청한 질문 목록(index), 질문 상세(detail) 화면의 응답 전체를 캐시에 저장해 두고,
+# 같은 요청이 다시 오면 ORM 조회와 템플릿 렌더링 없이 저장된 응답을 돌려준다.
+#
+# 캐시 무효화는 TTL(만료 시간)에만 의존하지 않고 "버전 키"를 사용한다.
+# - 'board' : 질문 목록 화면 전체의 버전. 질문/답변이 등록, 수정, 삭제되면 바뀜
+# - 'question:{question_id}' : 질문 상세 화면 하나의 버전. 해당 질문과 그 답변이 등록, 수정, 삭제, 추천되면 바뀜
+# 페이지 캐시 키에 버전 값을 포함시키므로, 버전이 바뀌면 이전에 저장된 응답은 다시 사용되지 않는다.
+#
+# 로그인한 사용자는 수정/삭제 버튼, 사용자명 등 사용자별 내용이 있으므로 캐시를 사용하지 않는다.
+
+
+import asyncio
+import hashlib
+import re
+import uuid
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+
+# 답변 등록 폼의 CSRF 토큰 input 태그
+# 토큰은 사용자마다 달라야 하므로, 캐시에는 자리 표시자로 바꾸어 저장하고 응답할 때 현재 사용자의 토큰으로 다시 채운다.
+CSRF_INPUT_RE = re.compile(rb'<input type="hidden" name="csrfmiddlewaretoken" value="[^"]*">')
+CSRF_PLACEHOLDER = b'<!--pybo-csrf-token-->'
+
+
+def get_cache():
+    return caches[settings.PYBO_PAGE_CACHE_ALIAS]
+
+
+def _version_key(name):
+    return 'pybo:version:{}'.format(name)
+
+
+# 버전 값 조회. 버전 값이 없으면(처음 요청이거나 캐시에서 밀려난 경우) 새로 만든다.
+def get_versions(names):
+    cache = get_cache()
+    keys = [_version_key(name) for name in names]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = uuid.uuid4().hex
+            cache.set(key, versions[key], None)
+    return [versions[key] for key in keys]
+
+
+# 버전 변경. 해당 버전을 사용하는 페이지 캐시가 모두 무효화된다.
+def bump(*names):
+    get_cache().set_many({_version_key(name): uuid.uuid4().hex for name in names}, None)
+
+
+# 질문(또는 그 답변)이 변경되었을 때 호출
+# board=False : 추천처럼 질문 목록 화면에는 영향이 없는 변경인 경우
+def invalidate(question_id, board=True):
+    names = ['question:{}'.format(question_id)]
+    if board:
+        names.append('board')
+    bump(*names)
+
+
+# 페이지 캐시를 사용할 수 있는 요청인지 확인
+# 로그아웃 상태의 GET 요청이고, 화면에 보여줄 메시지(messages 쿠키)가 없는 경우에만 사용
+def _cacheable(request):
+    return (
+        request.method in ('GET', 'HEAD')
+        and not request.user.is_authenticated
+        and 'messages' not in request.COOKIES
+    )
+
+
+# 페이지 캐시 키 : 경로 + 쿼리스트링 + 언어 + 버전 값들의 해시값
+def _page_key(request, versions):
+    raw = '|'.join([request.path, request.META.get('QUERY_STRING', ''), get_language() or ''] + versions)
+    return 'pybo:page:{}'.format(hashlib.sha1(raw.encode()).hexdigest())
+
+
+def _fill_csrf(request, response):
+    if CSRF_PLACEHOLDER in response.content:
+        token = '<input type="hidden" name="csrfmiddlewaretoken" value="{}">'.format(get_token(request))
+        response.content = response.content.replace(CSRF_PLACEHOLDER, token.encode())
+    return response
+
+
+# 응답을 페이지 캐시에 저장. 저장할 수 없는 응답(오류, 스트리밍, 쿠키 설정)은 그대로 리턴
+def _store(cache, key, response):
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return response
+    patch_vary_headers(response, ['Cookie'])
+    content = response.content
+    response.content = CSRF_INPUT_RE.sub(CSRF_PLACEHOLDER, content)
+    cache.set(key, response, settings.PYBO_PAGE_CACHE_TIMEOUT)
+    response.content = content
+    return response
+
+
+# 로그아웃 상태 사용자의 응답을 캐시하는 뷰 데코레이터
+# version : 이 화면이 의존하는 버전 이름. URL 매개변수로 포맷팅된다. 예) 'question:{question_id}'
+# 동기 뷰와 비동기 뷰(async def) 모두에 사용할 수 있다.
+def cache_anonymous_page(version):
+    def decorator(view_func):
+        if asyncio.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                # request.user 확인 시 세션/사용자 조회 쿼리가 실행될 수 있으므로 sync_to_async로 실행
+                if not settings.PYBO_PAGE_CACHE_ENABLED or not await sync_to_async(_cacheable)(request):
+                    return await view_func(request, *args, **kwargs)
+                cache = get_cache()
+                key = _page_key(request, get_versions([version.format(**kwargs)]))
+                response = cache.get(key)
+                if response is None:
+                    return _store(cache, key, await view_func(request, *args, **kwargs))
+                return _fill_csrf(request, response)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not settings.PYBO_PAGE_CACHE_ENABLED or not _cacheable(request):
+                return view_func(request, *args, **kwargs)
+            cache = get_cache()
+            key = _page_key(request, get_versions([version.format(**kwargs)]))
+            response = cache.get(key)
+            if response is None:
+                return _store(cache, key, view_func(request, *args, **kwargs))
+            return _fill_csrf(request, response)
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+# 커서(keyset) 기반 페이징 관련 모듈
+# Paginator를 이용한 ?page=N 방식은 요청마다 전체 개수(COUNT)를 세고, OFFSET 만큼 앞의 행을 읽고 버리므로 뒤쪽 페이지일수록 느려진다.
+# 커서 방식은 (작성 일시, id)를 기준으로 "이 글보다 오래된(또는 최신의) 글 10개"를 조회하므로,
+# (create_date, id) 인덱스를 이용한 범위 조회만으로 어느 페이지든 같은 비용으로 가져올 수 있다.
+
+
+import base64
+import hashlib
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Question
+
+
+# 정렬 기준 컬럼 종류별로 커서 문자열의 값을 원래 값으로 바꾸는 함수
+VALUE_TYPES = {
+    'DateTimeField': datetime.fromisoformat,
+    'PositiveIntegerField': int,
+    'FloatField': float,
+}
+
+
+# 커서 문자열 생성. 마지막으로 보여준 질문의 (정렬 기준 값, id)를 URL에 사용할 수 있는 문자열로 변환
+# key : 정렬 기준 컬럼. 기본은 작성 일시(create_date), 정렬 방식에 따라 추천 수 등 (pybo/ranking.py 참고)
+def encode_cursor(obj, key='create_date'):
+    value = getattr(obj, key)
+    raw = '{}|{}'.format(value.isoformat() if isinstance(value, datetime) else value, obj.id)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+# 커서 문자열을 (정렬 기준 값, id)로 복원. 잘못된 값이면 None을 리턴
+def decode_cursor(cursor, key='create_date'):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        value, pk = raw.split('|')
+        return VALUE_TYPES[Question._meta.get_field(key).get_internal_type()](value), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# 커서 방식의 페이지 객체
+# 템플릿에서 Paginator의 Page 객체처럼 순회하거나 has_next, has_previous를 사용할 수 있다.
+class CursorPage:
+    # cursor : 이 페이지를 요청한 커서. 마지막 글 이후의 커서(글이 삭제된 경우 등)로 요청하여 빈 페이지가 되면 이전 페이지 커서로 사용
+    def __init__(self, object_list, has_next, has_previous, key='create_date', cursor=''):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.key = key
+        self.cursor = cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    # 다음 페이지(더 오래된 글) 커서
+    @property
+    def next_cursor(self):
+        return encode_cursor(self.object_list[-1], self.key) if self.has_next else ''
+
+    # 이전 페이지(더 최신 글) 커서
+    @property
+    def previous_cursor(self):
+        if not self.has_previous:
+            return ''
+        return encode_cursor(self.object_list[0], self.key) if self.object_list else self.cursor
+
+
+# 최신 글 순서(-create_date, -id)로 정렬된 질문 목록을 커서 방식으로 페이징
+# after : 이 커서보다 오래된 글 (다음 페이지), before : 이 커서보다 최신 글 (이전 페이지)
+# per_page + 1개를 조회하여, 한 개가 더 있으면 그 방향으로 페이지가 더 있다는 것을 알 수 있다. (COUNT 쿼리가 필요 없음)
+# key : 정렬 기준 컬럼. (-key, -id) 순서로 정렬하며, (key, id) 인덱스가 있으면 어느 페이지든 인덱스 범위 조회로 가져온다.
+def cursor_paginate(queryset, per_page, after='', before='', key='create_date'):
+    cursor = after
+    after = decode_cursor(after, key) if after else None
+    before = decode_cursor(before, key) if before else None
+    if before:
+        value, pk = before
+        rows = list(queryset.filter(
+            Q(**{key + '__gt': value}) | Q(**{key: value, 'id__gt': pk})
+        ).order_by(key, 'id')[:per_page + 1])
+        if len(rows) <= per_page:
+            # 더 최신 글이 없다면 첫 페이지를 보여준다. (첫 페이지에 10개가 다 채워지도록)
+            return cursor_paginate(queryset, per_page, key=key)
+        return CursorPage(rows[:per_page][::-1], has_next=True, has_previous=True, key=key)
+    queryset = queryset.order_by('-' + key, '-id')
+    if after:
+        value, pk = after
+        queryset = queryset.filter(Q(**{key + '__lt': value}) | Q(**{key: value, 'id__lt': pk}))
+    rows = list(queryset[:per_page + 1])
+    return CursorPage(rows[:per_page], has_next=len(rows) > per_page, has_previous=after is not None, key=key,
+                      cursor=cursor)
+
+
+# 대략적인 전체 개수
+# 정확한 개수를 매 요청마다 세지 않고, 같은 쿼리의 COUNT 결과를 캐시에 PYBO_APPROXIMATE_COUNT_TIMEOUT 초 동안 보관하여 재사용
+def approximate_count(queryset):
+    # 결과가 없는 쿼리(ex. 구두점만 있는 검색어의 queryset.none())는 SQL로 만들 수 없으므로(EmptyResultSet) 바로 0을 리턴
+    if queryset.query.is_empty():
+        return 0
+    key = 'pybo:count:{}'.format(hashlib.sha1(str(queryset.query).encode()).hexdigest())
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, getattr(settings, 'PYBO_APPROXIMATE_COUNT_TIMEOUT', 60))
+    return count
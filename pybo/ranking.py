@@ -0,0 +1,89 @@
+# 질문 목록 정렬(랭킹) 관련 모듈
+# 질문 목록은 ?sort= 값에 따라 다음 컬럼의 역순(-컬럼, -id)으로 정렬한다.
+# - recent (기본값) : 작성 일시 (create_date)
+# - recommend : 추천 수 (vote_count)
+# - popular : 인기 점수 (hot_score)
+# - recent_activity : 최근 활동 일시 (last_activity)
+# 정렬할 때마다 추천인/답변 테이블을 집계하지 않도록 모두 질문 테이블의 컬럼에 값을 미리 저장해 두고, 컬럼마다 (컬럼, id) 인덱스를 만든다.
+# 그래서 어느 정렬이든 커서 방식 페이징(pybo/pagination.py)의 인덱스 범위 조회로 가져올 수 있고, 검색(kw)과 함께 사용할 수 있다.
+#
+# 값은 글을 쓸 때 함께 갱신한다.
+# - 추천 수, 인기 점수 : 추천을 저장할 때(pybo/votes.py) 새로 늘어난 추천 수 x VOTE_WEIGHT를 인기 점수에 더함
+# - 인기 점수, 최근 활동 일시 : 답변을 등록할 때 ANSWER_WEIGHT를 인기 점수에 더하고, 질문/답변을 등록, 수정할 때 최근 활동 일시 갱신
+# 인기 점수는 최근의 추천, 답변일수록 크게 반영되도록 update_ranking 명령으로 주기적으로 감소(decay)시킨다.
+# 반감기는 PYBO_HOT_HALF_LIFE 시간이며, 점수가 MIN_SCORE 미만이 되면 0으로 만들어 더 이상 갱신하지 않는다.
+
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from . import page_cache
+from .models import Question
+
+
+# 정렬 방식 : 정렬 컬럼
+SORTS = {
+    'recent': 'create_date',
+    'recommend': 'vote_count',
+    'popular': 'hot_score',
+    'recent_activity': 'last_activity',
+}
+DEFAULT_SORT = 'recent'
+# 질문 목록 화면에 표시할 정렬 방식 이름
+SORT_LABELS = {
+    'recent': '최신순',
+    'recommend': '추천순',
+    'popular': '인기순',
+    'recent_activity': '최근 활동순',
+}
+
+# 인기 점수 가중치
+VOTE_WEIGHT = 1.0
+ANSWER_WEIGHT = 2.0
+# 이보다 작은 인기 점수는 0으로 만듦
+MIN_SCORE = 0.01
+
+
+# ?sort= 값에 해당하는 정렬 방식. 알 수 없는 값이면 기본값(최신순)
+def get_sort(value):
+    return value if value in SORTS else DEFAULT_SORT
+
+
+# 답변 등록 시 질문에 함께 갱신할 값 (Question.objects.filter(...).update(**answer_created(...)) 형태로 사용)
+def answer_created(when):
+    return {'hot_score': F('hot_score') + ANSWER_WEIGHT, 'last_activity': when}
+
+
+# 답변이 다른 질문으로 옮겨졌을 때 원래 질문에 함께 갱신할 값 (0 미만이 되지 않도록)
+def answer_removed():
+    return {'hot_score': Greatest(F('hot_score') - ANSWER_WEIGHT, Value(0.0))}
+
+
+# 추천 저장 시 추천 수 컬럼과 함께 갱신할 인기 점수
+# count : 새 추천 수를 구하는 식. UPDATE 문에서 우변의 vote_count는 변경 전 값이므로, 차이가 새로 늘어난 추천 수가 된다.
+def vote_score(count):
+    return F('hot_score') + (count - F('vote_count')) * VOTE_WEIGHT
+
+
+# 답변, 추천이 삭제되어 카운터 컬럼(column)을 실제 개수(count)로 다시 계산할 때 함께 갱신할 인기 점수
+# 줄어든 개수 x weight를 빼되, 그동안 감소(decay)한 점수보다 많이 빼서 0 미만이 되지 않도록 한다.
+def recount_score(count, column, weight):
+    return Greatest(F('hot_score') + (count - F(column)) * weight, Value(0.0))
+
+
+# hours 시간이 지났을 때의 인기 점수 감소 비율
+def decay_factor(hours):
+    return 0.5 ** (hours / settings.PYBO_HOT_HALF_LIFE)
+
+
+# 인기 점수 감소. 점수가 있는 질문만 (hot_score, id) 인덱스로 찾아 갱신하고, 갱신한 질문 개수를 리턴
+def decay(hours):
+    with transaction.atomic():
+        updated = Question.objects.filter(hot_score__gte=MIN_SCORE).update(
+            hot_score=F('hot_score') * decay_factor(hours))
+        Question.objects.filter(hot_score__gt=0, hot_score__lt=MIN_SCORE).update(hot_score=0)
+    # 인기순 질문 목록의 페이지 캐시 무효화
+    page_cache.bump('board')
+    return updated
@@ -0,0 +1,115 @@
+# 마크다운 렌더링 관련 모듈
+# 질문/답변 내용을 화면에 보여줄 때마다 markdown.markdown()을 실행하면 긴 글이 많은 상세 화면에서 CPU를 많이 사용하게 된다.
+# 그래서 렌더링 결과를 두 단계로 캐시한다.
+# 1) 저장 후 렌더링한 HTML을 모델의 content_html 컬럼에 저장 (render_content, 백그라운드 작업 pybo/tasks.py에서 실행)
+# 2) 저장된 HTML이 없거나 오래된 경우를 위한, 메모리 사용량이 제한된 프로세스 내 LRU 캐시 (render)
+
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import markdown
+from django.conf import settings
+
+
+# 마크다운 확장 기능
+# nl2br : 줄바꿈 문자를 <br> 로 바꾸어 주는 기능. nl2br을 사용하지 않을 경우, 줄바꿈을 하기 위해서는 줄 끝에 스페이스(' ')를 두개 연속으로 입력해야 함.
+# fenced_code : 마크다운의 소스코드 표현을 위해 필요
+EXTENSIONS = ["nl2br", "fenced_code"]
+
+# 렌더링 버전. 확장 기능 목록이 바뀌면 값이 바뀌므로, 이전 설정으로 저장된 HTML을 구분할 수 있다.
+# 확장 기능을 바꾼 후에는 python manage.py render_markdown 명령으로 저장된 HTML을 다시 만든다.
+RENDER_VERSION = hashlib.sha1(json.dumps(EXTENSIONS).encode()).hexdigest()[:16]
+
+
+# 마크다운 문자열을 HTML로 변환 (캐시 없이 항상 변환)
+def render_markdown(text):
+    return markdown.markdown(text, extensions=EXTENSIONS)
+
+
+# 메모리 사용량(바이트)으로 크기를 제한하는 LRU 캐시
+# functools.lru_cache는 항목 개수로만 제한할 수 있어, 긴 글이 많으면 메모리 사용량을 예측할 수 없으므로 따로 만든다.
+# 여러 스레드에서 동시에 사용할 수 있도록 Lock으로 보호
+class LRUCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[0]
+
+    # 크기는 UTF-8로 인코딩한 바이트 수 (한글은 글자당 3바이트이므로 글자 수로 세면 설정보다 훨씬 많이 저장하게 됨)
+    # 제거할 때 다시 인코딩하지 않도록 값과 함께 보관
+    def set(self, key, value):
+        cost = len(key.encode()) + len(value.encode())
+        if cost > self.max_bytes:  # 캐시 전체보다 큰 값은 저장하지 않음
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._data[key] = (value, cost)
+            self.size += cost
+            # 가장 오래 사용하지 않은 항목부터 제거
+            while self.size > self.max_bytes:
+                _, (_, old_cost) = self._data.popitem(last=False)
+                self.size -= old_cost
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+# 프로세스 내 렌더링 캐시 (config/settings.py의 MARKDOWN_CACHE_MAX_BYTES로 크기 지정)
+cache = LRUCache(getattr(settings, 'MARKDOWN_CACHE_MAX_BYTES', 8 * 1024 * 1024))
+
+
+# 캐시 키 : 렌더링 버전 + 내용의 해시값
+def cache_key(text):
+    return hashlib.sha1((RENDER_VERSION + text).encode()).hexdigest()
+
+
+# 마크다운 문자열을 HTML로 변환 (LRU 캐시 사용)
+def render(text):
+    key = cache_key(text)
+    html = cache.get(key)
+    if html is None:
+        html = render_markdown(text)
+        cache.set(key, html)
+    return html
+
+
+# 질문/답변 객체의 content를 렌더링하여 content_html 컬럼에 저장 (save()는 호출하는 쪽에서 수행)
+# 질문/답변을 등록하거나 수정할 때 저장 직전에 호출한다.
+def render_content(obj):
+    obj.content_html = render(obj.content)
+    obj.content_html_version = RENDER_VERSION
+
+
+# 저장된 HTML 비우기 (save()는 호출하는 쪽에서 수행)
+# 질문/답변을 등록하거나 수정할 때, 렌더링을 백그라운드 작업(pybo/tasks.py)으로 미루는 경우 저장 직전에 호출한다.
+# 작업이 HTML을 저장하기 전까지는 content_html()이 이전 내용의 HTML 대신 새 내용을 렌더링하여 보여준다.
+def clear_content(obj):
+    obj.content_html = ''
+    obj.content_html_version = ''
+
+
+# 화면에 표시할 질문/답변 객체의 HTML
+# 저장된 HTML이 현재 렌더링 버전과 같으면 마크다운 변환 없이 그대로 사용
+def content_html(obj):
+    if obj.content_html_version == RENDER_VERSION:
+        return obj.content_html
+    return render(obj.content)
@@ -0,0 +1,124 @@
+# 검색 색인 관련 모듈
+# 질문/답변의 제목, 내용, 글쓴이를 n-gram 토큰으로 잘라 SearchToken 테이블(역색인)에 저장하고,
+# 검색 시에는 LIKE '%kw%' 전체 스캔 대신 token 인덱스를 이용해 질문을 찾는다.
+# 한글은 띄어쓰기 단위(어절)에 조사가 붙는 경우가 많아 단어 단위 색인으로는 검색이 잘 되지 않으므로,
+# 글자 단위 2-gram(bigram)을 사용한다. 예) '파이보질문' -> '파이', '이보', '보질', '질문'
+# 한 글자 검색어를 위해 글자 하나짜리 토큰도 함께 색인한다. 예) '파', '이', '보', '질', '문'
+
+
+import re
+import unicodedata
+
+from django.db.models import Count, Sum
+
+from .models import SearchToken
+
+
+# n-gram 크기 (SearchToken.token 컬럼의 최대 길이와 같아야 함)
+NGRAM_SIZE = SearchToken.TOKEN_MAX_LENGTH
+
+# 필드별 가중치. 제목에 검색어가 있는 질문이 내용에만 있는 질문보다 앞에 오도록 함
+WEIGHT_SUBJECT = 5
+WEIGHT_USERNAME = 3
+WEIGHT_CONTENT = 1
+
+# 검색어/본문을 단어로 나누기 위한 정규식 (문자, 숫자만 남기고 나머지는 구분자로 취급)
+WORD_RE = re.compile(r'\w+')
+
+
+# 문자열을 n-gram 토큰 집합으로 변환 (검색어에 사용)
+# 한 글자짜리 단어는 그대로 토큰으로 사용
+def tokenize(text):
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    tokens = set()
+    for word in WORD_RE.findall(text):
+        if len(word) <= NGRAM_SIZE:
+            tokens.add(word)
+            continue
+        for i in range(len(word) - NGRAM_SIZE + 1):
+            tokens.add(word[i:i + NGRAM_SIZE])
+    return tokens
+
+
+# 색인할 토큰 집합. n-gram 토큰에 글자 하나짜리 토큰을 더한다.
+# 한 글자 검색어(예: '뷰')도 '뷰함수'처럼 긴 단어 안에 있는 글자를 찾을 수 있도록 하기 위함
+def index_tokenize(text):
+    tokens = tokenize(text)
+    for word in WORD_RE.findall(unicodedata.normalize('NFKC', text or '').lower()):
+        tokens.update(word)
+    return tokens
+
+
+# (텍스트, 가중치) 목록을 받아 토큰별 가중치 합계 딕셔너리를 만든다.
+def _weigh(fields):
+    weights = {}
+    for text, weight in fields:
+        for token in index_tokenize(text):
+            weights[token] = weights.get(token, 0) + weight
+    return weights
+
+
+# 질문 한 건의 색인 행(SearchToken 객체) 목록 생성. 답변 색인은 포함하지 않는다.
+def question_tokens(question):
+    weights = _weigh([
+        (question.subject, WEIGHT_SUBJECT),
+        (question.content, WEIGHT_CONTENT),
+        (question.author.username, WEIGHT_USERNAME),
+    ])
+    return [SearchToken(question_id=question.id, token=token, weight=weight)
+            for token, weight in weights.items()]
+
+
+# 답변 한 건의 색인 행 목록 생성. 검색 결과는 질문 단위이므로 question_id도 함께 저장
+def answer_tokens(answer):
+    weights = _weigh([
+        (answer.content, WEIGHT_CONTENT),
+        (answer.author.username, WEIGHT_USERNAME),
+    ])
+    return [SearchToken(question_id=answer.question_id, answer_id=answer.id, token=token, weight=weight)
+            for token, weight in weights.items()]
+
+
+# 질문 등록/수정 시 호출. 해당 질문 본문의 색인 행만 다시 만든다. (답변 색인 행은 그대로 둔다)
+# 질문/답변 삭제 시에는 ForeignKey의 on_delete=models.CASCADE에 의해 색인 행도 함께 삭제된다.
+def index_question(question):
+    SearchToken.objects.filter(question_id=question.id, answer__isnull=True).delete()
+    SearchToken.objects.bulk_create(question_tokens(question))
+
+
+# 답변 등록/수정 시 호출
+def index_answer(answer):
+    SearchToken.objects.filter(answer_id=answer.id).delete()
+    SearchToken.objects.bulk_create(answer_tokens(answer))
+
+
+# 검색어(kw)로 질문 목록을 필터링하고 관련도 순으로 정렬
+# 검색어의 모든 토큰이 (질문 또는 그 답변들에) 존재하는 질문만 남기고,
+# 일치한 토큰의 가중치 합계(search_score)가 높은 순, 같은 점수라면 최신 순으로 정렬한다.
+def search_questions(queryset, kw):
+    tokens = tokenize(kw)
+    if not tokens:
+        return queryset.none()
+    return queryset.filter(
+        searchtoken__token__in=tokens
+    ).annotate(
+        search_hits=Count('searchtoken__token', distinct=True),
+        search_score=Sum('searchtoken__weight'),
+    ).filter(
+        search_hits=len(tokens)
+    ).order_by('-search_score', '-create_date', '-id')
+
+
+# 검색어(kw)로 답변 목록을 필터링 (관리자 화면의 답변 검색에서 사용)
+# 답변의 색인 행(answer_id가 있는 행)에 검색어의 모든 토큰이 존재하는 답변만 남긴다.
+def search_answers(queryset, kw):
+    tokens = tokenize(kw)
+    if not tokens:
+        return queryset.none()
+    return queryset.filter(
+        searchtoken__token__in=tokens
+    ).annotate(
+        search_hits=Count('searchtoken__token', distinct=True),
+    ).filter(
+        search_hits=len(tokens)
+    )
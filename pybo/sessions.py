@@ -0,0 +1,34 @@
+# 세션 저장소 (SESSION_ENGINE = 'pybo.sessions')
+# 장고 기본 세션 저장소(db)는 로그인한 사용자의 요청마다 세션 테이블을 조회한다.
+# 이 저장소는 장고의 cached_db 저장소처럼 세션을 캐시(SESSION_CACHE_ALIAS)에서 읽고, 캐시에 없을 때만 데이터베이스에서 읽는다.
+# 저장할 때는 데이터베이스와 캐시에 함께 저장하므로(write-through), 캐시가 비워지거나 재시작해도 로그인이 유지된다.
+#
+# 또한 세션 값에 같은 값을 다시 넣는 등 modified 표시만 되고 내용은 그대로인 경우에는 저장(UPDATE)하지 않는다.
+# 요청마다 만료 일시를 늘리는 설정(SESSION_SAVE_EVERY_REQUEST)을 사용하는 경우에는 항상 저장한다.
+
+
+import hashlib
+
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    def __init__(self, session_key=None):
+        super().__init__(session_key)
+        self._loaded_digest = None
+
+    def _digest(self, data):
+        return hashlib.sha1(self.serializer().dumps(data)).hexdigest()
+
+    def load(self):
+        data = super().load()
+        self._loaded_digest = self._digest(data) if data else None
+        return data
+
+    def save(self, must_create=False):
+        if (not must_create and self.session_key is not None and not settings.SESSION_SAVE_EVERY_REQUEST
+                and self._loaded_digest is not None and self._digest(self._session) == self._loaded_digest):
+            return
+        super().save(must_create)
+        self._loaded_digest = self._digest(self._session)
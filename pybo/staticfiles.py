@@ -0,0 +1,89 @@
+# 스태틱 파일 저장소
+# collectstatic 명령으로 STATIC_ROOT에 스태틱 파일을 모을 때
+# 1) 파일 이름에 내용의 해시를 붙인 사본(bootstrap.min.css → bootstrap.min.3180f4a6bd31.css)과 원래 이름 → 해시 이름 목록(staticfiles.json)을 만들고
+#    (장고의 ManifestStaticFilesStorage) {% static %} 태그는 해시 이름의 URL을 출력한다.
+#    내용이 바뀌면 URL도 바뀌므로, 브라우저가 파일을 다시 확인하지 않고 오래(1년) 캐시하게 할 수 있다. (pybo/middleware.py의 StaticFilesMiddleware)
+# 2) 압축할 만한 파일(css, js 등)은 미리 gzip(.gz)으로, brotli 패키지가 설치되어 있으면 brotli(.br)로도 압축해 둔다.
+#    요청마다 압축하지 않고, 브라우저가 지원하는 압축 파일을 그대로 보낸다.
+#
+# collectstatic을 실행하기 전(개발 환경, 테스트)에는 목록 파일이 없으므로, {% static %} 태그는 원래 이름을 그대로 출력한다.
+
+
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# 미리 압축할 파일 확장자 (이미지, 글꼴 등은 이미 압축된 형식이므로 제외)
+COMPRESS_EXTENSIONS = {'.css', '.js', '.map', '.svg', '.txt', '.html', '.json', '.xml', '.ico'}
+# 이보다 작은 파일은 압축해도 줄어드는 크기가 헤더 크기 정도이므로 압축하지 않음
+COMPRESS_MIN_SIZE = 200
+
+
+# 압축 형식별 (Content-Encoding 값, 파일 확장자, 압축 함수). 브라우저가 둘 다 지원하면 앞의 것을 사용한다.
+def encodings():
+    formats = []
+    if brotli is not None:
+        formats.append(('br', '.br', lambda data: brotli.compress(data, quality=11)))
+    # mtime=0 : 내용이 같으면 압축 파일도 항상 같도록
+    formats.append(('gzip', '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)))
+    return formats
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    # 파일 안의 다른 파일 참조를 해시 이름으로 바꾸는 규칙은 css의 url(), @import만 사용
+    # bootstrap.min.js의 sourceMappingURL이 가리키는 .map 파일은 포함되어 있지 않아, js 규칙을 쓰면 collectstatic이 실패한다.
+    patterns = tuple((pattern, rules) for pattern, rules in ManifestStaticFilesStorage.patterns if pattern == '*.css')
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        # 원래 이름의 파일과 해시 이름의 파일을 모두 압축
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+    # 압축한 파일이 원본보다 작을 때만 저장하고, 저장한 파일 이름을 리턴
+    def compress(self, name):
+        if os.path.splitext(name)[1].lower() not in COMPRESS_EXTENSIONS:
+            return []
+        path = self.path(name)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return []
+        saved = []
+        for encoding, extension, compress in encodings():
+            compressed = compress(data)
+            compressed_path = path + extension
+            if len(compressed) >= len(data):
+                # 예전에 만든 압축 파일이 남아 있으면 원본과 내용이 달라질 수 있으므로 지움
+                if os.path.exists(compressed_path):
+                    os.remove(compressed_path)
+                continue
+            with open(compressed_path, 'wb') as f:
+                f.write(compressed)
+            saved.append(name + extension)
+        return saved
+
+    # 목록 파일이 없으면(collectstatic 실행 전) 원래 이름 사용
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    # 해시 이름의 파일인지 (내용이 바뀌지 않으므로 오래 캐시해도 되는 파일)
+    def is_hashed(self, name):
+        hashed_files = self.hashed_files
+        if getattr(self, '_hashed_source', None) is not hashed_files:
+            self._hashed_names = set(hashed_files.values())
+            self._hashed_source = hashed_files
+        return name in self._hashed_names
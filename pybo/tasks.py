@@ -0,0 +1,218 @@
+# 백그라운드 작업 관련 모듈
+# 질문/답변을 저장한 후에 필요한 부가 작업(마크다운 렌더링 결과 저장, 검색 색인 갱신 등)을 요청을 처리하는 스레드에서 하지 않고
+# 작업 큐에 넣은 후 바로 응답한다. 검색 색인은 글 하나에 수백 행을 지우고 다시 쓰므로, 쓰기 요청의 응답 시간이 줄고
+# 글 등록이 몰릴 때 데이터베이스 쓰기 잠금을 오래 잡지 않아 읽기 요청이 덜 밀린다.
+#
+# - 작업은 Task 테이블(pybo/models.py)에 저장한다. 질문/답변과 같은 트랜잭션에서 저장되므로 커밋된 글의 작업은 사라지지 않는다.
+# - 커밋 후(transaction.on_commit) 프로세스 내 스레드 풀(PYBO_TASK_WORKERS개)에 작업 id를 넘겨 바로 실행한다.
+#   스레드 풀에 대기 중인 작업이 PYBO_TASK_QUEUE_SIZE개를 넘으면 넘기지 않고 테이블에만 남겨 둔다.
+# - 테이블에 남은 작업(대기 초과, 재시도, 프로세스 종료로 실행하지 못한 작업)은 PYBO_TASK_POLL_INTERVAL초마다 백그라운드 스레드가
+#   가져와 실행하며(웹 서버 프로세스가 첫 요청을 받을 때 시작), run_pybo_tasks 명령으로 별도의 워커 프로세스에서 실행할 수도 있다.
+# - 작업은 실행 전에 조건부 UPDATE로 가져가므로(claim) 여러 스레드, 프로세스에서 동시에 실행해도 한 곳에서만 실행된다.
+# - 실패한 작업은 PYBO_TASK_RETRY_DELAY초(실패할 때마다 2배)후에 다시 실행하며, PYBO_TASK_MAX_ATTEMPTS번 실패하면 중단한다.
+# - 작업 도중 프로세스가 종료되면 PYBO_TASK_LEASE초 후에 다시 실행되므로, 작업은 여러 번 실행되어도 결과가 같도록 만든다.
+#
+# PYBO_TASKS_EAGER가 True이면(테스트 등) 큐를 사용하지 않고 등록하는 즉시 요청을 처리하는 스레드에서 실행한다.
+
+
+import logging
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import page_cache, rendering, search
+from .models import Question, Answer, Task
+
+
+logger = logging.getLogger(__name__)
+
+# 작업 이름 : 작업 함수
+registry = {}
+
+
+# 작업 함수 등록 (데코레이터)
+# 작업 행에는 함수 이름만 저장하므로, 워커 프로세스에서도 이 모듈을 불러오면 같은 함수를 찾을 수 있다.
+def register(func):
+    registry['{}.{}'.format(func.__module__, func.__qualname__)] = func
+    return func
+
+
+# 작업 등록. 작업 인자는 JSON으로 저장할 수 있는 값(객체 대신 id 등)만 사용한다.
+# 트랜잭션 안에서 호출하면 작업 행도 같은 트랜잭션에 저장되고, 커밋된 후에 스레드 풀에서 실행된다.
+def enqueue(func, *args):
+    name = '{}.{}'.format(func.__module__, func.__qualname__)
+    if registry.get(name) is not func:
+        raise ValueError('등록되지 않은 작업 : {}'.format(name))
+    if settings.PYBO_TASKS_EAGER:
+        func(*args)
+        return None
+    now = timezone.now()
+    task = Task.objects.create(name=name, args=list(args), run_after=now, create_date=now)
+    if settings.PYBO_TASK_WORKERS:
+        transaction.on_commit(lambda: executor.submit(task.id))
+    return task
+
+
+# 작업 가져가기. 실행할 시각이 된 작업이면 실행 시각을 제한 시간만큼 미루고(다른 워커가 가져가지 못하도록) 작업을 리턴
+# 이미 다른 워커가 가져갔거나, 완료되어 삭제된 작업이면 None
+def claim(task_id):
+    now = timezone.now()
+    claimed = Task.objects.filter(pk=task_id, failed=False, run_after__lte=now).update(
+        run_after=now + timedelta(seconds=settings.PYBO_TASK_LEASE),
+        attempts=F('attempts') + 1,
+    )
+    if not claimed:
+        return None
+    return Task.objects.filter(pk=task_id).first()
+
+
+# 가져간 작업 실행. 성공하면 작업 행을 삭제하고, 실패하면 다시 실행할 시각(또는 실패 상태)을 저장한다.
+def execute(task):
+    func = registry.get(task.name)
+    try:
+        if func is None:
+            raise LookupError('등록되지 않은 작업 : {}'.format(task.name))
+        func(*task.args)
+    except Exception:
+        logger.exception('작업 실패 : %s (%d번째)', task, task.attempts)
+        values = {'last_error': traceback.format_exc()}
+        if task.attempts >= settings.PYBO_TASK_MAX_ATTEMPTS:
+            values['failed'] = True
+        else:
+            delay = settings.PYBO_TASK_RETRY_DELAY * 2 ** (task.attempts - 1)
+            values['run_after'] = timezone.now() + timedelta(seconds=delay)
+        Task.objects.filter(pk=task.pk).update(**values)
+        return False
+    Task.objects.filter(pk=task.pk).delete()
+    return True
+
+
+# 작업 id로 가져가서 실행 (스레드 풀에서 호출)
+def run_task(task_id):
+    task = claim(task_id)
+    if task is None:
+        return None
+    return execute(task)
+
+
+# 실행할 시각이 된 작업 id 목록 (오래된 작업부터)
+def due_ids(limit):
+    return list(Task.objects.filter(failed=False, run_after__lte=timezone.now())
+                .order_by('run_after', 'id').values_list('id', flat=True)[:limit])
+
+
+# 실행할 시각이 된 작업을 최대 limit개 차례로 실행하고, 실행한 작업 개수를 리턴 (run_pybo_tasks 명령, 테스트에서 사용)
+def run_due(limit=100):
+    count = 0
+    for task_id in due_ids(limit):
+        if run_task(task_id) is not None:
+            count += 1
+    return count
+
+
+# 프로세스 내 작업 실행기
+# 최대 PYBO_TASK_WORKERS개의 스레드로 작업을 실행하고, 대기 중인 작업 수는 PYBO_TASK_QUEUE_SIZE개로 제한한다.
+class Executor:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool = None
+        self._slots = None  # 실행 중 + 대기 중인 작업 수 제한
+        self._thread = None
+
+    # 작업 id를 스레드 풀에 넘김. 대기 중인 작업이 가득 차면 넘기지 않고 False 리턴 (테이블에 남은 작업은 나중에 실행)
+    def submit(self, task_id):
+        self._start()
+        if not self._slots.acquire(blocking=False):
+            return False
+        self._pool.submit(self._run_task, task_id)
+        return True
+
+    # 스레드 풀 종료. 실행 중인 작업이 끝날 때까지 기다린다. (다음 submit에서 다시 시작)
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    def _start(self):
+        if self._pool is not None:
+            return
+        with self._lock:
+            if self._pool is None:
+                workers = settings.PYBO_TASK_WORKERS
+                self._slots = threading.BoundedSemaphore(workers + settings.PYBO_TASK_QUEUE_SIZE)
+                self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='pybo-tasks')
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._poll, name='pybo-tasks-poll', daemon=True)
+                self._thread.start()
+
+    def _run_task(self, task_id):
+        try:
+            run_task(task_id)
+        except Exception:
+            logger.exception('작업 실행 실패 : %s', task_id)
+        finally:
+            self._slots.release()
+            close_old_connections()
+
+    # 테이블에 남은 작업을 주기적으로 가져와 스레드 풀에 넘김
+    def _poll(self):
+        while True:
+            time.sleep(settings.PYBO_TASK_POLL_INTERVAL)
+            if self._pool is None:  # shutdown() 후에는 다음 submit까지 쉼
+                continue
+            try:
+                for task_id in due_ids(settings.PYBO_TASK_QUEUE_SIZE):
+                    if not self.submit(task_id):
+                        break
+            except Exception:
+                logger.exception('작업 조회 실패')
+            finally:
+                close_old_connections()
+
+
+executor = Executor()
+
+
+# 웹 서버 프로세스가 요청을 받기 시작하면 실행기(폴링 스레드)도 시작 (request_started 신호, pybo/apps.py 참고)
+# 재시작 전에 실행하지 못하고 테이블에 남은 작업을 새 작업 등록(submit)을 기다리지 않고 가져가 실행한다.
+# AppConfig.ready()에서 시작하면 migrate 등 관리 명령에서도 폴링 스레드가 실행되므로, 요청을 처리하는 프로세스에서만 시작한다.
+def start_executor(sender, **kwargs):
+    if settings.PYBO_TASK_WORKERS and not settings.PYBO_TASKS_EAGER:
+        executor._start()
+
+
+# 작업 목록
+# 작업은 여러 번 실행되거나, 그 사이에 글이 수정, 삭제되어도 결과가 어긋나지 않도록 실행할 때의 데이터를 다시 조회하여 처리한다.
+
+# 질문/답변 등록, 수정 후 처리
+# 1) 마크다운 렌더링 결과 저장. 그 사이 내용이 다시 수정되었다면 저장하지 않는다. (수정 때 등록된 작업이 저장)
+#    저장 전까지 화면에서는 content_html()이 LRU 캐시로 렌더링한 HTML을 보여준다. (pybo/rendering.py 참고)
+# 2) 검색 색인 갱신 후, 검색 결과가 바뀌므로 질문 목록 페이지 캐시 무효화
+def _update_post(model, pk, index):
+    obj = model.objects.select_related('author').filter(pk=pk).first()
+    if obj is None:  # 이미 삭제된 글
+        return
+    rendering.render_content(obj)
+    model.objects.filter(pk=pk, content=obj.content).update(
+        content_html=obj.content_html, content_html_version=obj.content_html_version)
+    with transaction.atomic():
+        index(obj)
+    page_cache.bump('board')
+
+
+@register
+def update_question(question_id):
+    _update_post(Question, question_id, search.index_question)
+
+
+@register
+def update_answer(answer_id):
+    _update_post(Answer, answer_id, search.index_answer)
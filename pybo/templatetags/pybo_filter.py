@@ -1,10 +1,11 @@
 # 템플릿 필터 직접 작성
 
 
-import markdown
 from django import template
 from django.utils.safestring import mark_safe
 
+from pybo import metrics, rendering
+
 
 register = template.Library()
 
@@ -19,11 +20,43 @@ def sub(value, arg):
 
 
 # 마크다운 관련 필터
-# mark 함수 : markdown 모듈과 mark_safe 함수를 이용하여 입력 문자열을 HTML로 변환하는 필터 함수
+# mark 함수 : 입력 문자열을 HTML로 변환하는 필터 함수
+# 변환 결과는 pybo/rendering.py의 LRU 캐시에 보관되므로, 같은 내용은 한 번만 변환한다.
 @register.filter
 def mark(value):
-    # nl2br, fenced_code : 마크다운 확장 기능
-    # nl2br : 줄바꿈 문자를 <br> 로 바꾸어 주는 기능. nl2br을 사용하지 않을 경우, 줄바꿈을 하기 위해서는 줄 끝에 스페이스(' ')를 두개 연속으로 입력해야 함.
-    # fended_code : 마크다운의 소스코드 표현을 위해 필요
-    extensions = ["nl2br", "fenced_code"]
-    return mark_safe(markdown.markdown(value, extensions=extensions))
\ No newline at end of file
+    # 마크다운 변환 시간은 성능 측정 항목(md)으로 기록
+    with metrics.timer('md'):
+        return mark_safe(rendering.render(value))
+
+
+# 질문/답변 내용 표시 필터
+# {{ question|mark_content }} 처럼 질문/답변 객체에 사용
+# 등록/수정 시 저장해 둔 HTML(content_html)을 그대로 사용하므로, 마크다운 변환을 하지 않는다.
+@register.filter
+def mark_content(obj):
+    with metrics.timer('md'):
+        return mark_safe(rendering.content_html(obj))
+
+
+# 페이지 번호 목록 관련 태그
+# 현재 페이지를 기준으로 좌우 radius개의 페이지 번호와, 처음/마지막 페이지 번호만 계산하여 리턴
+# 생략되는 구간은 None으로 표시 (템플릿에서 ... 으로 출력)
+# 예) 현재 20페이지, 전체 100페이지, radius=2 -> [1, None, 18, 19, 20, 21, 22, None, 100]
+# paginator.page_range 전체를 순회하지 않으므로, 전체 페이지 수와 관계없이 계산 비용이 일정하다.
+# 사용법 : {% page_window question_list 5 as page_numbers %}
+@register.simple_tag
+def page_window(page_obj, radius=5):
+    num_pages = page_obj.paginator.num_pages
+    start = max(page_obj.number - radius, 1)
+    end = min(page_obj.number + radius, num_pages)
+    page_numbers = []
+    if start > 1:
+        page_numbers.append(1)
+        if start > 2:
+            page_numbers.append(None)
+    page_numbers.extend(range(start, end + 1))
+    if end < num_pages:
+        if end < num_pages - 1:
+            page_numbers.append(None)
+        page_numbers.append(num_pages)
+    return page_numbers
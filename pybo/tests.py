@@ -1,3 +1,1475 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.templatetags.static import static
+from django.core.paginator import Paginator
+from django.core.cache import cache, caches
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import (archive, autocomplete, conditional, database, deletion, metrics, page_cache, pagination, ranking, rendering, search,
+               tasks, votes)
+from .management.commands.check_query_plans import plan_problems, query_plan
+from .middleware import PerformanceMiddleware
+from .models import Question, Answer, ArchivedQuestion, ArchivedSearchToken, SearchToken, Task
+from .templatetags.pybo_filter import page_window
+from .views import async_views, base_views
+
+
+
+# pybo 테스트 공통 클래스
+# 테스트마다 데이터베이스는 되돌려지지만 캐시는 남아 있으므로, 이전 테스트의 페이지 캐시가 사용되지 않도록 캐시를 비운다.
+# 추천 버퍼는 백그라운드 스레드 없이 사용하고, 테스트에서 votes.buffer.flush()로 직접 저장한다.
+# 백그라운드 작업은 큐를 사용하지 않고 등록하는 즉시 실행한다. (큐 테스트는 TaskQueueTest)
+@override_settings(PYBO_VOTE_FLUSH_INTERVAL=None, PYBO_TASKS_EAGER=True)
+class PyboTestCase(TestCase):
+    def setUp(self):
+        for cache_ in caches.all():
+            cache_.clear()
+        votes.buffer.discard()
+        autocomplete.index.reset()
+
+
+# 검색 색인 테스트
+class SearchTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.other = User.objects.create_user(username='django', password='django1234')
+        cls.q1 = Question.objects.create(author=cls.author, subject='파이보 질문입니다',
+                                         content='장고 게시판', create_date=timezone.now())
+        cls.q2 = Question.objects.create(author=cls.other, subject='두 번째 글',
+                                         content='파이썬 코드', create_date=timezone.now())
+        cls.a1 = Answer.objects.create(author=cls.other, question=cls.q2,
+                                       content='마크다운 답변', create_date=timezone.now())
+        for question in (cls.q1, cls.q2):
+            search.index_question(question)
+        search.index_answer(cls.a1)
+
+    def search(self, kw):
+        return list(search.search_questions(Question.objects.all(), kw))
+
+    def test_tokenize_bigram(self):
+        self.assertEqual(search.tokenize('파이보질문'), {'파이', '이보', '보질', '질문'})
+        self.assertEqual(search.tokenize('A b'), {'a', 'b'})
+
+    def test_search_fields(self):
+        self.assertEqual(self.search('파이보'), [self.q1])  # 제목
+        self.assertEqual(self.search('게시판'), [self.q1])  # 내용
+        self.assertEqual(self.search('마크다운'), [self.q2])  # 답변 내용
+        self.assertEqual(self.search('PYBO'), [self.q1])  # 질문 글쓴이 (대소문자 무시)
+        self.assertEqual(self.search('없는검색어'), [])
+
+    def test_single_character(self):
+        # 한 글자 검색어도 긴 단어 안의 글자를 찾음 (예전 icontains 검색과 같음)
+        self.assertEqual(search.index_tokenize('파이보'), {'파이', '이보', '파', '이', '보'})
+        self.assertEqual(self.search('판'), [self.q1])
+        self.assertEqual(self.search('썬'), [self.q2])
+        self.assertEqual(self.search('다 글'), [self.q2])
+
+    def test_ranking(self):
+        # 제목에서 일치한 질문이 내용에서 일치한 질문보다 앞에 온다.
+        q3 = Question.objects.create(author=self.author, subject='기타',
+                                     content='파이보 소개', create_date=timezone.now())
+        search.index_question(q3)
+        self.assertEqual(self.search('파이보'), [self.q1, q3])
+
+    def test_answer_delete_removes_tokens(self):
+        self.a1.delete()
+        self.assertEqual(self.search('마크다운'), [])
+
+    def test_rebuild_command(self):
+        SearchToken.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self.search('마크다운'), [self.q2])
+        # 묶음 단위로 다시 만들어도 색인 행이 중복되지 않음
+        count = SearchToken.objects.count()
+        call_command('rebuild_search_index', batch_size=1, stdout=StringIO())
+        self.assertEqual(SearchToken.objects.count(), count)
+
+    def test_index_view_kw(self):
+        response = self.client.get(reverse('pybo:index'), {'kw': '게시판'})
+        self.assertEqual(list(response.context['question_list']), [self.q1])
+
+    def test_index_view_keeps_ranking(self):
+        # page 값이 없어도 검색 결과는 관련도 순 (최신 글인 q3보다 제목에서 일치한 q1이 앞)
+        q3 = Question.objects.create(author=self.author, subject='기타',
+                                     content='파이보 소개', create_date=timezone.now())
+        search.index_question(q3)
+        response = self.client.get(reverse('pybo:index'), {'kw': '파이보'})
+        self.assertEqual(list(response.context['question_list']), [self.q1, q3])
+        self.assertEqual(response.context['question_list'].paginator.count, 2)
+        # 다른 정렬 방식을 선택하면 그 순서의 커서 방식 페이징
+        response = self.client.get(reverse('pybo:index'), {'kw': '파이보', 'sort': 'recent_activity'})
+        self.assertEqual(list(response.context['question_list']), [q3, self.q1])
+
+
+# 답변 개수, 추천 수 카운터 컬럼 테스트
+class CounterTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.voter = User.objects.create_user(username='django', password='django1234')
+        cls.question = Question.objects.create(author=cls.author, subject='질문', content='내용',
+                                               create_date=timezone.now())
+
+    def test_answer_create_delete(self):
+        self.client.force_login(self.voter)
+        self.client.post(reverse('pybo:answer_create', args=[self.question.id]), {'content': '답변'})
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.answer_count, 1)
+        answer = Answer.objects.get()
+        self.client.get(reverse('pybo:answer_delete', args=[answer.id]))
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.answer_count, 0)
+
+    def test_vote_is_counted_once(self):
+        answer = Answer.objects.create(author=self.author, question=self.question, content='답변',
+                                       create_date=timezone.now())
+        self.client.force_login(self.voter)
+        for _ in range(2):
+            self.client.get(reverse('pybo:question_vote', args=[self.question.id]))
+            self.client.get(reverse('pybo:answer_vote', args=[answer.id]))
+        self.assertEqual(votes.buffer.flush(), 2)
+        self.question.refresh_from_db()
+        answer.refresh_from_db()
+        self.assertEqual(self.question.vote_count, 1)
+        self.assertEqual(answer.vote_count, 1)
+
+    def test_vote_on_deleted_question(self):
+        other = Question.objects.create(author=self.author, subject='다른 질문', content='내용',
+                                        create_date=timezone.now())
+        votes.buffer.add('question', self.question.id, self.voter.id)
+        votes.buffer.add('question', other.id, self.voter.id)
+        deletion.delete_questions(Question.objects.filter(pk=self.question.id))
+        with self.assertLogs('pybo.votes', 'WARNING'):
+            self.assertEqual(votes.buffer.flush(), 2)
+        self.assertEqual(len(votes.buffer), 0)
+        other.refresh_from_db()
+        self.assertEqual(other.vote_count, 1)
+        self.assertEqual(list(other.voter.all()), [self.voter])
+
+    def test_modify_keeps_counters(self):
+        # 수정 화면이 글을 읽은 후 저장하기 전에 다른 요청이 카운터를 바꿔도, 수정 저장이 읽어 둔 값으로 덮어쓰지 않음
+        answer = Answer.objects.create(author=self.author, question=self.question, content='답변',
+                                       create_date=timezone.now())
+        clear_content = rendering.clear_content
+
+        def concurrent_update(obj):
+            Question.objects.update(answer_count=5, vote_count=7, hot_score=3.0)
+            Answer.objects.update(vote_count=7)
+            clear_content(obj)
+
+        admin = User.objects.create_superuser(username='admin', password='admin1234')
+        requests = [
+            (self.author, reverse('pybo:question_modify', args=[self.question.id]), {'subject': '수정', 'content': '수정'}),
+            (self.author, reverse('pybo:answer_modify', args=[answer.id]), {'content': '수정'}),
+            (admin, reverse('admin:pybo_question_change', args=[self.question.id]),
+             {'author': self.author.id, 'subject': '관리자 수정', 'content': '수정',
+              'create_date_0': '2022-01-01', 'create_date_1': '00:00:00'}),
+        ]
+        for user, url, data in requests:
+            Question.objects.update(answer_count=0, vote_count=0, hot_score=0.0)
+            Answer.objects.update(vote_count=0)
+            self.client.force_login(user)
+            with mock.patch.object(rendering, 'clear_content', side_effect=concurrent_update):
+                self.assertEqual(self.client.post(url, data).status_code, 302)
+            self.question.refresh_from_db()
+            answer.refresh_from_db()
+            self.assertEqual((self.question.answer_count, self.question.vote_count, self.question.hot_score),
+                             (5, 7, 3.0))
+            self.assertEqual(answer.vote_count, 7)
+        self.assertEqual(self.question.subject, '관리자 수정')
+        self.assertEqual(answer.content, '수정')
+
+    def test_recount_command(self):
+        answer = Answer.objects.create(author=self.author, question=self.question, content='답변',
+                                       create_date=timezone.now())
+        answer.voter.add(self.voter)
+        self.question.voter.add(self.voter)
+        Question.objects.update(vote_count=7)
+        call_command('recount', stdout=StringIO())
+        self.question.refresh_from_db()
+        answer.refresh_from_db()
+        self.assertEqual((self.question.answer_count, self.question.vote_count), (1, 1))
+        self.assertEqual(answer.vote_count, 1)
+
+
+# 목록/상세 화면의 쿼리 개수 상한 테스트
+# 데이터가 많아져도 화면당 쿼리 개수가 늘어나지 않는지(N+1 문제가 없는지) 확인한다.
+class QueryBudgetTest(PyboTestCase):
+    QUESTIONS = 120
+    ANSWERS = 300
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        User.objects.bulk_create([User(username='user{}'.format(i)) for i in range(30)])
+        cls.users = list(User.objects.order_by('id'))
+        Question.objects.bulk_create([
+            Question(author=cls.users[i % 30], subject='질문 {}'.format(i), content='**내용** {}'.format(i),
+                     create_date=now, last_activity=now) for i in range(cls.QUESTIONS)])
+        cls.question = Question.objects.order_by('id').first()
+        Answer.objects.bulk_create([
+            Answer(author=cls.users[i % 30], question=cls.question, content='답변 {}'.format(i),
+                   create_date=now) for i in range(cls.ANSWERS)])
+        Answer.voter.through.objects.bulk_create([
+            Answer.voter.through(answer_id=answer_id, user_id=cls.users[i % 30].id)
+            for i, answer_id in enumerate(Answer.objects.values_list('id', flat=True))])
+        call_command('recount', stdout=StringIO())
+        call_command('rebuild_search_index', stdout=StringIO())
+
+    def test_index(self):
+        # 전체 개수(COUNT) 1 + 현재 페이지 목록 1
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('pybo:index'), {'page': 3})
+        self.assertEqual(len(response.context['question_list']), 10)
+
+    def test_index_search(self):
+        # 전체 개수(COUNT) 1 + 현재 페이지 목록 1 + 보관된 질문 검색 1 (첫 페이지만)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('pybo:index'), {'kw': '질문', 'page': 1})
+        self.assertEqual(response.context['question_list'].paginator.count, self.QUESTIONS)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('pybo:index'), {'kw': '질문', 'page': 2})
+
+    def test_index_cursor(self):
+        cache.clear()
+        # 첫 요청 : 현재 페이지 목록 1 + 대략적인 전체 개수 1 (이후에는 캐시 사용)
+        with self.assertNumQueries(2):
+            self.client.get(reverse('pybo:index'))
+        # 페이지 캐시를 무효화해도 대략적인 전체 개수는 캐시된 값을 사용
+        page_cache.bump('board')
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('pybo:index'))
+        self.assertEqual(response.context['total'], self.QUESTIONS)
+
+    def test_detail(self):
+        # 질문(+글쓴이, 답변 집계) 1 + 답변 한 페이지(+글쓴이) 1
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('pybo:detail', args=[self.question.id]))
+        self.assertContains(response, '<a id="answer_', count=settings.PYBO_ANSWERS_PER_PAGE)
+        self.assertEqual(response.context['answer_list'].paginator.count, self.ANSWERS)
+
+    def test_detail_authenticated(self):
+        self.client.force_login(self.users[0])
+        # 세션은 캐시에서 읽음 (pybo/sessions.py). 첫 요청 : 사용자 조회 1 + 질문 1 + 답변 1
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('pybo:detail', args=[self.question.id]))
+        self.assertEqual(response.status_code, 200)
+        # 이후에는 사용자도 캐시에서 읽음 (pybo/auth.py) : 질문 1 + 답변 1
+        with self.assertNumQueries(2):
+            self.client.get(reverse('pybo:detail', args=[self.question.id]))
+
+
+# 마크다운 렌더링 캐시 테스트
+class RenderingTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+
+    def setUp(self):
+        rendering.cache.clear()
+
+    def test_detail_does_not_parse_markdown(self):
+        self.client.force_login(self.author)
+        self.client.post(reverse('pybo:question_create'), {'subject': '제목', 'content': '**굵게**'})
+        question = Question.objects.get()
+        self.client.post(reverse('pybo:answer_create', args=[question.id]), {'content': '`코드`'})
+        with mock.patch.object(rendering, 'render_markdown') as render_markdown:
+            response = self.client.get(reverse('pybo:detail', args=[question.id]))
+        render_markdown.assert_not_called()
+        self.assertContains(response, '<strong>굵게</strong>')
+        self.assertContains(response, '<code>코드</code>')
+
+    def test_lru_cache_is_bounded(self):
+        cache = rendering.LRUCache(max_bytes=100)
+        for i in range(10):
+            cache.set('k{}'.format(i), 'x' * 20)
+        self.assertLessEqual(cache.size, 100)
+        self.assertIsNone(cache.get('k0'))
+        self.assertEqual(cache.get('k9'), 'x' * 20)
+        # 한글은 글자당 3바이트로 계산
+        cache.clear()
+        cache.set('k', '가' * 20)
+        self.assertEqual(cache.size, 61)
+        cache.set('k2', '가' * 40)  # 글자 수로는 42이지만 121바이트
+        self.assertIsNone(cache.get('k2'))
+
+    def test_render_markdown_command(self):
+        question = Question.objects.create(author=self.author, subject='제목', content='# 제목',
+                                           create_date=timezone.now())
+        call_command('render_markdown', workers=2, stdout=StringIO())
+        question.refresh_from_db()
+        self.assertEqual(question.content_html_version, rendering.RENDER_VERSION)
+        self.assertEqual(question.content_html, '<h1>제목</h1>')
+
+    def test_render_markdown_command_skips_edited(self):
+        question = Question.objects.create(author=self.author, subject='제목', content='예전 내용',
+                                           create_date=timezone.now())
+
+        # 렌더링하는 동안 글이 수정된 경우
+        def render(content):
+            Question.objects.filter(pk=question.pk).update(content='새 내용')
+            return '<p>{}</p>'.format(content)
+
+        with mock.patch.object(rendering, 'render_markdown', side_effect=render):
+            call_command('render_markdown', workers=1, stdout=StringIO())
+        question.refresh_from_db()
+        self.assertEqual((question.content_html, question.content_html_version), ('', ''))
+
+
+# 커서 방식 페이징 테스트
+class CursorPaginationTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user(username='pybo', password='pybo1234')
+        now = timezone.now()
+        # 작성 일시가 같은 질문이 섞여 있어도 id로 순서가 정해지는지 확인하기 위해 3개씩 같은 일시로 생성
+        Question.objects.bulk_create([
+            Question(author=author, subject='질문 {}'.format(i), content='내용',
+                     create_date=now - timedelta(minutes=i // 3), last_activity=now) for i in range(25)])
+        cls.expected = list(Question.objects.order_by('-create_date', '-id'))
+
+    def test_forward_and_backward(self):
+        pages = []
+        page = pagination.cursor_paginate(Question.objects.all(), 10)
+        pages.append(list(page))
+        while page.has_next:
+            page = pagination.cursor_paginate(Question.objects.all(), 10, after=page.next_cursor)
+            pages.append(list(page))
+        self.assertEqual([q for rows in pages for q in rows], self.expected)
+        self.assertEqual([len(rows) for rows in pages], [10, 10, 5])
+        # 마지막 페이지에서 이전 페이지로
+        page = pagination.cursor_paginate(Question.objects.all(), 10, before=page.previous_cursor)
+        self.assertEqual(list(page), pages[1])
+        page = pagination.cursor_paginate(Question.objects.all(), 10, before=page.previous_cursor)
+        self.assertEqual(list(page), pages[0])
+        self.assertFalse(page.has_previous)
+
+    def test_invalid_cursor(self):
+        page = pagination.cursor_paginate(Question.objects.all(), 10, after='invalid!')
+        self.assertEqual(list(page), self.expected[:10])
+
+    def test_cursor_after_last(self):
+        # 마지막 글 이후의 커서이면 빈 페이지, 이전 페이지는 마지막 페이지
+        after = pagination.encode_cursor(self.expected[-1])
+        page = pagination.cursor_paginate(Question.objects.all(), 10, after=after)
+        self.assertEqual((list(page), page.has_next, page.has_previous), ([], False, True))
+        page = pagination.cursor_paginate(Question.objects.all(), 10, before=page.previous_cursor)
+        self.assertEqual(list(page), self.expected[-11:-1])
+        self.assertEqual(self.client.get(reverse('pybo:index'), {'after': after}).status_code, 200)
+
+    def test_punctuation_only_keyword(self):
+        # 검색어에 단어가 없으면 빈 결과(queryset.none()), 대략적인 전체 개수는 0
+        self.assertEqual(pagination.approximate_count(Question.objects.none()), 0)
+        for kw in ('!!!', '%', ' '):
+            response = self.client.get(reverse('pybo:index'), {'kw': kw})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(list(response.context['question_list']), [])
+
+    def test_index_view(self):
+        response = self.client.get(reverse('pybo:index'))
+        next_cursor = response.context['question_list'].next_cursor
+        response = self.client.get(reverse('pybo:index'), {'after': next_cursor})
+        self.assertEqual(list(response.context['question_list']), self.expected[10:20])
+        self.assertContains(response, 'before=')
+        # 기존 ?page=N 방식도 그대로 동작
+        response = self.client.get(reverse('pybo:index'), {'page': 2})
+        self.assertEqual(list(response.context['question_list']), self.expected[10:20])
+
+
+# 페이지 번호 목록(page_window) 테스트
+class PageWindowTest(PyboTestCase):
+    def window(self, number, count, radius=2):
+        return page_window(Paginator(range(count), 1).page(number), radius)
+
+    def test_window(self):
+        self.assertEqual(self.window(1, 3), [1, 2, 3])
+        self.assertEqual(self.window(20, 100), [1, None, 18, 19, 20, 21, 22, None, 100])
+        self.assertEqual(self.window(4, 100), [1, 2, 3, 4, 5, 6, None, 100])
+        self.assertEqual(self.window(97, 100), [1, None, 95, 96, 97, 98, 99, 100])
+
+    def test_deep_page(self):
+        # 페이지 수가 많아도 화면에 보여줄 번호만 계산
+        self.assertEqual(len(self.window(40000, 50000, radius=5)), 15)
+
+    def test_index_renders_window(self):
+        author = User.objects.create_user(username='pybo', password='pybo1234')
+        Question.objects.bulk_create([
+            Question(author=author, subject='질문', content='내용', create_date=timezone.now(),
+                     last_activity=timezone.now())
+            for _ in range(300)])
+        response = self.client.get(reverse('pybo:index'), {'page': 15})
+        self.assertContains(response, 'data-page="1"')
+        self.assertContains(response, 'data-page="30"')
+        self.assertContains(response, '&hellip;', count=2)
+        self.assertNotContains(response, 'data-page="2"')
+
+
+# 로그아웃 사용자용 페이지 캐시 테스트
+class PageCacheTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.voter = User.objects.create_user(username='django', password='django1234')
+        cls.question = Question.objects.create(author=cls.author, subject='질문', content='내용',
+                                               create_date=timezone.now())
+
+    def test_anonymous_detail_is_cached(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertContains(response, '0개의 답변이 있습니다.')
+
+    def test_csrf_token_is_not_shared(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        self.client.get(url)
+        other = self.client_class()
+        response = other.get(url)
+        self.assertNotContains(response, page_cache.CSRF_PLACEHOLDER.decode())
+        self.assertContains(response, 'name="csrfmiddlewaretoken"')
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_answer_create_invalidates(self):
+        detail_url = reverse('pybo:detail', args=[self.question.id])
+        self.client.get(detail_url)
+        self.client.get(reverse('pybo:index'))
+        writer = self.client_class()
+        writer.force_login(self.voter)
+        writer.post(reverse('pybo:answer_create', args=[self.question.id]), {'content': '새 답변'})
+        self.assertContains(self.client.get(detail_url), '새 답변')
+        self.assertContains(self.client.get(reverse('pybo:index')), '<span class="text-danger small mx-2">1</span>')
+
+    def test_vote_invalidates_detail(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        self.client.get(url)
+        versions = page_cache.get_versions(['board'])
+        writer = self.client_class()
+        writer.force_login(self.voter)
+        writer.get(reverse('pybo:question_vote', args=[self.question.id]))
+        votes.buffer.flush()
+        self.assertContains(self.client.get(url), '<span class="badge rounded-pill bg-success">1</span>')
+        # 추천은 추천순/인기순 정렬을 바꾸므로 질문 목록 캐시도 무효화한다.
+        self.assertNotEqual(page_cache.get_versions(['board']), versions)
+
+    def test_authenticated_bypass(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        self.client.get(url)
+        self.client.force_login(self.author)
+        response = self.client.get(url)
+        self.assertContains(response, reverse('pybo:question_modify', args=[self.question.id]))
+
+
+# 데이터 생성(seed_pybo), 성능 측정(bench_pybo) 명령 테스트
+class BenchCommandTest(PyboTestCase):
+    def test_seed_and_bench(self):
+        call_command('seed_pybo', users=5, questions=30, answers=60, votes=40, stdout=StringIO())
+        self.assertEqual(Question.objects.count(), 30)
+        self.assertEqual(Answer.objects.count(), 60)
+        self.assertEqual(sum(Question.objects.values_list('answer_count', flat=True)), 60)
+        out = StringIO()
+        call_command('bench_pybo', requests=3, warmup=0, scenario=['index', 'detail_huge', 'answer_create'],
+                     stdout=out, stderr=StringIO())
+        report = json.loads(out.getvalue())
+        self.assertEqual(set(report['scenarios']), {'index', 'detail_huge', 'answer_create'})
+        self.assertIn('p99_ms', report['scenarios']['index'])
+        # 측정 중 등록한 답변은 되돌려진다.
+        self.assertEqual(Answer.objects.count(), 60)
+
+
+# 성능 측정 미들웨어 테스트
+class MetricsTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.staff = User.objects.create_user(username='admin', password='admin1234', is_staff=True)
+        cls.question = Question.objects.create(author=cls.author, subject='질문', content='*내용*',
+                                               create_date=timezone.now(), answer_count=1)
+        Answer.objects.create(author=cls.staff, question=cls.question, content='답변', create_date=timezone.now())
+
+    def setUp(self):
+        super().setUp()
+        metrics.registry.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('pybo:detail', args=[self.question.id]))
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'tpl', 'md', 'total'})
+        self.assertIn('desc="2 queries"', timing['db'])
+
+    def test_registry_snapshot(self):
+        for _ in range(3):
+            self.client.get(reverse('pybo:index'), {'page': 1})
+        self.client.force_login(self.staff)
+        data = self.client.get(reverse('pybo:metrics')).json()
+        self.assertEqual(data['views']['pybo:index']['total']['count'], 3)
+        # 첫 요청만 쿼리 2개, 나머지는 페이지 캐시 사용
+        self.assertEqual(data['views']['pybo:index']['queries']['mean'], 0.667)
+
+    def test_prometheus(self):
+        self.client.get(reverse('pybo:index'))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('pybo:metrics'), {'format': 'prometheus'})
+        self.assertContains(response, 'pybo_request_total_milliseconds_count{view="pybo:index"} 1')
+        self.assertContains(response, 'le="+Inf"')
+
+    def test_staff_only(self):
+        self.client.force_login(self.author)
+        response = self.client.get(reverse('pybo:metrics'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_rolling_window(self):
+        histogram = metrics.RollingHistogram(window=60, slots=6)
+        histogram.observe(3, now=0)
+        histogram.observe(30, now=55)
+        self.assertEqual(histogram.window(now=59).count, 2)
+        self.assertEqual(histogram.window(now=65).count, 1)  # 첫 번째 칸(0~10초)은 만료
+        self.assertEqual(histogram.total.count, 2)
+
+
+class AsyncViewTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.question = Question.objects.create(author=cls.author, subject='비동기 질문', content='**굵게**',
+                                               create_date=timezone.now())
+        Answer.objects.create(author=cls.author, question=cls.question, content='*답변*', create_date=timezone.now())
+        Question.objects.filter(pk=cls.question.pk).update(answer_count=1)
+
+    def request(self, path):
+        request = AsyncRequestFactory().get(path)
+        request.user = AnonymousUser()
+        return request
+
+    def test_index(self):
+        response = async_to_sync(async_views.index)(self.request(reverse('pybo:index')))
+        self.assertContains(response, '비동기 질문')
+
+    def test_detail_renders_stale_markdown(self):
+        response = async_to_sync(async_views.detail)(
+            self.request(reverse('pybo:detail', args=[self.question.id])), question_id=self.question.id)
+        self.assertContains(response, '<strong>굵게</strong>', html=True)
+        self.assertContains(response, '<em>답변</em>', html=True)
+
+    def test_detail_not_found(self):
+        with self.assertRaises(Http404):
+            async_to_sync(async_views.detail)(self.request('/pybo/0/'), question_id=0)
+
+    def test_middleware_async(self):
+        async def view(request):
+            return await async_views.index(request)
+
+        middleware = PerformanceMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(self.request(reverse('pybo:index')))
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertNotIn('desc="0 queries"', response['Server-Timing'])
+
+
+class TransferCommandTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.voter = User.objects.create_user(username='voter', password='pybo1234')
+        for i in range(5):
+            question = Question.objects.create(author=cls.author, subject='질문 {}'.format(i), content='*내용*',
+                                               create_date=timezone.now(), vote_count=1, answer_count=1)
+            question.voter.add(cls.voter)
+            answer = Answer.objects.create(author=cls.author, question=question, content='답변',
+                                           create_date=timezone.now())
+            answer.voter.add(cls.voter)
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'pybo.jsonl.gz')
+
+    def export_and_clear(self):
+        call_command('export_pybo', self.path, chunk_size=2, stdout=StringIO(), stderr=StringIO())
+        snapshot = list(Question.objects.order_by('id').values_list('id', 'subject', 'create_date', 'vote_count'))
+        Question.objects.all().delete()
+        return snapshot
+
+    def test_round_trip(self):
+        snapshot = self.export_and_clear()
+        call_command('import_pybo', self.path, batch_size=3, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(
+            list(Question.objects.order_by('id').values_list('id', 'subject', 'create_date', 'vote_count')), snapshot)
+        self.assertEqual(Answer.objects.count(), 5)
+        self.assertEqual(Question.voter.through.objects.count(), 5)
+        self.assertEqual(Answer.voter.through.objects.count(), 5)
+        self.assertTrue(SearchToken.objects.exists())
+        self.assertFalse(os.path.exists(self.path + '.checkpoint'))
+        # 다시 가져와도 중복되지 않음
+        call_command('import_pybo', self.path, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Question.objects.count(), 5)
+
+    def test_resume_from_checkpoint(self):
+        call_command('export_pybo', self.path, stdout=StringIO(), stderr=StringIO())
+        # 질문 3개까지 저장한 후 중단된 상황
+        ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+        Question.objects.filter(id__gt=ids[2]).delete()
+        with open(self.path + '.checkpoint', 'w') as f:
+            f.write('3')
+        err = StringIO()
+        call_command('import_pybo', self.path, stdout=StringIO(), stderr=err, no_index=True)
+        self.assertIn('question 2건 가져옴', err.getvalue())
+        self.assertEqual(Question.objects.count(), 5)
+        self.assertEqual(Answer.objects.count(), 5)
+
+
+# 추천 버퍼 동시성 테스트
+# 여러 스레드가 같은 추천을 중복하여 동시에 기록하고, 버퍼가 가득 찰 때마다 각 스레드에서 저장해도
+# 추천인 행과 추천 수가 누락, 중복 없이 정확한지 확인한다.
+@override_settings(PYBO_VOTE_FLUSH_INTERVAL=None, PYBO_VOTE_BUFFER_SIZE=25)
+class VoteBufferStressTest(TransactionTestCase):
+    databases = '__all__'  # 운영용 데이터베이스 프로필(읽기 전용 연결)로 실행하는 경우
+
+    def setUp(self):
+        votes.buffer.discard()
+        self.users = [User.objects.create_user(username='user{}'.format(i)) for i in range(30)]
+        self.questions = [Question.objects.create(author=self.users[0], subject='질문', content='내용',
+                                                  create_date=timezone.now()) for _ in range(5)]
+        self.answers = [Answer.objects.create(author=self.users[0], question=self.questions[0], content='답변',
+                                              create_date=timezone.now()) for _ in range(5)]
+
+    def test_threaded_votes(self):
+        expected = {(kind, obj.id, user.id) for kind, objs in (('question', self.questions), ('answer', self.answers))
+                    for obj in objs for user in self.users[1:]}
+        # 모든 추천을 세 번씩, 스레드 8개에 나누어 기록
+        records = sorted(expected) * 3
+        errors = []
+
+        def worker(part):
+            try:
+                for record in part:
+                    votes.buffer.add(*record)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(records[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        votes.buffer.flush()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(votes.buffer), 0)
+        saved = {('question', q, u) for q, u in Question.voter.through.objects.values_list('question_id', 'user_id')}
+        saved |= {('answer', a, u) for a, u in Answer.voter.through.objects.values_list('answer_id', 'user_id')}
+        self.assertEqual(saved, expected)
+        for model in (Question, Answer):
+            self.assertEqual(set(model.objects.values_list('vote_count', flat=True)), {29})
+
+
+# 운영용 데이터베이스 프로필 테스트
+class DatabaseProfileTest(PyboTestCase):
+    # synchronous 등 일부 PRAGMA는 트랜잭션 안에서 바꿀 수 없으므로 트랜잭션 안에서도 바꿀 수 있는 값으로 확인
+    @override_settings(PYBO_SQLITE_PRAGMAS={'cache_size': -1234, 'busy_timeout': 1234})
+    def test_pragmas(self):
+        database.configure_sqlite(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 1234)
+
+    @override_settings(PYBO_READ_DATABASE='replica')
+    def test_router(self):
+        router = database.ReadWriteRouter()
+        self.assertEqual(router.db_for_write(Question), 'default')
+        self.assertIsNone(router.db_for_read(User))
+        # 테스트는 트랜잭션 안에서 실행되므로 쓰기 트랜잭션 안에서의 읽기는 주 연결 사용
+        self.assertEqual(router.db_for_read(Question), 'default')
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(router.db_for_read(Question), 'replica')
+        self.assertTrue(router.allow_migrate('default', 'pybo'))
+        self.assertFalse(router.allow_migrate('replica', 'pybo'))
+
+
+# 쿼리 실행 계획 검사 테스트
+class QueryPlanTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_pybo', users=5, questions=30, answers=60, votes=40, stdout=StringIO())
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('check_query_plans', stdout=out)
+        self.assertNotIn('[전체 조회]', out.getvalue())
+
+    def test_full_scan_is_detected(self):
+        tables = set(connection.introspection.table_names())
+        scans, _ = plan_problems(query_plan("SELECT * FROM pybo_question WHERE subject = 'x'"), tables)
+        self.assertEqual(len(scans), 1)
+        scans, _ = plan_problems(query_plan('SELECT * FROM pybo_question WHERE id = 1'), tables)
+        self.assertEqual(scans, [])
+
+
+# 조건부 요청(ETag, 304) 테스트
+class ConditionalGetTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.voter = User.objects.create_user(username='django', password='django1234')
+        cls.question = Question.objects.create(author=cls.author, subject='질문', content='*내용*',
+                                               create_date=timezone.now())
+        cls.answer = Answer.objects.create(author=cls.author, question=cls.question, content='답변',
+                                           create_date=timezone.now(), modify_date=timezone.now(), vote_count=2)
+        Question.objects.filter(pk=cls.question.pk).update(answer_count=1)
+
+    def test_detail_not_modified(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        etag = self.client.get(url)['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertIn('Cookie', response['Vary'])
+
+    def test_detail_etag_matches_query(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        request = self.client.get(url).wsgi_request
+        self.assertEqual(self.client.get(url)['ETag'], conditional.question_etag(request, self.question.id))
+
+    def test_vote_changes_detail_etag(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        etag = self.client.get(url)['ETag']
+        voter = self.client_class()
+        voter.force_login(self.voter)
+        voter.get(reverse('pybo:answer_vote', args=[self.answer.id]))
+        votes.buffer.flush()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_index_not_modified(self):
+        url = reverse('pybo:index')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        page_cache.bump('board')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_authenticated_etag_is_private(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        anonymous = self.client.get(url)['ETag']
+        self.client.force_login(self.voter)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], anonymous)
+        self.assertIn('private', response['Cache-Control'])
+
+
+# 읽기 전용 JSON API 테스트
+class ApiTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        now = timezone.now()
+        cls.questions = [
+            Question.objects.create(author=cls.author, subject='질문 {}'.format(i), content='*내용 {}*'.format(i),
+                                    create_date=now - timedelta(minutes=i))
+            for i in range(5)
+        ]
+        question = cls.questions[0]
+        for i in range(3):
+            answer = Answer(author=cls.author, question=question, content='**답변 {}**'.format(i),
+                            create_date=now + timedelta(minutes=i))
+            rendering.render_content(answer)
+            answer.save()
+        rendering.render_content(question)
+        question.save()
+
+    def test_list_cursor(self):
+        url = reverse('pybo:api_question_list')
+        with self.assertNumQueries(1):
+            data = self.client.get(url, {'limit': 2}).json()
+        self.assertEqual([q['id'] for q in data['results']], [q.id for q in self.questions[:2]])
+        self.assertEqual(data['results'][0]['author'], 'pybo')
+        self.assertIsNone(data['previous'])
+        data = self.client.get(url, {'limit': 2, 'after': data['next']}).json()
+        self.assertEqual([q['id'] for q in data['results']], [q.id for q in self.questions[2:4]])
+        self.assertIsNotNone(data['previous'])
+
+    def test_sparse_fields(self):
+        url = reverse('pybo:api_question_list')
+        with self.assertNumQueries(1) as ctx:
+            data = self.client.get(url, {'fields': 'id,subject'}).json()
+        self.assertEqual(set(data['results'][0]), {'id', 'subject'})
+        sql = ctx.captured_queries[0]['sql']
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('"content"', sql)
+
+    def test_detail(self):
+        url = reverse('pybo:api_question_detail', args=[self.questions[0].id])
+        with self.assertNumQueries(2):
+            data = self.client.get(url, {'fields': 'id,content,content_html,answers',
+                                         'answer_fields': 'id,content_html'}).json()
+        self.assertEqual(data['content'], '*내용 0*')
+        self.assertEqual(data['content_html'], '<p><em>내용 0</em></p>')
+        self.assertEqual([a['content_html'] for a in data['answers']],
+                         ['<p><strong>답변 {}</strong></p>'.format(i) for i in range(3)])
+        with self.assertNumQueries(1):
+            data = self.client.get(url, {'fields': 'id,subject'}).json()
+        self.assertEqual(data, {'id': self.questions[0].id, 'subject': '질문 0'})
+
+    def test_detail_answer_pages(self):
+        url = reverse('pybo:api_question_detail', args=[self.questions[0].id])
+        params = {'fields': 'id,answers', 'answer_fields': 'content', 'answers_limit': 2}
+        with self.assertNumQueries(2):
+            data = self.client.get(url, params).json()
+        self.assertEqual([a['content'] for a in data['answers']], ['**답변 0**', '**답변 1**'])
+        data = self.client.get(url, dict(params, answers_after=data['answers_next'])).json()
+        self.assertEqual([a['content'] for a in data['answers']], ['**답변 2**'])
+        self.assertIsNone(data['answers_next'])
+        self.assertEqual(self.client.get(url, dict(params, answers_limit='x')).status_code, 400)
+
+    def test_detail_archived(self):
+        question = self.questions[0]
+        Question.objects.filter(pk=question.pk).update(last_activity=timezone.now() - timedelta(days=400))
+        archive.archive_questions(Question.objects.filter(pk=question.pk))
+        url = reverse('pybo:api_question_detail', args=[question.id])
+        data = self.client.get(url, {'fields': 'id,content_html,answers', 'answer_fields': 'content',
+                                     'answers_limit': 2}).json()
+        self.assertEqual(data['content_html'], '<p><em>내용 0</em></p>')
+        self.assertEqual([a['content'] for a in data['answers']], ['**답변 0**', '**답변 1**'])
+        data = self.client.get(url, {'fields': 'answers', 'answers_after': data['answers_next']}).json()
+        self.assertEqual([a['content'] for a in data['answers']], ['**답변 2**'])
+
+    def test_bad_request(self):
+        response = self.client.get(reverse('pybo:api_question_list'), {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+        # 질문 테이블과 보관된 질문 모두에 없으면 JSON 404 응답
+        response = self.client.get(reverse('pybo:api_question_detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('error', response.json())
+
+
+# 질문 목록 정렬 방식(추천순, 인기순, 최근 활동순) 테스트
+class RankingTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.voter = User.objects.create_user(username='django', password='django1234')
+        now = timezone.now()
+        cls.old, cls.new = [
+            Question.objects.create(author=cls.author, subject='장고 질문 {}'.format(i), content='내용',
+                                    create_date=now - timedelta(days=1 - i))
+            for i in range(2)
+        ]
+        for question in (cls.old, cls.new):
+            search.index_question(question)
+
+    def index(self, **params):
+        return list(self.client.get(reverse('pybo:index'), params).context['question_list'])
+
+    def test_answer_updates_activity_and_score(self):
+        self.assertEqual(self.index(sort='recent_activity'), [self.new, self.old])
+        self.client.force_login(self.voter)
+        self.client.post(reverse('pybo:answer_create', args=[self.old.id]), {'content': '답변'})
+        self.old.refresh_from_db()
+        self.assertEqual(self.old.hot_score, ranking.ANSWER_WEIGHT)
+        self.assertEqual(self.index(sort='recent_activity'), [self.old, self.new])
+        self.assertEqual(self.index(sort='popular'), [self.old, self.new])
+        self.assertEqual(self.index(), [self.new, self.old])
+
+    def test_vote_updates_score_once(self):
+        self.client.force_login(self.voter)
+        for _ in range(2):
+            self.client.get(reverse('pybo:question_vote', args=[self.old.id]))
+            votes.buffer.flush()
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.vote_count, self.old.hot_score), (1, ranking.VOTE_WEIGHT))
+        self.assertEqual(self.index(sort='recommend', kw='장고'), [self.old, self.new])
+        # 다음 페이지 커서도 정렬 컬럼 기준
+        page = pagination.cursor_paginate(Question.objects.all(), 1, key='vote_count')
+        self.assertEqual(self.index(sort='recommend', after=page.next_cursor), [self.new])
+
+    def test_decay_and_rebuild(self):
+        Question.objects.filter(pk=self.old.pk).update(hot_score=8)
+        Question.objects.filter(pk=self.new.pk).update(hot_score=0.005)
+        with self.settings(PYBO_HOT_HALF_LIFE=1):
+            call_command('update_ranking', hours=2, stdout=StringIO())
+        self.assertEqual(list(Question.objects.order_by('id').values_list('hot_score', flat=True)), [2, 0])
+        Answer.objects.create(author=self.author, question=self.new, content='답변', create_date=timezone.now())
+        call_command('recount', stdout=StringIO())
+        call_command('update_ranking', rebuild=True, stdout=StringIO())
+        self.new.refresh_from_db()
+        self.assertGreater(self.new.last_activity, self.new.create_date)
+        self.assertAlmostEqual(self.new.hot_score, ranking.ANSWER_WEIGHT, places=3)
+
+    def test_sort_uses_index(self):
+        for key in ranking.SORTS.values():
+            with CaptureQueriesContext(connection) as ctx:
+                pagination.cursor_paginate(Question.objects.all(), 10, key=key)
+                pagination.cursor_paginate(Question.objects.all(), 10, after=pagination.encode_cursor(self.new, key),
+                                           key=key)
+            for query in ctx.captured_queries:
+                self.assertEqual(plan_problems(query_plan(query['sql']), {'pybo_question'}), ([], []), key)
+
+
+# 검색어 자동 완성 테스트
+class AutocompleteTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='Django', password='django1234')
+        cls.question = Question.objects.create(author=cls.author, subject='장고 모델 질문', content='내용',
+                                               create_date=timezone.now())
+        Question.objects.create(author=cls.author, subject='파이썬 질문', content='내용', create_date=timezone.now())
+
+    def suggest(self, q):
+        return self.client.get(reverse('pybo:api_autocomplete'), {'q': q}).json()['results']
+
+    def test_prefix_without_queries(self):
+        self.assertEqual(self.suggest('장고'), [{'type': 'question', 'id': self.question.id, 'text': '장고 모델 질문'}])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.suggest('dj'), [{'type': 'user', 'text': 'Django'}])
+            self.assertEqual(self.suggest('없는'), [])
+            self.assertEqual(self.suggest(''), [])
+
+    def test_incremental_updates(self):
+        self.suggest('장')
+        self.client.force_login(self.author)
+        self.client.post(reverse('pybo:question_modify', args=[self.question.id]),
+                         {'subject': '장고 뷰 질문', 'content': '내용'})
+        User.objects.create_user(username='장고러')
+        self.assertEqual([r['text'] for r in self.suggest('장고')], ['장고 뷰 질문', '장고러'])
+        self.client.post(reverse('pybo:question_delete', args=[self.question.id]))
+        self.assertEqual([r['text'] for r in self.suggest('장고')], ['장고러'])
+
+    @override_settings(PYBO_AUTOCOMPLETE_MAX_QUESTIONS=2)
+    def test_bounded(self):
+        self.suggest('파')
+        autocomplete.index.add_question(1000, '파이보 새 질문')
+        self.assertEqual([r['text'] for r in self.suggest('파')], ['파이보 새 질문', '파이썬 질문'])
+        self.assertEqual(self.suggest('장고'), [])
+
+    @override_settings(PYBO_AUTOCOMPLETE_MAX_USERS=2)
+    def test_bounded_users(self):
+        # 최근 로그인한 사용자부터
+        User.objects.create_user(username='django_new')
+        User.objects.create_user(username='django_active', last_login=timezone.now())
+        self.assertEqual([r['text'] for r in self.suggest('dj')], ['django_active', 'django_new'])
+        # 새로 가입한 사용자를 넣고, 가장 오래전에 활동한 사용자를 뺌
+        User.objects.create_user(username='django_joined')
+        self.assertEqual([r['text'] for r in self.suggest('dj')], ['django_active', 'django_joined'])
+
+
+# 캐시 세션, 사용자 조회 캐시 테스트
+class SessionCacheTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='pybo', password='pybo1234')
+
+    def setUp(self):
+        super().setUp()
+        self.client.login(username='pybo', password='pybo1234')
+        self.url = reverse('pybo:index')
+        self.client.get(self.url)
+
+    def test_no_auth_queries(self):
+        # 세션 조회, 사용자 조회 없이 질문 목록 조회 1
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_unchanged_session_not_saved(self):
+        session = self.client.session
+        session['_auth_user_id'] = session['_auth_user_id']  # 같은 값을 다시 넣어 modified만 표시
+        with self.assertNumQueries(0):
+            session.save()
+        session['theme'] = 'dark'
+        with CaptureQueriesContext(connection) as ctx:
+            session.save()
+        self.assertTrue(any(q['sql'].startswith('UPDATE "django_session"') for q in ctx.captured_queries))
+
+    def test_session_survives_cache_clear(self):
+        caches['sessions'].clear()
+        self.assertEqual(self.client.get(self.url).context['user'], self.user)
+
+    def test_password_change_logs_out(self):
+        self.user.set_password('changed1234')
+        self.user.save()
+        self.assertFalse(self.client.get(self.url).context['user'].is_authenticated)
+
+    def test_logout_forgets_user(self):
+        self.client.get(reverse('common:logout'))
+        self.assertNotIn('pybo:user:{}'.format(self.user.pk), caches['sessions'])
+
+
+# 답변 페이징 테스트
+@override_settings(PYBO_ANSWERS_PER_PAGE=3)
+class AnswerPaginationTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.question = Question.objects.create(author=cls.author, subject='질문', content='내용',
+                                               create_date=timezone.now(), answer_count=7)
+        now = timezone.now()
+        Answer.objects.bulk_create([
+            Answer(author=cls.author, question=cls.question, content='답변 {}'.format(i),
+                   create_date=now - timedelta(minutes=10 - i), vote_count=i % 3) for i in range(7)])
+        cls.answers = list(Answer.objects.order_by('id'))
+
+    def answer_ids(self, response):
+        return [answer.id for answer in response.context['answer_list']]
+
+    def test_pages(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        self.assertEqual(self.answer_ids(self.client.get(url)), [a.id for a in self.answers[:3]])
+        response = self.client.get(url, {'answer_page': 3})
+        self.assertEqual(self.answer_ids(response), [self.answers[6].id])
+        self.assertEqual(response.context['answer_list'].paginator.num_pages, 3)
+
+    def test_recommend_sort(self):
+        response = self.client.get(reverse('pybo:detail', args=[self.question.id]), {'answer_sort': 'recommend'})
+        # 추천 수 내림차순, 같으면 최신 답변 먼저
+        self.assertEqual(self.answer_ids(response), [self.answers[5].id, self.answers[2].id, self.answers[4].id])
+
+    def test_fragment(self):
+        url = reverse('pybo:answer_list', args=[self.question.id])
+        response = self.client.get(url, {'answer_page': 2})
+        self.assertTemplateUsed(response, 'pybo/answer_list.html')
+        self.assertTemplateNotUsed(response, 'pybo/question_detail.html')
+        self.assertEqual(self.answer_ids(response), [a.id for a in self.answers[3:6]])
+        self.assertContains(response, 'answer_page=3')
+        self.assertNotContains(self.client.get(url, {'answer_page': 3}), 'answer_more')
+
+    def test_page_number(self):
+        for i, answer in enumerate(self.answers):
+            self.assertEqual(base_views.answer_page_number(answer), i // 3 + 1)
+        self.assertEqual(base_views.answer_page_number(self.answers[5], 'recommend'), 1)
+        self.assertEqual(base_views.answer_page_number(self.answers[0], 'recommend'), 3)
+
+    def test_create_redirects_to_answer_page(self):
+        self.client.force_login(self.author)
+        response = self.client.post(reverse('pybo:answer_create', args=[self.question.id]), {'content': '새 답변'})
+        answer = Answer.objects.latest('id')
+        self.assertRedirects(response, '{}?answer_page=3#answer_{}'.format(
+            reverse('pybo:detail', args=[self.question.id]), answer.id), fetch_redirect_response=False)
+
+    def test_etag_differs_by_page(self):
+        url = reverse('pybo:detail', args=[self.question.id])
+        first = self.client.get(url)['ETag']
+        self.assertNotEqual(first, self.client.get(url, {'answer_page': 2})['ETag'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first).status_code, 304)
+
+
+# 백그라운드 작업 큐 테스트
+failures = []
+
+
+@tasks.register
+def flaky_task(times):
+    if len(failures) < times:
+        failures.append(times)
+        raise RuntimeError('실패')
+
+
+@override_settings(PYBO_TASKS_EAGER=False, PYBO_TASK_WORKERS=0, PYBO_TASK_MAX_ATTEMPTS=3)
+class TaskQueueTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+
+    def setUp(self):
+        super().setUp()
+        failures.clear()
+
+    def search(self, kw):
+        return list(search.search_questions(Question.objects.all(), kw))
+
+    def test_deferred_until_run(self):
+        self.client.force_login(self.author)
+        self.client.post(reverse('pybo:question_create'), {'subject': '작업 질문', 'content': '**굵게**'})
+        question = Question.objects.get()
+        self.assertEqual(Task.objects.get().name, 'pybo.tasks.update_question')
+        # 작업 실행 전에도 화면에는 렌더링된 내용을 보여줌
+        self.assertEqual(question.content_html_version, '')
+        self.assertContains(self.client.get(reverse('pybo:detail', args=[question.id])), '<strong>굵게</strong>')
+        self.assertEqual(self.search('작업'), [])
+        self.assertEqual(tasks.run_due(), 1)
+        question.refresh_from_db()
+        self.assertEqual(question.content_html_version, rendering.RENDER_VERSION)
+        self.assertEqual(self.search('작업'), [question])
+        self.assertFalse(Task.objects.exists())
+
+    def test_retry_then_fail(self):
+        with self.assertLogs('pybo.tasks', 'ERROR'):
+            task = tasks.enqueue(flaky_task, 1)
+            self.assertEqual(tasks.run_due(), 1)
+            task.refresh_from_db()
+            self.assertEqual((task.attempts, task.failed), (1, False))
+            self.assertIn('RuntimeError', task.last_error)
+            # 재시도 대기 시간이 지나기 전에는 실행하지 않음
+            self.assertEqual(tasks.run_due(), 0)
+            Task.objects.update(run_after=timezone.now())
+            self.assertEqual(tasks.run_due(), 1)
+            self.assertFalse(Task.objects.exists())
+
+            task = tasks.enqueue(flaky_task, 10)
+            for _ in range(3):
+                Task.objects.update(run_after=timezone.now())
+                tasks.run_due()
+            task.refresh_from_db()
+            self.assertEqual((task.attempts, task.failed), (3, True))
+            call_command('run_pybo_tasks', retry_failed=True, stdout=StringIO())
+            self.assertEqual(tasks.run_due(), 1)
+
+    def test_claim_once(self):
+        task = tasks.enqueue(flaky_task, 0)
+        self.assertIsNotNone(tasks.claim(task.id))
+        # 다른 워커는 가져갈 수 없고, 제한 시간이 지나면 (워커 종료로 간주) 다시 실행
+        self.assertIsNone(tasks.run_task(task.id))
+        Task.objects.update(run_after=timezone.now() - timedelta(seconds=1))
+        self.assertTrue(tasks.run_task(task.id))
+
+    def test_unregistered(self):
+        with self.assertRaises(ValueError):
+            tasks.enqueue(len, 'x')
+
+
+# 프로세스 내 스레드 풀 실행 테스트 (커밋 후 실행되므로 TransactionTestCase 사용)
+@override_settings(PYBO_TASKS_EAGER=False, PYBO_TASK_WORKERS=1)
+class TaskExecutorTest(TransactionTestCase):
+    def test_run_on_commit(self):
+        with transaction.atomic():
+            task = tasks.enqueue(flaky_task, 0)
+            self.assertEqual(Task.objects.count(), 1)
+        tasks.executor.shutdown()  # 실행 중인 작업이 끝날 때까지 기다림
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+    @override_settings(PYBO_TASK_POLL_INTERVAL=0.05)
+    def test_leftover_task_after_restart(self):
+        # 재시작 전에 남은 작업은 새 작업 등록 없이 요청을 받기 시작하면 폴링 스레드가 실행
+        now = timezone.now()
+        task = Task.objects.create(name='pybo.tests.flaky_task', args=[0], run_after=now, create_date=now)
+        self.client.get(reverse('pybo:index'))
+        deadline = time.monotonic() + 10
+        while Task.objects.filter(pk=task.pk).exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        tasks.executor.shutdown()
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+
+
+# 관리자 화면 테스트
+class AdminTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(username='admin', password='admin1234')
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.other = User.objects.create_user(username='django', password='django1234')
+        now = timezone.now()
+        cls.questions = [Question.objects.create(author=author, subject='관리 질문 {}'.format(i), content='내용',
+                                                 create_date=now, answer_count=2)
+                         for i, author in enumerate([cls.author, cls.author, cls.other])]
+        for question in cls.questions:
+            question.voter.add(cls.admin)
+            search.index_question(question)
+            for author in (cls.author, cls.other):
+                answer = Answer.objects.create(author=author, question=question, content='답변', create_date=now)
+                answer.voter.add(cls.admin)
+                search.index_answer(answer)
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.admin)
+
+    def test_changelist_counts_once(self):
+        url = reverse('admin:pybo_question_changelist')
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, {'q': '관리'})
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+        self.assertEqual(sum(q['sql'].startswith('SELECT COUNT(') for q in ctx.captured_queries), 1)
+        # 같은 조건의 개수는 캐시 사용, 글쓴이는 조인으로 함께 조회
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url, {'q': '관리'})
+        self.assertFalse(any(q['sql'].startswith('SELECT COUNT(') for q in ctx.captured_queries))
+        self.assertTrue(any(q['sql'].startswith('SELECT "pybo_question"') and 'JOIN "auth_user"' in q['sql']
+                            for q in ctx.captured_queries))
+
+    def test_changelist_search_without_words(self):
+        # 단어가 없는 검색어는 빈 결과 (개수를 세지 않고 0)
+        for url in (reverse('admin:pybo_question_changelist'), reverse('admin:pybo_answer_changelist')):
+            response = self.client.get(url, {'q': '!!!'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.context['cl'].result_count, 0)
+
+    def test_answer_changelist(self):
+        response = self.client.get(reverse('admin:pybo_answer_changelist'), {'q': 'django'})
+        self.assertEqual(len(response.context['cl'].result_list), 3)
+
+    def test_delete_selected(self):
+        question = self.questions[0]
+        self.client.post(reverse('admin:pybo_question_changelist'),
+                         {'action': 'delete_selected_posts', '_selected_action': [question.id]})
+        self.assertFalse(Question.objects.filter(pk=question.pk).exists())
+        self.assertEqual(Answer.objects.count(), 4)
+        self.assertFalse(SearchToken.objects.filter(question_id=question.id).exists())
+        self.assertEqual(Answer.voter.through.objects.count(), 4)
+        self.assertEqual(Question.voter.through.objects.count(), 2)
+
+    def test_delete_author_answers(self):
+        answer = Answer.objects.filter(author=self.other).first()
+        self.client.post(reverse('admin:pybo_answer_changelist'),
+                         {'action': 'delete_author_posts', '_selected_action': [answer.id]})
+        self.assertEqual(set(Answer.objects.values_list('author_id', flat=True)), {self.author.id})
+        self.assertEqual(set(Question.objects.values_list('answer_count', flat=True)), {1})
+        self.assertFalse(SearchToken.objects.filter(answer__author=self.other).exists())
+
+    def test_move_answer(self):
+        source, target = self.questions[0], self.questions[1]
+        Question.objects.filter(pk=source.pk).update(hot_score=ranking.ANSWER_WEIGHT)
+        answer = Answer.objects.filter(question=source).first()
+        response = self.client.post(reverse('admin:pybo_answer_change', args=[answer.id]), {
+            'author': answer.author_id, 'question': target.id, 'content': '옮긴 답변',
+            'create_date_0': answer.create_date.strftime('%Y-%m-%d'), 'create_date_1': '00:00:00',
+        })
+        self.assertEqual(response.status_code, 302)
+        source.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual((source.answer_count, source.hot_score), (1, 0))
+        self.assertEqual((target.answer_count, target.hot_score), (3, ranking.ANSWER_WEIGHT))
+        self.assertGreater(target.last_activity, target.create_date)
+        self.assertEqual(search.search_questions(Question.objects.all(), '옮긴').get(), target)
+
+    def test_deletion_batches(self):
+        with CaptureQueriesContext(connection) as ctx:
+            deleted = deletion.delete_questions(Question.objects.filter(author=self.author), batch_size=1)
+        self.assertEqual(deleted, 2)
+        # 연결된 행을 읽어 오지 않음 (삭제할 질문 id 조회만)
+        self.assertFalse(any(q['sql'].startswith('SELECT') and 'pybo_answer"."content' in q['sql']
+                             for q in ctx.captured_queries))
+        self.assertEqual(list(Question.objects.all()), [self.questions[2]])
+        self.assertEqual(Answer.objects.count(), 2)
+
+
+# 대량 삭제 테스트
+class DeletionTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.spammer = User.objects.create_user(username='spammer', password='spam1234')
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.admin = User.objects.create_superuser(username='admin', password='admin1234')
+        now = timezone.now()
+        cls.question = Question.objects.create(author=cls.author, subject='질문', content='내용', create_date=now)
+        cls.answer = Answer.objects.create(author=cls.author, question=cls.question, content='답변', create_date=now)
+        spam = Question.objects.create(author=cls.spammer, subject='광고', content='광고', create_date=now)
+        Answer.objects.create(author=cls.author, question=spam, content='답변', create_date=now)
+        Answer.objects.create(author=cls.spammer, question=cls.question, content='광고 답변', create_date=now)
+        cls.question.voter.add(cls.spammer)
+        cls.answer.voter.add(cls.spammer, cls.admin)
+        call_command('recount', stdout=StringIO())
+        for question in Question.objects.all():
+            search.index_question(question)
+
+    def assertCounts(self, question_answers, question_votes, answer_votes):
+        self.question.refresh_from_db()
+        self.answer.refresh_from_db()
+        self.assertEqual((self.question.answer_count, self.question.vote_count, self.answer.vote_count),
+                         (question_answers, question_votes, answer_votes))
+
+    def test_delete_user(self):
+        self.assertCounts(2, 1, 2)
+        self.assertEqual(deletion.delete_users(User.objects.filter(pk=self.spammer.pk), batch_size=1), 1)
+        self.assertFalse(User.objects.filter(pk=self.spammer.pk).exists())
+        self.assertEqual(list(Question.objects.all()), [self.question])
+        self.assertEqual(list(Answer.objects.all()), [self.answer])
+        self.assertFalse(SearchToken.objects.exclude(question=self.question).exists())
+        self.assertCounts(1, 0, 1)
+
+    def test_delete_batch_queries(self):
+        # 삭제할 행을 읽어 오지 않음 (id 묶음 조회 2번, 질문 id 조회 1번 외에는 DELETE, UPDATE 문)
+        with CaptureQueriesContext(connection) as queries:
+            deletion.delete_answers(Answer.objects.filter(pk=self.answer.pk))
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual(statements.count('DELETE'), 3)
+        self.assertEqual(statements.count('SELECT'), 3)
+
+    def test_delete_votes_updates_hot_score(self):
+        Question.objects.filter(pk=self.question.pk).update(hot_score=3.0)
+        deletion.delete_votes(self.spammer)
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.vote_count, self.question.hot_score), (0, 3.0 - ranking.VOTE_WEIGHT))
+        # 감소(decay)한 점수보다 많이 빼지 않음
+        self.question.voter.add(self.spammer)
+        Question.objects.filter(pk=self.question.pk).update(hot_score=0.1, vote_count=1)
+        deletion.delete_votes(self.spammer)
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.hot_score, 0)
+
+    def test_views_use_bulk_deletion(self):
+        self.client.force_login(self.author)
+        detail = self.client.get(reverse('pybo:detail', args=[self.question.id]))
+        self.client.get(reverse('pybo:answer_delete', args=[self.answer.id]))
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.answer_count, 1)
+        self.assertFalse(Answer.voter.through.objects.exists())
+        self.assertNotEqual(self.client.get(reverse('pybo:detail', args=[self.question.id]))['ETag'], detail['ETag'])
+        self.client.post(reverse('pybo:question_delete', args=[self.question.id]))
+        self.assertEqual(list(Question.objects.values_list('author__username', flat=True)), ['spammer'])
+        self.assertFalse(Answer.objects.filter(question_id=self.question.id).exists())
+
+    def test_admin_user_delete(self):
+        self.client.force_login(self.admin)
+        url = reverse('admin:auth_user_delete', args=[self.spammer.id])
+        response = self.client.get(url)
+        self.assertEqual(dict(response.context['model_count'])['질문'], 1)
+        self.client.post(url, {'post': 'yes'})
+        self.assertFalse(User.objects.filter(pk=self.spammer.pk).exists())
+        self.assertCounts(1, 0, 1)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('bulk_delete', user=['spammer'], dry_run=True, stdout=out)
+        self.assertIn('추천 : 2건', out.getvalue())
+        self.assertTrue(User.objects.filter(pk=self.spammer.pk).exists())
+        call_command('bulk_delete', user=['spammer'], answer=[self.answer.id], stdout=StringIO())
+        self.assertFalse(User.objects.filter(pk=self.spammer.pk).exists())
+        self.assertFalse(Answer.objects.exists())
+        self.assertEqual(Question.objects.get().answer_count, 0)
+        with self.assertRaises(CommandError):
+            call_command('bulk_delete', user=['nobody'], stdout=StringIO())
+
+
+# 질문 보관 테스트
+class ArchiveTest(PyboTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='pybo', password='pybo1234')
+        cls.voter = User.objects.create_user(username='voter', password='voter1234')
+        old = timezone.now() - timedelta(days=400)
+        cls.old = Question.objects.create(author=cls.author, subject='오래된 파이썬 질문', content='**옛날** 내용',
+                                          create_date=old)
+        cls.new = Question.objects.create(author=cls.author, subject='새 파이썬 질문', content='내용',
+                                          create_date=timezone.now())
+        cls.answer = Answer.objects.create(author=cls.voter, question=cls.old, content='옛 답변', create_date=old)
+        cls.old.voter.add(cls.voter)
+        cls.answer.voter.add(cls.author)
+        call_command('recount', stdout=StringIO())
+        call_command('rebuild_search_index', stdout=StringIO())
+
+    def archive(self):
+        out = StringIO()
+        call_command('archive_pybo', days=365, stdout=out)
+        return out.getvalue()
+
+    def test_archive_and_detail(self):
+        out = self.archive()
+        self.assertIn('질문 1건 보관', out)
+        self.assertIn('pybo_answer', out)
+        self.assertEqual(list(Question.objects.all()), [self.new])
+        self.assertFalse(Answer.objects.exists())
+        self.assertFalse(SearchToken.objects.filter(question_id=self.old.id).exists())
+        archived = ArchivedQuestion.objects.get()
+        self.assertEqual((archived.id, archived.answer_count, archived.vote_count), (self.old.id, 1, 1))
+        self.assertEqual(archive.unpack_ids(archived.voters), [self.voter.id])
+        self.assertEqual(archive.unpack_ids(archived.answer_voters), [self.answer.id, self.author.id])
+        response = self.client.get(reverse('pybo:detail', args=[self.old.id]))
+        self.assertTemplateUsed(response, 'pybo/question_archived.html')
+        self.assertContains(response, '<strong>옛날</strong>')
+        self.assertContains(response, '옛 답변')
+        self.assertEqual(self.client.get(reverse('pybo:detail', args=[9999])).status_code, 404)
+
+    def test_search_both_tiers(self):
+        self.archive()
+        response = self.client.get(reverse('pybo:index'), {'kw': '파이썬'})
+        self.assertEqual([q.id for q in response.context['question_list']], [self.new.id])
+        self.assertEqual([q.id for q in response.context['archived_list']], [self.old.id])
+        self.assertEqual(archive.search_archived('옛 답변')[0].id, self.old.id)
+
+    def test_restore(self):
+        self.archive()
+        call_command('archive_pybo', restore=[self.old.id], stdout=StringIO())
+        self.assertFalse(ArchivedQuestion.objects.exists())
+        self.assertFalse(ArchivedSearchToken.objects.exists())
+        question = Question.objects.get(pk=self.old.id)
+        self.assertEqual((question.answer_count, question.vote_count), (1, 1))
+        self.assertEqual(question.content_html_version, rendering.RENDER_VERSION)
+        answer = Answer.objects.get()
+        self.assertEqual((answer.id, answer.vote_count, answer.create_date), (self.answer.id, 1, self.answer.create_date))
+        self.assertEqual(list(answer.voter.all()), [self.author])
+        self.assertEqual(list(search.search_questions(Question.objects.all(), '옛 답변')), [question])
+
+    def test_export_import(self):
+        self.archive()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pybo.jsonl.gz')
+            call_command('export_pybo', path, stdout=StringIO(), stderr=StringIO())
+            body = ArchivedQuestion.objects.get().body
+            ArchivedQuestion.objects.all().delete()
+            call_command('import_pybo', path, stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(bytes(ArchivedQuestion.objects.get().body), bytes(body))
+        self.assertEqual(archive.search_archived('오래된')[0].id, self.old.id)
+
+
+# 스태틱 파일 테스트 (해시 이름, 미리 압축한 파일, 캐시 헤더)
+class StaticFilesTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        override = override_settings(STATIC_ROOT=directory.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+        self.url = static('bootstrap.min.css')
+        self.path = os.path.join(directory.name, self.url.rsplit('/', 1)[1])
+
+    def test_collectstatic(self):
+        self.assertRegex(self.url, r'^/static/bootstrap\.min\.[0-9a-f]{12}\.css$')
+        with open(self.path, 'rb') as f, gzip.open(self.path + '.gz') as compressed:
+            self.assertEqual(compressed.read(), f.read())
+        response = self.client.get(reverse('pybo:index'))
+        self.assertContains(response, self.url)
+
+    def test_serve_compressed(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertIn('immutable', response['Cache-Control'])
+        with open(self.path, 'rb') as f:
+            self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), f.read())
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        # 원래 이름은 매번 확인
+        response = self.client.get('/static/bootstrap.min.css')
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+
+    def test_conditional_and_range(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, content[10:20])
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/{}'.format(len(content)))
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=-5').content, content[-5:])
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes={}-'.format(len(content))).status_code, 416)
+        # If-Range가 다르면 전체 응답
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"').status_code, 200)
@@ -4,9 +4,19 @@
 # urls.py 파일에 URL 경로에 관한 논리를 정의한다.
 
 
+from django.conf import settings
 from django.urls import path
 
-from .views import base_views, question_views, answer_views
+from .views import base_views, question_views, answer_views, stats_views, api_views
+
+
+# 질문 목록, 질문 상세 화면의 뷰 선택
+# ASGI 서버로 실행하는 경우(PYBO_ASYNC_VIEWS) 비동기 뷰를, 그렇지 않으면 동기 뷰를 사용
+if settings.PYBO_ASYNC_VIEWS:
+    from .views import async_views
+    index_view, detail_view = async_views.index, async_views.detail
+else:
+    index_view, detail_view = base_views.index, base_views.detail
 
 
 # URL 네임스페이스 설정
@@ -16,10 +26,10 @@ urlpatterns = [
     # base_views.py
     #
     # index 페이지 URL 매핑
-    # pybo/ 로 시작하는 페이지를 요청하면, (pybo/views의) base_views.index 함수 뷰를 호출하도록 함
+    # pybo/ 로 시작하는 페이지를 요청하면, (pybo/views의) base_views.index 함수 뷰(또는 async_views.index)를 호출하도록 함
     # path('') : '' 이 사용되었다. 이렇게 되는 이유는 config/urls.py 파일에서 이미 pybo/로 시작하는 URL이 pybo/urls.py 파일과 먼저 매핑되었기 때문
     # name='index' : 해당 URL에 대해 URL 별칭 설정
-    path('', base_views.index, name='index'),
+    path('', index_view, name='index'),
     # 질문 상세 페이지 URL 매핑
     # pybo/[정수형 숫자]로 시작하는 페이지를 요청하면, 해당 정수형 숫자를 question_id에 저장하고, base_views.detail 함수 뷰를 호출
     # <int: > : 정수형 숫자 매핑
@@ -27,7 +37,9 @@ urlpatterns = [
     # 여기에 등록한 매핑 룰에 의해 http://localhost:8000/pybo/<int:question_id>/ 가 적용되어,
     # question_id 에 2가 저장되고, base_views.detail 함수 뷰도 실행.
     # name='detail' : 해당 URL에 대해 URL 별칭 설정
-    path('<int:question_id>/', base_views.detail, name='detail'),
+    path('<int:question_id>/', detail_view, name='detail'),
+    # 질문 상세 페이지의 답변 목록 조각(다음 페이지의 답변들) URL 매핑
+    path('<int:question_id>/answers/', base_views.answer_list, name='answer_list'),
 
     # question_views.py
     #
@@ -52,4 +64,17 @@ urlpatterns = [
     path('answer/delete/<int:answer_id>/', answer_views.answer_delete, name='answer_delete'),
     # 답변 추천 기능 URL 매핑
     path('answer/vote/<int:answer_id>/', answer_views.answer_vote, name='answer_vote'),
+
+    # stats_views.py
+    #
+    # 성능 측정 결과 URL 매핑 (관리자 전용)
+    path('metrics/', stats_views.metrics_view, name='metrics'),
+
+    # api_views.py
+    #
+    # 읽기 전용 JSON API URL 매핑 (질문 목록/검색, 질문 상세)
+    path('api/questions/', api_views.question_list, name='api_question_list'),
+    path('api/questions/<int:question_id>/', api_views.question_detail, name='api_question_detail'),
+    # 검색어 자동 완성 URL 매핑
+    path('api/autocomplete/', api_views.autocomplete_view, name='api_autocomplete'),
 ]
\ No newline at end of file
@@ -1,10 +1,14 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import render, get_object_or_404, redirect, resolve_url
+from django.db import transaction
+from django.db.models import F
+from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
 
+from .. import deletion, page_cache, ranking, rendering, tasks, votes
 from ..forms import AnswerForm
 from ..models import Question, Answer
+from .base_views import answer_context, answer_url
 
 
 # 답변 등록 관련 함수 뷰
@@ -28,15 +32,23 @@ def answer_create(request, question_id):
             answer.author = request.user
             answer.create_date = timezone.now()
             answer.question = question
-            answer.save()
+            rendering.clear_content(answer)
+            with transaction.atomic():
+                answer.save()
+                # 질문의 답변 개수 컬럼(answer_count) 1 증가
+                # F() 표현식 : 값을 파이썬으로 읽어오지 않고 데이터베이스에서 직접 계산하므로, 동시에 여러 답변이 등록되어도 개수가 어긋나지 않는다.
+                # 질문 목록 정렬용 인기 점수, 최근 활동 일시도 함께 갱신 (pybo/ranking.py 참고)
+                Question.objects.filter(pk=question.pk).update(answer_count=F('answer_count') + 1,
+                                                               **ranking.answer_created(answer.create_date))
+                # 마크다운 렌더링 결과 저장, 검색 색인 생성은 응답 후 백그라운드 작업으로 처리 (pybo/tasks.py 참고)
+                tasks.enqueue(tasks.update_answer, answer.id)
+            # 질문 목록(답변 개수), 질문 상세 페이지 캐시 무효화
+            page_cache.invalidate(question.id)
             # redirect 함수 : 페이지 이동을 위한 함수
             # 답변을 생성(또는 수정, 추천)한 후 질문 상세 화면을 다시 보여주기 위해 redirect 함수를 사용  # pybo:detail 별칭에 해당하는 페이지로 이동
-            # pybo:detail 별칭에 해당하는 URL은 question_id가 필요하므로 question.id를 인수로 전달
-            # '{}#answer_{}'.format(resolve_url()) : 답변을 작성한 후 답변글 위치로 다시 이동시키기 위한 앵커 태그 관련 코드
-            # resolve_url : 실제 호출되는 URL 문자열을 리턴하는 장고의 함수
-            # pybo:detail URL에 #answer_2와 같은 앵커를 추가하기 위해 resolve_url 함수를 사용
-            return redirect('{}#answer_{}'.format(
-                resolve_url('pybo:detail', question_id=question.id), answer.id))
+            # answer_url : 답변을 작성한 후 답변글 위치로 다시 이동시키기 위해 #answer_2와 같은 앵커를 붙인 URL
+            # 답변이 여러 페이지로 나뉘어 있으므로 답변이 있는 페이지(?answer_page=N)로 이동 (base_views.answer_url 참고)
+            return redirect(answer_url(answer))
 
     # GET 요청 방식
     else:
@@ -47,8 +59,8 @@ def answer_create(request, question_id):
         # 수정 코드 : form = AnswerForm()
         # (pybo/forms의) AnswerForm으로부터 폼 데이터를 전달받음
         form = AnswerForm()
-    context = {'question': question, 'form': form}
-    # 질문 데이터({'question': question})와 폼 데이터({'form': form})를 템플릿 파일(pybo/question_detail.html)에 적용하여 HTML을 생성한 후 리턴
+    context = {'question': question, 'form': form, **answer_context(request, question)}
+    # 질문 데이터({'question': question}), 답변 한 페이지와 폼 데이터({'form': form})를 템플릿 파일(pybo/question_detail.html)에 적용하여 HTML을 생성한 후 리턴
     return render(request, 'pybo/question_detail.html', context)
 
 # 답변 수정 관련 함수 뷰
@@ -66,9 +78,17 @@ def answer_modify(request, answer_id):
         if form.is_valid():
             answer = form.save(commit=False)
             answer.modify_date = timezone.now()
-            answer.save()
-            return redirect('{}#answer_{}'.format(
-                resolve_url('pybo:detail', question_id=answer.question.id), answer.id))
+            rendering.clear_content(answer)  # 이전 내용으로 렌더링한 HTML은 사용하지 않음
+            with transaction.atomic():
+                # 수정한 컬럼만 저장 (추천 수는 다른 요청이 함께 바꾸므로, 읽어 둔 값으로 덮어쓰지 않도록)
+                answer.save(update_fields=['content', 'modify_date', 'content_html', 'content_html_version'])
+                # 질문의 최근 활동 일시 갱신
+                Question.objects.filter(pk=answer.question_id).update(last_activity=answer.modify_date)
+                # 수정된 내용으로 HTML 다시 렌더링, 검색 색인 갱신 (백그라운드 작업)
+                tasks.enqueue(tasks.update_answer, answer.id)
+            # 질문 목록(검색 결과), 질문 상세 페이지 캐시 무효화
+            page_cache.invalidate(answer.question_id)
+            return redirect(answer_url(answer))
     else:
         form = AnswerForm(instance=answer)
     context = {'answer': answer, 'form': form}
@@ -82,20 +102,22 @@ def answer_delete(request, answer_id):
     if request.user != answer.author:
         messages.error(request, '삭제 권한이 없습니다')
     else:
-        answer.delete()
+        # 추천, 검색 색인을 읽어 오지 않고 DELETE 문으로 지우고, 질문의 답변 개수 컬럼(answer_count)을 다시 계산한 후
+        # 질문 목록(답변 개수), 질문 상세 페이지 캐시를 무효화한다. (pybo/deletion.py 참고)
+        deletion.delete_answers(Answer.objects.filter(pk=answer.pk))
     return redirect('pybo:detail', question_id=answer.question.id)
 
 # 답변 추천 관련 함수 뷰
 @login_required(login_url='common:login')
 def answer_vote(request, answer_id):
-    answer = get_object_or_404(Answer, pk=answer_id)
+    # 본인 추천 확인과 이동할 질문 상세 페이지(답변 위치) 계산에 필요한 컬럼만 조회
+    answer = get_object_or_404(Answer.objects.only('id', 'author_id', 'question_id', 'create_date'), pk=answer_id)
     # 본인 추천을 방지하기 위해, 로그인한 사용자와 추천하려는 답변의 작성자가 동일할 경우에는 추천할 수 없게 함.
-    if request.user == answer.author:
+    if request.user.id == answer.author_id:
         messages.error(request, '본인이 작성한 글은 추천할 수 없습니다')
     else:
-        # Answer 모델의 voter는 여러 사람을 추가할 수 있는 ManyToManyField이므로, answer.voter.add(request.user) 처럼 add 함수를 사용하여 추천인을 추가한다.
-        # 동일한 사용자가 동일한 질문을 여러 번 추천하더라도 추천수가 증가하지는 않는다. ManyToManyField 내부에서 자체적으로 이와 같이 처리한다.
-        answer.voter.add(request.user)
+        # 추천은 버퍼에만 기록하고, 추천인 테이블과 추천 수 컬럼(vote_count)은 모아서 한꺼번에 저장한다. (pybo/votes.py 참고)
+        # 동일한 사용자가 동일한 답변을 여러 번 추천하더라도 추천수가 증가하지는 않는다.
+        votes.buffer.add('answer', answer.id, request.user.id)
     # 질문 상세 페이지로 이동
-    return redirect('{}#answer_{}'.format(
-        resolve_url('pybo:detail', question_id=answer.question.id), answer.id))
+    return redirect(answer_url(answer))
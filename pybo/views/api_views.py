@@ -0,0 +1,200 @@
+# 읽기 전용 JSON API
+# 모바일 앱 등에서 HTML 화면 대신 사용할 수 있도록 질문 목록/검색, 질문 상세(답변 포함)를 JSON으로 제공한다.
+#
+# GET /pybo/api/questions/ : 질문 목록 (최신순, 커서 방식 페이징)
+#   ?kw=검색어 : 검색 (pybo/search.py, 관련도순 정렬이 아닌 최신순)
+#   ?after=커서, ?before=커서 : 다음/이전 페이지 (응답의 next, previous 값)
+#   ?limit=20 : 페이지당 개수 (최대 MAX_LIMIT)
+# GET /pybo/api/questions/<question_id>/ : 질문 상세 (보관된 질문 포함, pybo/archive.py)
+#   ?answer_fields=... : 답변에 포함할 항목
+#   ?answers_after=커서 : 답변 다음 페이지 (응답의 answers_next 값), ?answers_limit=20 : 답변 페이지당 개수 (최대 MAX_LIMIT)
+#   답변은 작성 순서대로 한 페이지씩 응답한다. (답변이 많은 질문도 응답 크기가 일정)
+# GET /pybo/api/autocomplete/?q=접두어 : 검색어 자동 완성 (질문 제목, 사용자 이름. 데이터베이스 조회 없음, pybo/autocomplete.py)
+# 공통 : ?fields=id,subject,author : 포함할 항목 (sparse fieldset)
+#   요청한 항목에 필요한 컬럼만 조회(only)하고, 글쓴이(author)를 요청한 경우에만 사용자 테이블을 조인하며,
+#   답변(answers)을 요청한 경우에만 답변을 조회한다.
+#   content : 마크다운 원문, content_html : 렌더링된 HTML (저장된 HTML을 사용하므로 보통은 마크다운 변환이 필요 없음)
+#
+# 쿼리 개수는 항목, 데이터 양과 관계없이 일정하다. (목록 1개, 상세 1개 + 답변을 요청하면 1개)
+
+
+from functools import wraps
+
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .. import archive, autocomplete, pagination, rendering, search
+from ..models import Question, Answer
+
+
+# 페이지당 개수 기본값, 최댓값
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+# 자동 완성 결과 최대 개수
+AUTOCOMPLETE_LIMIT = 10
+
+# 항목 이름 : 조회할 컬럼
+# 커서 방식 페이징과 응답의 id에 필요한 id, create_date는 항상 조회한다.
+QUESTION_FIELDS = {
+    'id': (),
+    'subject': ('subject',),
+    'content': ('content',),
+    # 저장된 HTML이 현재 렌더링 버전과 다르면 원문을 렌더링해야 하므로 원문도 함께 조회
+    'content_html': ('content_html', 'content_html_version', 'content'),
+    'author': ('author', 'author__username'),
+    'create_date': (),
+    'modify_date': ('modify_date',),
+    'answer_count': ('answer_count',),
+    'vote_count': ('vote_count',),
+    'answers': (),  # 질문 상세에서만 사용
+}
+ANSWER_FIELDS = {
+    'id': (),
+    'content': ('content',),
+    'content_html': ('content_html', 'content_html_version', 'content'),
+    'author': ('author', 'author__username'),
+    'create_date': (),
+    'modify_date': ('modify_date',),
+    'vote_count': ('vote_count',),
+}
+LIST_DEFAULT = ('id', 'subject', 'author', 'create_date', 'answer_count', 'vote_count')
+DETAIL_DEFAULT = ('id', 'subject', 'content', 'author', 'create_date', 'modify_date', 'answer_count', 'vote_count',
+                  'answers')
+ANSWER_DEFAULT = ('id', 'content', 'author', 'create_date', 'modify_date', 'vote_count')
+
+
+# 잘못된 요청 값
+class BadRequest(Exception):
+    pass
+
+
+# 짧은 JSON 응답 (공백 없이, 한글은 그대로)
+def json_response(data, status=200):
+    return JsonResponse(data, status=status, json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False})
+
+
+# ?fields= 값을 항목 목록으로 변환
+def parse_fields(value, available, default):
+    if not value:
+        return list(default)
+    fields = [field.strip() for field in value.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in available]
+    if unknown:
+        raise BadRequest('알 수 없는 항목 : {}'.format(', '.join(unknown)))
+    return fields
+
+
+# 항목 목록에 필요한 쿼리셋 (필요한 컬럼만 조회, 글쓴이를 요청한 경우에만 조인)
+def select_fields(queryset, fields, available, required=()):
+    columns = ['id', 'create_date', *required]
+    for field in fields:
+        columns.extend(available[field])
+    if 'author' in fields:
+        queryset = queryset.select_related('author')
+    return queryset.only(*columns)
+
+
+# 질문/답변 객체를 요청한 항목만 담은 딕셔너리로 변환
+def serialize(obj, fields):
+    data = {}
+    for field in fields:
+        if field == 'author':
+            # 보관된 질문의 답변은 글쓴이가 삭제되었을 수 있음
+            data['author'] = obj.author.username if obj.author else None
+        elif field == 'content_html':
+            data['content_html'] = rendering.content_html(obj)
+        elif field == 'answers':
+            continue
+        else:
+            value = getattr(obj, field)
+            data[field] = value.isoformat() if hasattr(value, 'isoformat') else value
+    return data
+
+
+# 페이지당 개수 (1 ~ MAX_LIMIT)
+def parse_limit(request, name):
+    try:
+        return min(max(int(request.GET.get(name, DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    except ValueError:
+        raise BadRequest('{} 값이 올바르지 않습니다.'.format(name))
+
+
+# 잘못된 요청 값(BadRequest)이면 400 응답, 찾는 객체가 없으면(Http404) 404 응답
+# API 응답이므로 오류도 HTML 오류 페이지 대신 JSON으로 돌려준다.
+def bad_request(view_func):
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view_func(request, *args, **kwargs)
+        except BadRequest as e:
+            return json_response({'error': str(e)}, status=400)
+        except Http404:
+            return json_response({'error': '요청한 객체가 없습니다.'}, status=404)
+    return wrapper
+
+
+# 질문 목록 API
+@bad_request
+def question_list(request):
+    fields = parse_fields(request.GET.get('fields'), QUESTION_FIELDS, LIST_DEFAULT)
+    if 'answers' in fields:
+        raise BadRequest('answers 항목은 질문 상세에서만 사용할 수 있습니다.')
+    limit = parse_limit(request, 'limit')
+    queryset = select_fields(Question.objects.all(), fields, QUESTION_FIELDS)
+    kw = request.GET.get('kw', '')
+    if kw:
+        queryset = search.search_questions(queryset, kw)
+    page = pagination.cursor_paginate(queryset, limit,
+                                      after=request.GET.get('after', ''), before=request.GET.get('before', ''))
+    return json_response({
+        'results': [serialize(question, fields) for question in page],
+        'next': page.next_cursor or None,
+        'previous': page.previous_cursor or None,
+    })
+
+
+# 질문 상세 API
+# 답변은 (작성 일시, id) 순서로 answers_after 커서 다음의 answers_limit개를 (question, create_date, id) 인덱스 범위 조회로 가져온다.
+# 질문 테이블에 없으면 보관된 질문에서 찾는다. (질문 상세 화면과 같음)
+@bad_request
+def question_detail(request, question_id):
+    fields = parse_fields(request.GET.get('fields'), QUESTION_FIELDS, DETAIL_DEFAULT)
+    answer_fields, after, limit = [], None, 0
+    if 'answers' in fields:
+        answer_fields = parse_fields(request.GET.get('answer_fields'), ANSWER_FIELDS, ANSWER_DEFAULT)
+        limit = parse_limit(request, 'answers_limit')
+        after = request.GET.get('answers_after', '')
+        after = pagination.decode_cursor(after) if after else None
+    try:
+        question = get_object_or_404(select_fields(Question.objects.all(), fields, QUESTION_FIELDS), pk=question_id)
+    except Http404:
+        question, answers = archive.get_thread(question_id)
+        if after:
+            answers = [answer for answer in answers if (answer.create_date, answer.id) > after]
+        answers = answers[:limit + 1]
+    else:
+        answers = []
+        if answer_fields:
+            answers = select_fields(Answer.objects.filter(question_id=question.id), answer_fields, ANSWER_FIELDS)
+            if after:
+                value, pk = after
+                answers = answers.filter(Q(create_date__gt=value) | Q(create_date=value, id__gt=pk))
+            answers = list(answers.order_by('create_date', 'id')[:limit + 1])
+    data = serialize(question, fields)
+    if 'answers' in fields:
+        data['answers'] = [serialize(answer, answer_fields) for answer in answers[:limit]]
+        data['answers_next'] = pagination.encode_cursor(answers[limit - 1]) if len(answers) > limit else None
+    return json_response(data)
+
+
+# 검색어 자동 완성 API
+# 입력할 때마다 요청하므로 브라우저가 잠시 저장해 두고 같은 접두어는 다시 요청하지 않도록 함
+def autocomplete_view(request):
+    results = autocomplete.index.search(request.GET.get('q', ''), AUTOCOMPLETE_LIMIT)
+    response = json_response({'results': [
+        {'type': kind, 'id': pk, 'text': text} if kind == 'question' else {'type': kind, 'text': text}
+        for kind, pk, text in results
+    ]})
+    response['Cache-Control'] = 'max-age=60'
+    return response
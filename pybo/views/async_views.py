@@ -0,0 +1,71 @@
+# 비동기 뷰
+# ASGI 서버(config/asgi.py)로 실행할 때 사용하는 질문 목록, 질문 상세 화면의 비동기(async def) 버전
+# 동기 뷰는 요청을 처리하는 동안(데이터베이스 응답을 기다리는 동안에도) 스레드 하나를 계속 차지하지만,
+# 비동기 뷰는 기다리는 동안 이벤트 루프가 다른 요청을 처리할 수 있으므로, 하나의 워커 프로세스로 많은 동시 접속을 처리할 수 있다.
+#
+# 사용 중인 장고 4.0에는 aget, async for 같은 비동기 ORM 인터페이스가 없으므로(장고 4.1부터 제공),
+# 데이터베이스 조회는 동기 뷰와 같은 함수(index_context, detail_question, answer_context)를 sync_to_async로 감싸 실행한다.
+# (장고 4.1의 비동기 ORM도 내부적으로는 같은 방식으로 동작한다.)
+
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404
+from django.shortcuts import render
+
+from .. import conditional, metrics, page_cache, rendering
+from .base_views import index_context, detail_question, answer_context, archived_detail
+
+
+# 마크다운 변환 전용 스레드 풀
+# 변환은 CPU를 사용하는 작업이므로 이벤트 루프에서 직접 실행하지 않고, 최대 PYBO_MARKDOWN_WORKERS개의 스레드에서 실행한다.
+markdown_executor = ThreadPoolExecutor(max_workers=settings.PYBO_MARKDOWN_WORKERS,
+                                       thread_name_prefix='pybo-markdown')
+
+
+# 저장된 HTML(content_html)이 없거나 오래된 질문/답변만 골라 마크다운 변환 스레드 풀에서 렌더링
+# 렌더링 결과는 이번 응답에만 사용하고 저장하지는 않는다. (저장은 render_markdown 명령으로)
+async def render_stale_content(objs):
+    stale = [obj for obj in objs if obj.content_html_version != rendering.RENDER_VERSION]
+    if not stale:
+        return
+    loop = asyncio.get_running_loop()
+    with metrics.timer('md'):
+        htmls = await asyncio.gather(*[
+            loop.run_in_executor(markdown_executor, rendering.render, obj.content) for obj in stale])
+    for obj, html in zip(stale, htmls):
+        obj.content_html = html
+        obj.content_html_version = rendering.RENDER_VERSION
+
+
+# 템플릿 렌더링
+# 템플릿의 컨텍스트 프로세서(request.user, messages 등)가 세션/사용자 조회 쿼리를 실행할 수 있으므로 sync_to_async로 실행
+async def render_async(request, template_name, context):
+    return await sync_to_async(render)(request, template_name, context)
+
+
+# index 페이지 관련 비동기 뷰 (base_views.index와 같은 화면)
+@conditional.conditional_page(conditional.board_etag)
+@page_cache.cache_anonymous_page('board')
+async def index(request):
+    context = await sync_to_async(index_context)(request)
+    return await render_async(request, 'pybo/question_list.html', context)
+
+
+# 질문 상세 페이지 관련 비동기 뷰 (base_views.detail과 같은 화면)
+@conditional.conditional_page(conditional.question_etag, cheap=False)
+@page_cache.cache_anonymous_page('question:{question_id}')
+async def detail(request, question_id):
+    try:
+        question = await sync_to_async(detail_question)(question_id)
+    except Http404:
+        return await sync_to_async(archived_detail)(request, question_id)
+    context = {'question': question, **await sync_to_async(answer_context)(request, question)}
+    # 답변 한 페이지는 answer_context에서 미리 조회되어 있으므로 데이터베이스를 다시 조회하지 않음
+    await render_stale_content([question] + context['answer_list'].object_list)
+    response = await render_async(request, 'pybo/question_detail.html', context)
+    response['ETag'] = await sync_to_async(conditional.question_etag_for)(request, question)
+    return response
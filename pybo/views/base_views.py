@@ -6,65 +6,191 @@
 # 즉, 사용자가 요청하는 값(request)을 받아 모델과 템플릿을 중개하는 역할을 한다.
 
 
+from django.conf import settings
 from django.core.paginator import Paginator
-from django.shortcuts import render, get_object_or_404
 from django.db.models import Q
+from django.http import Http404
+from django.shortcuts import render, get_object_or_404, resolve_url
 
-from ..models import Question
+from .. import archive, conditional, page_cache, pagination, ranking, search
+from ..models import Question, Answer
 
 
-# index 페이지 관련 함수 뷰
-# 매개변수 request는 HTTP 요청 객체
-def index(request):
+# index 페이지에 전달할 데이터(context) 생성
+# 동기 뷰(index)와 비동기 뷰(async_views.index)에서 함께 사용
+def index_context(request):
     # 페이지
     # GET 방식으로 호출된 URL에서 page 값을 가져올 때 사용 (ex. http://localhost:8000/pybo/?page=1)
-    # page 값 없이 호출된 경우에는 디폴트로 1이라는 값이 설정되게 함 (ex. http://localhost:8000/pybo/)
-    page = request.GET.get('page', '1')
+    # page 값이 있으면 기존의 페이지 번호 방식으로, 없으면 커서 방식으로 페이징한다. (ex. http://localhost:8000/pybo/?after=...)
+    page = request.GET.get('page', '')
+    # 커서 방식 페이징에 사용하는 커서 (pybo/pagination.py 참고)
+    # after : 다음 페이지(더 오래된 글), before : 이전 페이지(더 최신 글)
+    after = request.GET.get('after', '')
+    before = request.GET.get('before', '')
     # 검색어
     # 화면으로부터 전달받은 검색어
     kw = request.GET.get('kw', '')
+    # 정렬 방식 (recent, recommend, popular, recent_activity. pybo/ranking.py 참고)
+    # 모두 질문 테이블에 미리 저장해 둔 컬럼의 (컬럼, id) 인덱스 순서로 조회하므로, 추천인/답변 테이블을 집계하지 않는다.
+    sort = ranking.get_sort(request.GET.get('sort', ''))
+    key = ranking.SORTS[sort]
     # Question의 질문 목록 데이터 얻기
     # question_list : 질문 목록 데이터
     # order_by : 조회 결과를 정렬하는 함수
     # order_by('-create_date') : 작성 일시를 역순으로 정렬  # - : 역방향
-    question_list = Question.objects.order_by('-create_date')
-    # Q 함수 : OR조건으로 데이터를 조회하기 위해 사용하는 함수. 제목, 내용, 글쓴이를 OR 조건으로 검색하기 위해 사용
-    # distinct 함수 : 조회 결과에 중복이 있을 경우 중복을 제거하여 리턴하는 함수
-    # 하나의 질문에는 여러 개의 답변이 있을 수 있는데, 이 때 여러 개의 답변이 검색 조건에 해당될 때 동일한 질문이 중복으로 조회될 수 있다. 이런 이유로 중복된 질문을 제거하기 위해 distinct를 사용
-    # subject__icontains=kw : 제목에 kw 문자열이 포함되었는지를 확인
-    # answer__author__username__icontains=kw : 답변을 작성한 사람의 이름에 kw 문자열이 포함되는지 확인
-    # filter 함수에서 모델 속성에 접근하기 위해서는, 이처럼 __(언더바 두개)를 이용하여 하위 속성에 접근할 수 있다.
-    # contains과 icontains의 차이점 : icontains를 사용하면 대소문자를 가리지 않고 찾아준다.
+    # select_related('author') : 목록에 표시할 글쓴이(question.author.username)를 조인으로 함께 가져와, 행마다 사용자 조회 쿼리가 실행되지 않도록 함
+    question_list = Question.objects.select_related('author').order_by('-create_date')
+    # 검색어가 있을 경우, 제목/내용/답변 내용/질문 글쓴이/답변 글쓴이를 대상으로 검색
+    # 예전에는 Q 함수와 icontains로 다섯 개의 조건을 OR로 묶고 distinct로 중복을 제거했지만,
+    # 그렇게 하면 질문, 답변, 사용자 테이블을 조인한 전체를 LIKE로 훑게 되어 데이터가 많아질수록 느려진다.
+    # 대신 pybo/search.py의 n-gram 역색인(SearchToken)을 이용하여 검색하고, 관련도 순으로 정렬한다.
     if kw:  # kw(검색어)가 존재한다면,
-        question_list = question_list.filter(
-            Q(subject__icontains=kw) |  # 제목 검색
-            Q(content__icontains=kw) |  # 내용 검색
-            Q(answer__content__icontains=kw) |  # 답변 내용 검색
-            Q(author__username__icontains=kw) |  # 질문 글쓴이 검색
-            Q(answer__author__username__icontains=kw)  # 답변 글쓴이 검색
-        ).distinct()
-    paginator = Paginator(question_list, 10)  # (질문 목록 데이터를) 페이지당 10개씩 보여주기
-    # paginator를 이용하여 요청된 페이지(page)에 해당되는, 페이징 객체(page_obj)를 생성
-    # 이렇게 하면 장고 내부적으로는 데이터 전체를 조회하지 않고, 해당 페이지의 데이터만 조회하도록 쿼리가 변경됨
-    page_obj = paginator.get_page(page)
+        question_list = search.search_questions(question_list, kw)
+    if sort != ranking.DEFAULT_SORT:
+        # 검색 결과도 관련도 순이 아닌 선택한 정렬 방식으로 정렬
+        question_list = question_list.order_by('-' + key, '-id')
+    # 관련도 순 검색 결과는 커서의 기준 컬럼(정렬 기준 값, id)으로 이어 읽을 수 없으므로, page 값이 없어도 페이지 번호 방식으로 페이징
+    # (검색 결과는 검색어의 토큰이 있는 질문만 세므로 COUNT, OFFSET 비용이 전체 목록보다 작다.)
+    numbered = bool(page) or (bool(kw) and sort == ranking.DEFAULT_SORT)
+    if numbered:
+        paginator = Paginator(question_list, 10)  # (질문 목록 데이터를) 페이지당 10개씩 보여주기
+        # paginator를 이용하여 요청된 페이지(page)에 해당되는, 페이징 객체(page_obj)를 생성
+        # 이렇게 하면 장고 내부적으로는 데이터 전체를 조회하지 않고, 해당 페이지의 데이터만 조회하도록 쿼리가 변경됨
+        page_obj = paginator.get_page(page or 1)
+    else:
+        # 커서 방식 페이징 : COUNT, OFFSET 없이 (create_date, id) 인덱스 범위 조회만으로 페이지당 10개씩 가져옴
+        page_obj = pagination.cursor_paginate(question_list, 10, after=after, before=before, key=key)
+    # 대략적인 전체 개수 (커서 방식에서 설정을 켠 경우에만 표시)
+    total = None
+    if not numbered and settings.PYBO_SHOW_APPROXIMATE_TOTAL:
+        total = pagination.approximate_count(question_list)
     # 질문 목록 데이터와 page, kw를 딕셔너리로 저장
     # question_list : 질문 목록 데이터
     # question_list는 페이징 객체(page_obj)
     # context = {..., 'page': page, 'kw': kw} : page와 kw를 템플릿에 전달하기 위해 context 딕셔너리에 추가
-    context = {'question_list': page_obj, 'page': page, 'kw': kw}
+    # list() : 커서 방식 페이지의 목록은 이미 리스트이고, Paginator의 페이지는 템플릿에서 순회할 때 조회되므로 여기서 미리 조회해 둔다.
+    # (비동기 뷰에서는 템플릿 렌더링 중에 데이터베이스를 조회할 수 없기 때문)
+    page_obj.object_list = list(page_obj.object_list)
+    # 검색 결과에는 보관된 질문(pybo/archive.py) 중 일치하는 질문도 첫 페이지에 함께 보여줌
+    archived_list = []
+    if kw and not (page and page != '1') and not after and not before:
+        archived_list = archive.search_archived(kw)
+    return {'question_list': page_obj, 'page': page, 'kw': kw, 'sort': sort, 'sorts': ranking.SORT_LABELS,
+            'total': total, 'archived_list': archived_list}
+
+
+# index 페이지 관련 함수 뷰
+# 매개변수 request는 HTTP 요청 객체
+# cache_anonymous_page : 로그아웃 상태 사용자의 응답을 캐시. 질문/답변이 변경되면 'board' 버전이 바뀌어 캐시가 무효화됨
+# conditional_page : 'board' 버전이 그대로이면 304 Not Modified 응답 (pybo/conditional.py 참고)
+@conditional.conditional_page(conditional.board_etag)
+@page_cache.cache_anonymous_page('board')
+def index(request):
+    context = index_context(request)
     # 데이터({'question_list': page_obj, 'page': page, 'kw': kw})를 템플릿 파일(pybo/question_list.html)에 적용하여 HTML을 생성한 후 리턴
     # render 함수 : 파이썬 데이터를 템플릿에 적용하여 HTML로 반환하는 함수
     return render(request, 'pybo/question_list.html', context)
 
 # 질문 상세 페이지 관련 함수 뷰
 # 매개변수 question_id에는 URL 매핑시 저장된 question_id가 전달
+# cache_anonymous_page : 로그아웃 상태 사용자의 응답을 캐시. 해당 질문/답변이 변경되면 'question:{question_id}' 버전이 바뀌어 캐시가 무효화됨
+# conditional_page : 질문/답변의 수정 일시, 추천 수 등이 그대로이면 304 Not Modified 응답 (pybo/conditional.py 참고)
+@conditional.conditional_page(conditional.question_etag, cheap=False)
+@page_cache.cache_anonymous_page('question:{question_id}')
 def detail(request, question_id):
+    try:
+        question = detail_question(question_id)
+    except Http404:
+        # 질문 테이블에 없으면 보관된 질문에서 찾아 읽기 전용 화면으로 보여줌 (없으면 404)
+        return archived_detail(request, question_id)
+    # 질문 데이터와 답변 한 페이지를 딕셔너리로 저장
+    context = {'question': question, **answer_context(request, question)}
+    # 관련 질문으로 얻은 question 데이터({'question': question})를 템플릿 파일(pybo/question_detail.html)에 적용하여 HTML을 생성한 후 리턴
+    response = render(request, 'pybo/question_detail.html', context)
+    # 조건부 요청(If-None-Match)에 사용할 ETag. 질문과 함께 조회한 값으로 계산하므로 쿼리가 추가되지 않음
+    response['ETag'] = conditional.question_etag_for(request, question)
+    return response
+
+
+# 보관된 질문(pybo/archive.py)의 상세 화면
+# 동기 뷰(detail)와 비동기 뷰(async_views.detail)에서 함께 사용
+def archived_detail(request, question_id):
+    question, answers = archive.get_thread(question_id)
+    paginator = Paginator(answers, settings.PYBO_ANSWERS_PER_PAGE)
+    context = {'question': question, 'answer_list': paginator.get_page(request.GET.get('answer_page'))}
+    return render(request, 'pybo/question_archived.html', context)
+
+
+# 답변 목록 조각(fragment) 관련 함수 뷰
+# 질문 상세 화면의 "답변 더 보기" 버튼이 다음 페이지의 답변들을 HTML 조각으로 받아 화면 아래에 이어 붙일 때 사용
+# 예) /pybo/2/answers/?answer_page=3&answer_sort=recommend
+@page_cache.cache_anonymous_page('question:{question_id}')
+def answer_list(request, question_id):
+    question = get_object_or_404(Question.objects.only('id', 'answer_count'), pk=question_id)
+    return render(request, 'pybo/answer_list.html', {'question': question, **answer_context(request, question)})
+
+
+# 질문 상세 페이지에 보여줄 질문 데이터 조회
+# 동기 뷰(detail)와 비동기 뷰(async_views.detail)에서 함께 사용
+def detail_question(question_id):
     # (인자로 받은) pk(question_id, 질문 id) 값에 해당하는 질문 데이터 얻기. (models의 Question 모델로부터) 데이터를 가져온다.
     # pk : 모델의 기본키(Primary Key)  # 해당 모델의 pk는 id이다.
     # get_object_or_404() : 존재하지 않는 데이터를 요청할 경우 404 페이지 출력
     # question : 질문 데이터
-    question = get_object_or_404(Question, pk=question_id)
-    # 질문 데이터를 딕셔너리로 저장
-    context = {'question': question}
-    # 관련 질문으로 얻은 question 데이터({'question': question})를 템플릿 파일(pybo/question_detail.html)에 적용하여 HTML을 생성한 후 리턴
-    return render(request, 'pybo/question_detail.html', context)
\ No newline at end of file
+    # select_related('author') : 질문 글쓴이를 조인으로 함께 가져옴
+    # annotate : 응답의 ETag에 사용할 답변 전체의 집계 값(최근 작성/수정 일시, 추천 수 합계)도 같은 쿼리로 함께 가져옴
+    question = get_object_or_404(
+        Question.objects.select_related('author').annotate(**conditional.answer_aggregates()),
+        pk=question_id,
+    )
+    return question
+
+
+# 답변 정렬 방식 : 정렬 순서
+# 정렬 순서마다 (question, 정렬 컬럼, id) 인덱스가 있으므로 어느 페이지든 해당 질문의 답변만 인덱스 순서대로 읽는다.
+ANSWER_SORTS = {
+    'date': ('create_date', 'id'),
+    'recommend': ('-vote_count', '-id'),
+}
+DEFAULT_ANSWER_SORT = 'date'
+ANSWER_SORT_LABELS = {'date': '작성순', 'recommend': '추천순'}
+
+
+# 질문 상세 화면(또는 답변 목록 조각)에 보여줄 답변 한 페이지
+# 동기 뷰(detail, answer_list)와 비동기 뷰(async_views.detail)에서 함께 사용
+# 답변이 수천 개인 질문도 PYBO_ANSWERS_PER_PAGE개씩만 조회, 렌더링하므로 응답 크기와 렌더링 시간이 일정하다.
+# select_related('author') : 답변마다 글쓴이 조회 쿼리가 실행되지 않도록 조인으로 함께 가져옴 (N+1 문제 방지)
+# 전체 답변 개수는 COUNT 쿼리 대신 질문의 카운터 컬럼(answer_count)을 사용한다.
+def answer_context(request, question):
+    sort = request.GET.get('answer_sort', '')
+    if sort not in ANSWER_SORTS:
+        sort = DEFAULT_ANSWER_SORT
+    answers = Answer.objects.filter(question=question).select_related('author').order_by(*ANSWER_SORTS[sort])
+    paginator = Paginator(answers, settings.PYBO_ANSWERS_PER_PAGE)
+    paginator.count = question.answer_count
+    page_obj = paginator.get_page(request.GET.get('answer_page'))
+    # 비동기 뷰에서는 템플릿 렌더링 중에 데이터베이스를 조회할 수 없으므로 미리 조회
+    page_obj.object_list = list(page_obj.object_list)
+    return {'answer_list': page_obj, 'answer_sort': sort, 'answer_sorts': ANSWER_SORT_LABELS}
+
+
+# 답변이 있는 페이지 번호
+# 정렬 순서에서 이 답변보다 앞에 있는 답변의 개수를 (question, 정렬 컬럼, id) 인덱스 범위로 세어 계산한다.
+def answer_page_number(answer, sort=DEFAULT_ANSWER_SORT):
+    (first, first_op), (second, second_op) = [
+        (field.lstrip('-'), 'gt' if field.startswith('-') else 'lt') for field in ANSWER_SORTS[sort]]
+    before = Answer.objects.filter(question_id=answer.question_id).filter(
+        Q(**{first + '__' + first_op: getattr(answer, first)})
+        | Q(**{first: getattr(answer, first), second + '__' + second_op: getattr(answer, second)})
+    ).count()
+    return before // settings.PYBO_ANSWERS_PER_PAGE + 1
+
+
+# 답변 위치로 이동하는 질문 상세 화면 URL (답변 등록, 수정, 추천 후 이동할 때 사용)
+# 예) /pybo/2/?answer_page=3#answer_57
+def answer_url(answer):
+    url = resolve_url('pybo:detail', question_id=answer.question_id)
+    page = answer_page_number(answer)
+    if page > 1:
+        url += '?answer_page={}'.format(page)
+    return '{}#answer_{}'.format(url, answer.id)
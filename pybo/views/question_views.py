@@ -1,8 +1,10 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import render, get_object_or_404, redirect
 from django.utils import timezone
 
+from .. import autocomplete, deletion, page_cache, rendering, tasks, votes
 from ..forms import QuestionForm
 from ..models import Question
 
@@ -29,7 +31,15 @@ def question_create(request):
             # author 속성에 로그인 계정 저장  # request.user : 현재 로그인한 계정의 User 모델 객체
             question.author = request.user
             question.create_date = timezone.now()  # 실제 저장을 위해, 작성 일시를 설정
-            question.save()  # 데이터를 실제로 저장
+            rendering.clear_content(question)
+            with transaction.atomic():
+                question.save()  # 데이터를 실제로 저장
+                # 마크다운 렌더링 결과 저장, 검색 색인 생성은 응답 후 백그라운드 작업으로 처리 (pybo/tasks.py 참고)
+                tasks.enqueue(tasks.update_question, question.id)
+            # 검색어 자동 완성 목록에 제목 추가
+            autocomplete.index.add_question(question.id, question.subject)
+            # 질문 목록 페이지 캐시 무효화
+            page_cache.bump('board')
             return redirect('pybo:index')
     # GET 요청 방식
     # 질문 목록 화면에서 질문 '등록하기' 버튼을 클릭한 경우, /pybo/question/create/ 페이지가 GET 방식으로 요청되어 question_create 함수가 실행
@@ -62,7 +72,17 @@ def question_modify(request, question_id):
         if form.is_valid():
             question = form.save(commit=False)
             question.modify_date = timezone.now()  # 수정 일시 저장  # 수정 일시는 현재 일시로 지정
-            question.save()
+            question.last_activity = question.modify_date  # 최근 활동순 정렬에 사용할 최근 활동 일시
+            rendering.clear_content(question)  # 이전 내용으로 렌더링한 HTML은 사용하지 않음
+            with transaction.atomic():
+                # 수정한 컬럼만 저장 (답변 개수, 추천 수, 인기 점수는 다른 요청이 함께 바꾸므로, 읽어 둔 값으로 덮어쓰지 않도록)
+                question.save(update_fields=['subject', 'content', 'modify_date', 'last_activity',
+                                             'content_html', 'content_html_version'])
+                # 수정된 내용으로 HTML 다시 렌더링, 검색 색인 갱신 (백그라운드 작업)
+                tasks.enqueue(tasks.update_question, question.id)
+            autocomplete.index.add_question(question.id, question.subject)
+            # 질문 목록, 질문 상세 페이지 캐시 무효화
+            page_cache.invalidate(question.id)
             return redirect('pybo:detail', question_id=question.id)
     # GET 요청 방식
     # 동작 예) 질문 상세 화면에서 "수정" 버튼을 클릭하면, http://localhost:8000/pybo/question/modify/2/ 페이지가 GET 방식으로 호출되어 질문 수정 화면이 보여짐
@@ -85,20 +105,23 @@ def question_delete(request, question_id):
         return redirect('pybo:detail', question_id=question.id)
     else:
         # 해당 질문 삭제
-        question.delete()
+        # 답변, 추천, 검색 색인을 읽어 오지 않고 DELETE 문으로 한꺼번에 지우고,
+        # 검색어 자동 완성 목록, 질문 목록과 질문 상세 페이지 캐시에서도 지운다. (pybo/deletion.py 참고)
+        deletion.delete_questions(Question.objects.filter(pk=question.pk))
         # 삭제 후, index 페이지로 이동
     return redirect('pybo:index')
 
 # 질문 추천 관련 함수 뷰
 @login_required(login_url='common:login')
 def question_vote(request, question_id):
-    question = get_object_or_404(Question, pk=question_id)
+    # 본인 추천 확인에 필요한 작성자 id만 조회
+    question = get_object_or_404(Question.objects.only('id', 'author_id'), pk=question_id)
     # 본인 추천을 방지하기 위해, 로그인한 사용자와 추천하려는 질문의 작성자가 동일할 경우에는 추천할 수 없게 함.
-    if request.user == question.author:
+    if request.user.id == question.author_id:
         messages.error(request, '본인이 작성한 글은 추천할 수 없습니다')
     else:
-        # Question 모델의 voter는 여러 사람을 추가할 수 있는 ManyToManyField이므로, question.voter.add(request.user) 처럼 add 함수를 사용하여 추천인을 추가한다.
-        # 동일한 사용자가 동일한 질문을 여러 번 추천하더라도 추천수가 증가하지는 않는다. ManyToManyField 내부에서 자체적으로 이와 같이 처리한다.
-        question.voter.add(request.user)
+        # 추천은 버퍼에만 기록하고, 추천인 테이블과 추천 수 컬럼(vote_count)은 모아서 한꺼번에 저장한다. (pybo/votes.py 참고)
+        # 동일한 사용자가 동일한 질문을 여러 번 추천하더라도 추천수가 증가하지는 않는다.
+        votes.buffer.add('question', question.id, request.user.id)
     # 질문 상세 페이지로 이동
     return redirect('pybo:detail', question_id=question.id)
\ No newline at end of file
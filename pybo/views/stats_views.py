@@ -0,0 +1,15 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+
+from .. import metrics
+
+
+# 성능 측정 결과 관련 함수 뷰
+# 관리자(staff)만 볼 수 있도록 staff_member_required 데코레이터 사용. 로그인하지 않았다면 관리자 로그인 화면으로 이동
+# ?format=prometheus : Prometheus가 수집할 수 있는 텍스트 형식 (처음부터의 누적 히스토그램)
+# 그 외 : 최근 PYBO_METRICS_WINDOW초 동안의 뷰별 요약값(JSON)
+@staff_member_required
+def metrics_view(request):
+    if request.GET.get('format') == 'prometheus':
+        return HttpResponse(metrics.registry.prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    return JsonResponse(metrics.registry.snapshot())
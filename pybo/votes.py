@@ -0,0 +1,144 @@
+# 추천 기록 관련 모듈 (write-behind 버퍼)
+# 추천 버튼을 누를 때마다 추천인 테이블에 INSERT하고 추천 수를 UPDATE하면, SQLite에서는 추천마다 데이터베이스 쓰기 잠금을 잡게 되어
+# 인기 있는 글에 추천이 몰릴 때 요청들이 잠금을 기다리며 줄을 서게 된다.
+# 그래서 추천은 요청 처리 중에 프로세스 메모리의 버퍼에만 기록하고(데이터베이스 쓰기 없음),
+# 백그라운드 스레드가 PYBO_VOTE_FLUSH_INTERVAL초마다(또는 버퍼가 PYBO_VOTE_BUFFER_SIZE개를 넘으면 바로) 모아서
+# 하나의 트랜잭션으로 저장한다. 저장은 프로세스 안에서 한 번에 하나씩만 실행되므로 쓰기 작업끼리 경쟁하지 않는다.
+#
+# 중복 추천 처리
+# - 버퍼는 (종류, 글 id, 사용자 id)의 집합이므로, 저장 전에 같은 사용자가 여러 번 눌러도 한 번만 기록된다.
+# - 추천인 테이블에는 (글 id, 사용자 id) 유니크 제약이 있으므로 ignore_conflicts로 저장하면 이미 추천한 행은 무시된다.
+# - 추천 수는 1씩 더하지 않고 같은 트랜잭션에서 추천인 테이블의 실제 행 개수로 다시 계산하므로, 중복이나 누락이 생기지 않는다.
+#
+# 추천 수가 화면에 반영되기까지 최대 PYBO_VOTE_FLUSH_INTERVAL초 늦어질 수 있다.
+# 버퍼는 프로세스 메모리에 있으므로, 프로세스가 강제 종료되면 아직 저장하지 않은 추천은 사라진다. (정상 종료 시에는 저장)
+
+
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import close_old_connections, transaction
+
+from . import page_cache, ranking
+from .counters import count_subquery
+from .models import Question, Answer
+
+
+logger = logging.getLogger(__name__)
+
+# 추천 종류 : (모델, 추천인 테이블에서 글을 가리키는 필드 이름)
+KINDS = {
+    'question': (Question, 'question'),
+    'answer': (Answer, 'answer'),
+}
+
+
+class VoteBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()  # 버퍼 변경용
+        self._flush_lock = threading.Lock()  # 저장은 한 번에 하나씩만 실행
+        self._pending = set()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    # 추천 기록 (데이터베이스를 사용하지 않음)
+    def add(self, kind, target_id, user_id):
+        if kind not in KINDS:
+            raise ValueError('알 수 없는 추천 종류 : {}'.format(kind))
+        with self._lock:
+            self._pending.add((kind, target_id, user_id))
+            full = len(self._pending) >= settings.PYBO_VOTE_BUFFER_SIZE
+        if settings.PYBO_VOTE_FLUSH_INTERVAL:
+            self._start()
+            if full:
+                self._wakeup.set()
+        elif full:
+            # 백그라운드 저장을 사용하지 않는 경우(테스트 등)에는 요청을 처리하는 스레드에서 바로 저장
+            self.flush()
+
+    # 버퍼의 추천을 하나의 트랜잭션으로 저장하고, 버퍼에서 꺼낸 추천 개수를 리턴
+    # 저장에 실패하면(데이터베이스 잠금 등) 다음 저장 때 다시 시도하도록 버퍼에 되돌려 놓는다.
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            if not pending:
+                return 0
+            try:
+                question_ids = self._write(pending)
+            except Exception:
+                with self._lock:
+                    self._pending |= pending
+                raise
+        # 질문 상세 페이지 캐시와, 추천순/인기순 정렬이 바뀌므로 질문 목록 페이지 캐시 무효화
+        page_cache.bump('board', *['question:{}'.format(question_id) for question_id in question_ids])
+        return len(pending)
+
+    def _write(self, pending):
+        question_ids = set()
+        with transaction.atomic():
+            # 버퍼에 있는 동안 삭제(또는 보관)된 글, 사용자에 대한 추천은 저장하지 않고 버림
+            # (저장하면 외래 키 오류로 트랜잭션 전체가 실패하고, 버퍼에 되돌려 놓아도 계속 실패한다.)
+            user_ids = set(User.objects.filter(pk__in={user_id for _, _, user_id in pending}).values_list('pk', flat=True))
+            for kind, (model, field) in KINDS.items():
+                rows = {(target_id, user_id) for k, target_id, user_id in pending if k == kind}
+                if not rows:
+                    continue
+                existing = set(model.objects.filter(pk__in={target_id for target_id, _ in rows}).values_list('pk', flat=True))
+                valid = {(target_id, user_id) for target_id, user_id in rows if target_id in existing and user_id in user_ids}
+                if len(valid) < len(rows):
+                    logger.warning('삭제된 글 또는 사용자에 대한 추천 %d건을 버림 (%s)', len(rows) - len(valid), kind)
+                rows = valid
+                if not rows:
+                    continue
+                through = model.voter.through
+                through.objects.bulk_create([
+                    through(**{field + '_id': target_id, 'user_id': user_id}) for target_id, user_id in rows
+                ], ignore_conflicts=True)
+                targets = {target_id for target_id, _ in rows}
+                # 추천 수를 추천인 테이블의 실제 행 개수로 갱신 (UPDATE 문 하나)
+                # 질문은 새로 늘어난 추천 수만큼 인기 점수(pybo/ranking.py)도 함께 더함
+                values = {'vote_count': count_subquery(through, field)}
+                if model is Question:
+                    values['hot_score'] = ranking.vote_score(values['vote_count'])
+                model.objects.filter(pk__in=targets).update(**values)
+                if model is Question:
+                    question_ids |= targets
+                else:
+                    question_ids.update(model.objects.filter(pk__in=targets).values_list('question_id', flat=True))
+        return question_ids
+
+    # 저장하지 않은 추천 버리기 (테스트용)
+    def discard(self):
+        with self._lock:
+            self._pending.clear()
+
+    # 백그라운드 저장 스레드 시작 (처음 추천을 기록할 때 한 번)
+    def _start(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='pybo-votes', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(settings.PYBO_VOTE_FLUSH_INTERVAL)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('추천 저장 실패')
+            finally:
+                close_old_connections()
+
+
+buffer = VoteBuffer()